@@ -48,6 +48,12 @@ def parse_args():
         parser.add_argument(
             '-l', '--log_file', type=str, action='store', default=None,
             help='filename for storing logging output [default is to stream to stdout]')
+        parser.add_argument(
+            '-r', '--resume', action='store_true', default=False,
+            help='skip any output files that were completed by a previous run')
+        parser.add_argument(
+            '-s', '--shard', type=str, action='store', default=None,
+            help='only build shard i of N of the output files, given as i/N with 0 <= i < N')
         args = parser.parse_args()
 
     except ImportError:
@@ -55,7 +61,7 @@ def parse_args():
         import optparse
 
         # Usage string not automatically generated for optparse, so generate it
-        usage = """Usage: galsim_json [-h] [-v {0,1,2,3}] [-l LOG_FILE]
+        usage = """Usage: galsim_json [-h] [-v {0,1,2,3}] [-l LOG_FILE] [-r] [-s SHARD]
                    config_file [config_file ...]
         """
         
@@ -68,6 +74,12 @@ def parse_args():
         parser.add_option(
             '-l', '--log_file', type=str, action='store', default=None,
             help='filename for storing logging output [default is to stream to stdout]')
+        parser.add_option(
+            '-r', '--resume', action='store_true', default=False,
+            help='skip any output files that were completed by a previous run')
+        parser.add_option(
+            '-s', '--shard', type=str, action='store', default=None,
+            help='only build shard i of N of the output files, given as i/N with 0 <= i < N')
         (options, posargs) = parser.parse_args()
 
         # Since optparse doesn't put all the positional arguments together with the options,
@@ -76,6 +88,8 @@ def parse_args():
         args = galsim.utilities.AttributeDict()
         args.verbosity = int(options.verbosity) # remembering to convert to an integer type
         args.log_file = options.log_file
+        args.resume = options.resume
+        args.shard = options.shard
         # Parse the positional arguments by hand
         if len(posargs) >= 1:
             args.config_file = posargs
@@ -83,6 +97,17 @@ def parse_args():
             print usage
             sys.exit('galsim_json: error: too few arguments')
 
+    # Parse the shard string i/N into two integers.
+    if args.shard is not None:
+        try:
+            shard, nshards = [ int(x) for x in args.shard.split('/') ]
+        except ValueError:
+            sys.exit('galsim_json: error: invalid shard %s (should be i/N)'%args.shard)
+        if nshards <= 0 or shard < 0 or shard >= nshards:
+            sys.exit('galsim_json: error: invalid shard %s (need 0 <= i < N)'%args.shard)
+        args.shard = shard
+        args.nshards = nshards
+
     # Return the args
     return args
 
@@ -116,6 +141,19 @@ def main():
         if 'root' not in config:
             config['root'] = os.path.splitext(config_file)[0]
 
+        # The command line can turn on resume mode without needing to edit the config file.
+        if args.resume:
+            if 'output' not in config:
+                config['output'] = {}
+            config['output']['resume'] = True
+
+        # Likewise for building just one shard of the files.
+        if args.shard is not None:
+            if 'output' not in config:
+                config['output'] = {}
+            config['output']['shard'] = args.shard
+            config['output']['nshards'] = args.nshards
+
         logger.debug("Process config dict: \n%s", config)
 
         # Process the configuration
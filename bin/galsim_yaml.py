@@ -71,6 +71,12 @@ def parse_args():
         parser.add_argument(
             '-l', '--log_file', type=str, action='store', default=None,
             help='filename for storing logging output [default is to stream to stdout]')
+        parser.add_argument(
+            '-r', '--resume', action='store_true', default=False,
+            help='skip any output files that were completed by a previous run')
+        parser.add_argument(
+            '-s', '--shard', type=str, action='store', default=None,
+            help='only build shard i of N of the output files, given as i/N with 0 <= i < N')
         args = parser.parse_args()
 
     except ImportError:
@@ -78,7 +84,7 @@ def parse_args():
         import optparse
 
         # Usage string not automatically generated for optparse, so generate it
-        usage = "Usage: galsim_yaml [-h] [-v {0,1,2,3}] [-l LOG_FILE] config_file"
+        usage = "Usage: galsim_yaml [-h] [-v {0,1,2,3}] [-l LOG_FILE] [-r] [-s SHARD] config_file"
         # Build the parser
         parser = optparse.OptionParser(usage=usage, epilog=epilog, description=description)
         # optparse only allows string choices, so take verbosity as a string and make it int later
@@ -88,6 +94,12 @@ def parse_args():
         parser.add_option(
             '-l', '--log_file', type=str, action='store', default=None,
             help='filename for storing logging output [default is to stream to stdout]')
+        parser.add_option(
+            '-r', '--resume', action='store_true', default=False,
+            help='skip any output files that were completed by a previous run')
+        parser.add_option(
+            '-s', '--shard', type=str, action='store', default=None,
+            help='only build shard i of N of the output files, given as i/N with 0 <= i < N')
         (options, posargs) = parser.parse_args()
 
         # Since optparse doesn't put all the positional arguments together with the options,
@@ -96,6 +108,8 @@ def parse_args():
         args = galsim.utilities.AttributeDict()
         args.verbosity = int(options.verbosity) # remembering to convert to an integer type
         args.log_file = options.log_file
+        args.resume = options.resume
+        args.shard = options.shard
         # Parse the positional arguments by hand
         if len(posargs) == 1:
             args.config_file = posargs[0]
@@ -109,6 +123,17 @@ def parse_args():
                     argstring = argstring+' '+addme
                 sys.exit('galsim_yaml: error: unrecognised arguments: '+argstring)
 
+    # Parse the shard string i/N into two integers.
+    if args.shard is not None:
+        try:
+            shard, nshards = [ int(x) for x in args.shard.split('/') ]
+        except ValueError:
+            sys.exit('galsim_yaml: error: invalid shard %s (should be i/N)'%args.shard)
+        if nshards <= 0 or shard < 0 or shard >= nshards:
+            sys.exit('galsim_yaml: error: invalid shard %s (need 0 <= i < N)'%args.shard)
+        args.shard = shard
+        args.nshards = nshards
+
     # Return the args
     return args
 
@@ -161,6 +186,19 @@ def main():
         # Merge the base_config information into this config file.
         MergeConfig(config,base_config)
 
+        # The command line can turn on resume mode without needing to edit the config file.
+        if args.resume:
+            if 'output' not in config:
+                config['output'] = {}
+            config['output']['resume'] = True
+
+        # Likewise for building just one shard of the files.
+        if args.shard is not None:
+            if 'output' not in config:
+                config['output'] = {}
+            config['output']['shard'] = args.shard
+            config['output']['nshards'] = args.nshards
+
         logger.debug("Process config dict: \n%s", config)
 
         # Process the configuration
@@ -79,7 +79,7 @@ def kolmogorov_mtf_image(array_shape=(256, 256), dx=1., lam_over_r0=1.):
                            [r0 ~ lambda^(-6/5)].
     """
     amtf = kolmogorov_mtf(array_shape=array_shape, dx=dx, lam_over_r0=lam_over_r0)
-    return galsim.ImageViewD(amtf.astype(np.float64))
+    return galsim.image.asImageView(amtf)
 
 def kolmogorov_psf(array_shape=(256,256), dx=1., lam_over_r0=1., flux=1.):
     """Return NumPy array containing long exposure Kolmogorov PSF.
@@ -117,4 +117,4 @@ def kolmogorov_psf_image(array_shape=(256, 256), dx=1., lam_over_r0=1., flux=1.)
     @param flux            total flux of the profile [default flux=1.]
     """
     array = kolmogorov_psf(array_shape=array_shape, dx=dx, lam_over_r0=lam_over_r0, flux=flux)
-    return galsim.ImageViewD(array.astype(np.float64))
+    return galsim.image.asImageView(array)
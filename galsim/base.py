@@ -46,6 +46,17 @@ version = '0.4.1'
 
 ALIAS_THRESHOLD = 0.005 # Matches hard coded value in src/SBProfile.cpp. TODO: bring these together
 
+# Rough relative costs used by draw(method='auto') to predict the time of each way to draw an
+# object, in units of one kValue or xValue call of a simple analytic profile.  They only need to
+# be right to within a factor of a few, since the methods usually differ by much more than that.
+DRAW_COST_KVALUE = 1.            # per k-space grid point per convolved component
+DRAW_COST_FFT = 0.3              # per N^2 log2(N) for an NxN FFT
+DRAW_COST_XVALUE = 1.            # per pixel drawn directly in real space
+DRAW_COST_REAL_SPACE_CONV = 500. # per pixel of a real-space convolution (a 2d integral)
+DRAW_COST_PHOTON = 3.            # per shot photon per convolved component
+MIN_FFT_SIZE = 128               # Matches sbp::minimum_fft_size in include/galsim/SBProfile.h
+MAX_FFT_SIZE = 4096              # Matches sbp::maximum_fft_size in include/galsim/SBProfile.h
+
 class GSObject(object):
     """Base class for defining the interface with which all GalSim Objects access their shared 
     methods and attributes, particularly those from the C++ SBProfile classes.
@@ -165,7 +176,7 @@ class GSObject(object):
         """
         return self.SBProfile.getFlux()
 
-    def xValue(self, position):
+    def xValue(self, position, y=None):
         """Returns the value of the object at a chosen 2D position in real space.
         
         xValue() is available if obj.isAnalyticX() == True.
@@ -174,13 +185,29 @@ class GSObject(object):
         for derived classes (e.g. SBConvolve) that require a Discrete Fourier Transform to 
         determine real space values.  In this case, an SBError will be thrown at the C++ layer 
         (raises a RuntimeError in Python).
+
+        The values at many positions can be calculated at once with `obj.xValue(x, y)`, where
+        x and y are NumPy arrays (or anything that can be converted to one) of the same shape.
+        The return value is then an array of that shape.  All the values are calculated in a
+        single C++ call, and if the positions form a regular grid (e.g. from numpy.meshgrid), 
+        the calculation is vectorized.
         
         @param position  A 2D galsim.PositionD/galsim.PositionI instance giving the position in real
-                         space.
+                         space, or an array of x values if y is given.
+        @param y         An array of y values, if position is an array of x values.
+                         (Default `y = None`)
         """
-        return self.SBProfile.xValue(position)
+        if y is None:
+            return self.SBProfile.xValue(position)
+        elif np.isscalar(position) and np.isscalar(y):
+            return self.SBProfile.xValue(galsim.PositionD(position,y))
+        else:
+            x, y, shape = _value_arrays(position, y)
+            val = np.empty_like(x)
+            self.SBProfile.xValues(x, y, val)
+            return val.reshape(shape)
 
-    def kValue(self, position):
+    def kValue(self, position, ky=None):
         """Returns the value of the object at a chosen 2D position in k space.
 
         kValue() is available if the given obj has obj.isAnalyticK() == True. 
@@ -191,10 +218,24 @@ class GSObject(object):
         so), then it is not analytic in k-space, so kValue() will raise an exception.  An SBError
         will be thrown at the C++ layer (raises a RuntimeError in Python).
 
+        The values at many positions can be calculated at once with `obj.kValue(kx, ky)`, where
+        kx and ky are NumPy arrays of the same shape.  The return value is then a complex array
+        of that shape.  See xValue() for details.
+
         @param position  A 2D galsim.PositionD/galsim.PositionI instance giving the position in k 
-                         space.
+                         space, or an array of kx values if ky is given.
+        @param ky        An array of ky values, if position is an array of kx values.
+                         (Default `ky = None`)
         """
-        return self.SBProfile.kValue(position)
+        if ky is None:
+            return self.SBProfile.kValue(position)
+        elif np.isscalar(position) and np.isscalar(ky):
+            return self.SBProfile.kValue(galsim.PositionD(position,ky))
+        else:
+            kx, ky, shape = _value_arrays(position, ky)
+            val = np.empty(kx.shape, dtype=complex)
+            self.SBProfile.kValues(kx, ky, val.view(float))
+            return val.reshape(shape)
 
     def scaleFlux(self, flux_ratio):
         """Multiply the flux of the object by flux_ratio
@@ -526,8 +567,112 @@ class GSObject(object):
         return image, dx
 
 
+    def _draw_options(self, image, dx, wmult, n_photons, max_extra_noise):
+        """Return a dict of the ways to draw this object onto the (already set up) image.
+
+        Each key is a method name ('fft', 'real_space' or 'phot'), and each value is a tuple
+        (cost, obj), where obj is the GSObject to draw with that method, and cost is the
+        predicted time in the units of the DRAW_COST_* values.
+        """
+        nx = image.getXMax() - image.getXMin() + 1
+        ny = image.getYMax() - image.getYMin() + 1
+        npix = nx * ny
+        # The apply* methods change the class of a transformed Convolve to GSObject, so only
+        # trust the components if this is still a Convolve.
+        if isinstance(self, Convolve):
+            components = getattr(self, '_components', None)
+        else:
+            components = None
+        ncomp = len(components) if components else 1
+        options = {}
+
+        if self.isAnalyticX():
+            # SBProfile.draw will use plainDraw, so the native method is real space.
+            if isinstance(self, Convolve) and ncomp == 2:
+                cost = DRAW_COST_REAL_SPACE_CONV * npix
+            else:
+                cost = DRAW_COST_XVALUE * npix
+            options['real_space'] = (cost, self)
+        elif components and ncomp == 2 and all([ c.isAnalyticX() for c in components ]):
+            # A convolution of 2 components that are analytic in real space can also be done
+            # by real-space convolution.
+            cost = DRAW_COST_REAL_SPACE_CONV * npix
+            options['real_space'] = (cost, Convolve(components, real_space=True))
+
+        # Any object can be drawn with an FFT (using SBProfile.fourierDraw), as long as the
+        # FFT isn't too large.  This is the same FFT size calculation as SBProfile::fourierDraw.
+        N = max(self.SBProfile.getGoodImageSize(dx,wmult), nx, ny)
+        NFT = max(galsim.goodFFTSize(N), MIN_FFT_SIZE)
+        if NFT <= MAX_FFT_SIZE:
+            dk = 2.*np.pi / (NFT * dx)
+            if NFT*dk/2 > self.maxK():
+                Nk = NFT
+            else:
+                Nk = int(np.ceil(self.maxK()/dk)) * 2
+            # Only the kx >= 0 half plane is filled, and axisymmetric profiles only need
+            # one quadrant.
+            if self.isAxisymmetric():
+                nk = (Nk/2+1)**2
+            else:
+                nk = (Nk/2+1) * Nk
+            cost = (DRAW_COST_KVALUE * ncomp * nk + DRAW_COST_FFT * NFT**2 * np.log2(NFT)
+                    + npix)
+            options['fft'] = (cost, self)
+
+        # Photon shooting integrates over the pixel, so it only gives the same image if the
+        # object is a convolution that includes the pixel response.  Then we can shoot the
+        # convolution of the other components.  It also adds shot noise, so we only consider it
+        # if the caller has said how many photons to use or how much extra noise is acceptable.
+        if components and (n_photons > 0. or max_extra_noise > 0.):
+            others = [ c for c in components if not (
+                isinstance(c, Pixel) and c.getFlux() == 1. and
+                abs(c.getXWidth() - dx) < 1.e-8 * dx and abs(c.getYWidth() - dx) < 1.e-8 * dx) ]
+            if len(others) == ncomp-1 and len(others) > 0:
+                if len(others) == 1:
+                    phot_obj = others[0]
+                else:
+                    phot_obj = Convolve(others)
+                if n_photons > 0.:
+                    nphot = n_photons
+                else:
+                    flux = abs(phot_obj.getFlux())
+                    nphot = flux
+                    if max_extra_noise > 0.:
+                        # drawShoot stops adding photons once the noise in the brightest pixel
+                        # is below max_extra_noise.  Estimate the flux in that pixel from the
+                        # size of the object: stepK ~ pi/R for R the radius enclosing the flux.
+                        fmax = flux * min(1., 4. * (dx * self.stepK() / (2.*np.pi))**2)
+                        nphot = min(nphot, fmax * flux / max_extra_noise)
+                cost = DRAW_COST_PHOTON * len(others) * nphot + npix
+                options['phot'] = (cost, phot_obj)
+
+        return options
+
+    def estimateDrawCosts(self, image=None, dx=None, wmult=1., n_photons=0.,
+                          max_extra_noise=0.):
+        """Estimate the relative time each way of drawing this object would take.
+
+        This is the cost model that draw(method='auto') uses to pick how to draw the object.
+        The parameters have the same meaning as for draw() and drawShoot(), but the image is not
+        modified.
+
+        @returns  A dict whose keys are the available methods ('fft', 'real_space' and/or 
+                  'phot') and whose values are the predicted costs in arbitrary units.
+        """
+        # Use a scratch image with the same bounds and scale, so the input image isn't changed.
+        if image is not None:
+            scale = image.getScale()
+            if image.getBounds().isDefined():
+                image = galsim.ImageF(image.getBounds())
+            else:
+                image = galsim.ImageF()
+            image.setScale(scale)
+        image, dx = self._draw_setup_image(image,dx,float(wmult),False)
+        options = self._draw_options(image, dx, wmult, float(n_photons), float(max_extra_noise))
+        return dict([ (k, v[0]) for k, v in options.items() ])
+
     def draw(self, image=None, dx=None, gain=1., wmult=1., normalization="flux",
-             add_to_image=False):
+             add_to_image=False, method=None, n_photons=0., rng=None, max_extra_noise=0.):
         """Draws an Image of the object, with bounds optionally set by an input Image.
 
         The draw method is used to draw an Image of the GSObject, typically using Fourier space
@@ -599,6 +744,27 @@ class GSObject(object):
                              Note: This requires that image be provided (i.e. `image` is not `None`)
                              and that it have defined bounds (default `add_to_image = False`).
 
+        @param method  How to draw the object.  The default, `method = None`, uses real space if
+                       the object is analytic in real space and a Fourier transform otherwise.
+                       `method = 'auto'` predicts the time of each method that can draw the
+                       object (see estimateDrawCosts) and uses the fastest one.  You may also
+                       request a particular method with 'fft', 'real_space' or 'phot'.
+                       Real-space convolution is available for a Convolve of 2 components that
+                       are analytic in real space.  Photon shooting is available for a Convolve
+                       that includes a unit-flux Pixel of width `dx`.  The other components are
+                       then shot, since drawShoot includes the pixel response itself.  It is
+                       only considered by 'auto' if `n_photons` or `max_extra_noise` is given,
+                       since it adds shot noise to the image.  (Default `method = None`)
+
+        @param n_photons        If photon shooting is used, the number of photons to shoot.
+                                See drawShoot().  (Default `n_photons = 0.`)
+
+        @param rng              If photon shooting is used, the random number generator to use.
+                                See drawShoot().  (Default `rng = None`)
+
+        @param max_extra_noise  If photon shooting is used, the allowed extra noise in each pixel.
+                                See drawShoot().  (Default `max_extra_noise = 0.`)
+
         @returns      The drawn image.
         """
         # Raise an exception immediately if the normalization type is not recognized
@@ -606,6 +772,10 @@ class GSObject(object):
             raise ValueError(("Invalid normalization requested: '%s'. Expecting one of 'flux', "+
                               "'f', 'surface brightness' or 'sb'.") % normalization)
 
+        if method is not None and method not in ("auto", "fft", "real_space", "phot"):
+            raise ValueError(("Invalid method requested: '%s'. Expecting one of 'auto', "+
+                              "'fft', 'real_space' or 'phot'.") % method)
+
         # Make sure the type of gain is correct and has a valid value:
         if type(gain) != float:
             gain = float(gain)
@@ -615,6 +785,27 @@ class GSObject(object):
         # Make sure image is setup correctly
         image, dx = self._draw_setup_image(image,dx,wmult,add_to_image)
 
+        obj = self
+        if method is not None:
+            options = self._draw_options(image, dx, wmult, float(n_photons),
+                                         float(max_extra_noise))
+            if not options:
+                raise ValueError(
+                    "No method is available for drawing this object: the FFT would be larger "+
+                    "than %d and it cannot be drawn in real space or by photon shooting."%(
+                    MAX_FFT_SIZE))
+            if method == "auto":
+                method = min(options, key=lambda k: options[k][0])
+            elif method not in options:
+                raise ValueError("Method '%s' is not available for drawing this object"%method)
+            obj = options[method][1]
+            if method == "phot":
+                # The image is already set up, so just add the photons to it.
+                return obj.drawShoot(image, dx=dx, gain=gain, wmult=wmult,
+                                     normalization=normalization, add_to_image=True,
+                                     n_photons=n_photons, rng=rng,
+                                     max_extra_noise=max_extra_noise)
+
         # SBProfile draw command uses surface brightness normalization.  So if we
         # want flux normalization, we need to scale the flux by dx^2
         if normalization.lower() == "flux" or normalization.lower() == "f":
@@ -623,13 +814,16 @@ class GSObject(object):
             # multiply the ADU by dx^2.  i.e. divide gain by dx^2.
             gain /= dx**2
 
-        image.added_flux = self.SBProfile.draw(image.view(), gain, wmult)
+        if method == "fft":
+            image.added_flux = obj.SBProfile.fourierDraw(image.view(), gain, wmult)
+        else:
+            image.added_flux = obj.SBProfile.draw(image.view(), gain, wmult)
 
         return image
 
     def drawShoot(self, image=None, dx=None, gain=1., wmult=1., normalization="flux",
                   add_to_image=False, n_photons=0., rng=None,
-                  max_extra_noise=0., poisson_flux=None):
+                  max_extra_noise=0., poisson_flux=None, n_threads=1):
         """Draw an image of the object by shooting individual photons drawn from the surface 
         brightness profile of the object.
 
@@ -734,6 +928,15 @@ class GSObject(object):
                                 `poisson_flux = True` unless n_photons is given, in which case
                                 the default is `poisson_flux = False`).
 
+        @param n_threads        The number of threads to use for shooting the photons.  Each 
+                                  thread gets its own random number generator, seeded from `rng`,
+                                  and its own copy of the image, so the result for a given `rng`
+                                  seed and `n_threads` is always the same.  (It is different from
+                                  the result with `n_threads = 1` though.)  This is ignored if 
+                                  `max_extra_noise > 0`.  The threads only run in parallel if
+                                  GalSim was compiled with WITH_OPENMP=true.
+                                (Default `n_threads = 1`)
+
         @returns      The drawn image.
         """
 
@@ -790,7 +993,8 @@ class GSObject(object):
 
         try:
             image.added_flux = self.SBProfile.drawShoot(
-                image.view(), n_photons, uniform_deviate, gain, max_extra_noise, poisson_flux)
+                image.view(), n_photons, uniform_deviate, gain, max_extra_noise, poisson_flux,
+                int(n_threads))
         except RuntimeError:
             raise RuntimeError(
                 "Unable to drawShoot from this GSObject, perhaps it contains an SBDeconvolve "+
@@ -873,6 +1077,90 @@ class GSObject(object):
         return re,im
 
 
+def drawBatch(objs, images=None, dx=None, gain=1., wmult=1., normalization="flux",
+              add_to_image=False):
+    """Draw a list of GSObjects onto a list of images in a single call.
+
+    This is equivalent to
+
+        images = [ obj.draw(image, dx=dx, gain=gain, wmult=wmult, normalization=normalization,
+                            add_to_image=add_to_image) for obj, image in zip(objs, images) ]
+
+    but all of the actual drawing is done in one C++ call, which releases the Python GIL while
+    it runs.  This saves the per-object overhead of going back and forth between Python and C++
+    when drawing many small stamps, and it lets other Python threads keep working in the meantime.
+
+    Each image is set up exactly as it would be by draw(), so an image may be None or have
+    undefined bounds, in which case an automatically-sized ImageF is used.  On return, each image
+    has its `added_flux` attribute set, just as for draw().
+
+    @param objs           A list of GSObjects to draw.
+    @param images         A list of images (or None) to draw onto, one per object.
+                          (Default `images = None` means use None for each object.)
+    @param dx             The pixel scale to use for all the images.  See draw() for details.
+                          (Default `dx = None`)
+    @param gain           The number of photons per ADU.  (Default `gain = 1.`)
+    @param wmult          A factor by which to make intermediate images larger than normal.
+                          (Default `wmult = 1.`)
+    @param normalization  Either "flux" ("f") or "surface brightness" ("sb").
+                          (Default `normalization = "flux"`)
+    @param add_to_image   Whether to add to the existing images rather than clearing them first.
+                          (Default `add_to_image = False`)
+
+    @returns      The list of drawn images.
+    """
+    if images is None:
+        images = [ None ] * len(objs)
+    elif len(images) != len(objs):
+        raise ValueError("objs and images must have the same length in drawBatch")
+
+    if not normalization.lower() in ("flux", "f", "surface brightness", "sb"):
+        raise ValueError(("Invalid normalization requested: '%s'. Expecting one of 'flux', "+
+                          "'f', 'surface brightness' or 'sb'.") % normalization)
+    flux_norm = normalization.lower() in ("flux", "f")
+
+    if type(gain) != float:
+        gain = float(gain)
+    if gain <= 0.:
+        raise ValueError("Invalid gain <= 0. in drawBatch command")
+
+    # Do all the Python-level setup first, then draw everything in one C++ call.
+    images = list(images)
+    profiles = []
+    views = []
+    gains = []
+    for i, obj in enumerate(objs):
+        images[i], obj_dx = obj._draw_setup_image(images[i],dx,wmult,add_to_image)
+        profiles.append(obj.SBProfile)
+        views.append(images[i].view())
+        if flux_norm:
+            gains.append(gain / obj_dx**2)
+        else:
+            gains.append(gain)
+
+    fluxes = galsim._galsim._drawBatch(profiles, views, gains, float(wmult))
+    for image, flux in zip(images, fluxes):
+        image.added_flux = flux
+
+    return images
+
+
+def _value_arrays(x, y):
+    """Convert x, y to contiguous 2-d float64 arrays of the same shape for SBProfile.xValues or
+    SBProfile.kValues.
+
+    @returns x, y, shape   where shape is the shape the output should be given.
+    """
+    x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+    shape = x.shape
+    if x.ndim >= 2:
+        shape2d = (int(np.prod(shape[:-1])), shape[-1])
+    else:
+        shape2d = (1, x.size)
+    x = np.ascontiguousarray(x).reshape(shape2d)
+    y = np.ascontiguousarray(y).reshape(shape2d)
+    return x, y, shape
+
 
 # --- Now defining the derived classes ---
 #
@@ -2062,6 +2350,13 @@ class RealGalaxy(GSObject):
                                 `pad_image = None`.)
     @param use_cache            Specify whether to cache noise_pad read in from a file to save
                                 having to build an ImageCorrFunc repeatedly from the same image.
+                                Also, when neither `noise_pad` nor `pad_image` is used, the
+                                interpolated galaxy and PSF images are cached with the
+                                `real_galaxy_catalog`, so that later RealGalaxy objects made from the
+                                same entry with the same interpolants and `pad_factor` reuse their
+                                setup (including the photon-shooting index of `original_image`).
+                                Only the 10 most recently used entries are kept, and only when the
+                                interpolants are given by name or left as the default.
                                 (Default `use_cache = True`)
 
     Methods
@@ -2111,12 +2406,73 @@ class RealGalaxy(GSObject):
         else:
             raise AttributeError('No method specified for selecting a galaxy!')
 
+        # handle noise-padding options
+        try:
+            noise_pad = galsim.config.value._GetBoolValue(noise_pad,'')
+        except:
+            pass
+
+        # save any other relevant information as instance attributes
+        self.catalog_file = real_galaxy_catalog.file_name
+        self.index = use_index
+        self.pixel_scale = float(real_galaxy_catalog.pixel_scale[use_index])
+
+        # If the padding is not random, the interpolated images depend only on the catalog entry
+        # and the interpolation options, so they can be cached with the catalog.  The cached
+        # objects keep the results of their setup, such as the k-space table and the
+        # photon-shooting index, so repeated draws of the same galaxy skip that work.  We look in
+        # the cache before reading the images, so a cached entry doesn't need any I/O.
+        cache_key = None
+        if use_cache and not noise_pad and pad_image is None:
+            # Interpolants given by name are compared by name, ignoring case.  Interpolant objects
+            # can't be compared with each other, so objects that use them are not cached.
+            interp_names = []
+            for interp in (x_interpolant, k_interpolant):
+                if interp is None or isinstance(interp, basestring):
+                    interp_names.append(interp and interp.lower())
+            if len(interp_names) == 2:
+                cache_key = (use_index, interp_names[0], interp_names[1], float(pad_factor))
+        cached = None
+        if cache_key is not None:
+            cached = real_galaxy_catalog._getInterpolated(cache_key)
+
+        if cached is not None:
+            (self.original_image, self.original_PSF,
+             self.x_interpolant, self.k_interpolant) = cached
+            self.pad_variance = 0.
+        else:
+            self._buildInterpolatedImages(real_galaxy_catalog, rng, x_interpolant, k_interpolant,
+                                          pad_factor, noise_pad, pad_image, use_cache)
+            if cache_key is not None:
+                real_galaxy_catalog._setInterpolated(cache_key, (
+                    self.original_image, self.original_PSF, self.x_interpolant, self.k_interpolant))
+
+        # Use copies, which share the cached setup, since setFlux changes them in place.
+        self.original_image = galsim.SBInterpolatedImage(self.original_image)
+        self.original_PSF = galsim.SBInterpolatedImage(self.original_PSF)
+
+        if flux != None:
+            self.original_image.setFlux(flux)
+            self.original_image.__class__ = galsim.SBTransform # correctly reflect SBProfile change
+        self.original_PSF.setFlux(1.0)
+        self.original_PSF.__class__ = galsim.SBTransform # correctly reflect SBProfile change
+
+        # Calculate the PSF "deconvolution" kernel
+        psf_inv = galsim.SBDeconvolve(self.original_PSF)
+        # Initialize the SBProfile attribute
+        GSObject.__init__(self, galsim.SBConvolve([self.original_image, psf_inv]))
+
+    def _buildInterpolatedImages(self, real_galaxy_catalog, rng, x_interpolant, k_interpolant,
+                                 pad_factor, noise_pad, pad_image, use_cache):
+        """Internal function to read in the galaxy and PSF images of the catalog entry, pad them,
+        and make the original_image and original_PSF attributes.
+        """
         # read in the galaxy, PSF images; for now, rely on pyfits to make I/O errors. Should
         # consider exporting this code into fits.py in some function that takes a filename and HDU,
         # and returns an ImageView
 
-        gal_image = real_galaxy_catalog.getGal(use_index)
-        PSF_image = real_galaxy_catalog.getPSF(use_index)
+        gal_image = real_galaxy_catalog.getGal(self.index)
+        PSF_image = real_galaxy_catalog.getPSF(self.index)
 
         # choose proper interpolant
         if x_interpolant is None:
@@ -2129,13 +2485,6 @@ class RealGalaxy(GSObject):
         else:
             self.k_interpolant = galsim.utilities.convert_interpolant_to_2d(k_interpolant)
 
-        # read in data about galaxy from FITS binary table; store as normal attributes of RealGalaxy
-
-        # save any other relevant information as instance attributes
-        self.catalog_file = real_galaxy_catalog.file_name
-        self.index = use_index
-        self.pixel_scale = float(real_galaxy_catalog.pixel_scale[use_index])
-
         # handle padding by an image
         specify_size = False
         padded_size = gal_image.getPaddedSize(pad_factor)
@@ -2168,12 +2517,8 @@ class RealGalaxy(GSObject):
                 pad_image = galsim.ImageD(padded_size, padded_size)
 
         # handle noise-padding options
-        try:
-            noise_pad = galsim.config.value._GetBoolValue(noise_pad,'')
-        except:
-            pass
         if noise_pad:
-            self.pad_variance= float(real_galaxy_catalog.variance[use_index])
+            self.pad_variance= float(real_galaxy_catalog.variance[self.index])
 
             # Check, is it "True" or something else?  If True, we use Gaussian uncorrelated noise
             # using the stored variance in the catalog.  Otherwise, if it's an ImageCorrFunc we use
@@ -2186,7 +2531,7 @@ class RealGalaxy(GSObject):
                     cf = galsim.ImageCorrFunc(noise_pad)
                 elif use_cache and noise_pad in RealGalaxy._cache_noise_pad:
                     cf = RealGalaxy._cache_noise_pad[noise_pad]
-                    cf.scaleVariance(real_galaxy_catalog.variance[use_index] /
+                    cf.scaleVariance(real_galaxy_catalog.variance[self.index] /
                                      RealGalaxy._cache_variance[noise_pad])
                 elif isinstance(noise_pad, str):
                     try:
@@ -2261,24 +2606,14 @@ class RealGalaxy(GSObject):
         # also make the original PSF image, with far less fanfare: we don't need to pad with
         # anything interesting.
         self.original_PSF = galsim.SBInterpolatedImage(
-            PSF_image, xInterp=self.x_interpolant, kInterp=self.k_interpolant, dx=self.pixel_scale)
+            PSF_image, xInterp=self.x_interpolant, kInterp=self.k_interpolant,
+            dx=self.pixel_scale)
 
         # recalculate Fourier-space attributes rather than using overly-conservative defaults
         self.original_image.calculateStepK()
         self.original_image.calculateMaxK()
         self.original_PSF.calculateStepK()
         self.original_PSF.calculateMaxK()
-        
-        if flux != None:
-            self.original_image.setFlux(flux)
-            self.original_image.__class__ = galsim.SBTransform # correctly reflect SBProfile change
-        self.original_PSF.setFlux(1.0)
-        self.original_PSF.__class__ = galsim.SBTransform # correctly reflect SBProfile change
-
-        # Calculate the PSF "deconvolution" kernel
-        psf_inv = galsim.SBDeconvolve(self.original_PSF)
-        # Initialize the SBProfile attribute
-        GSObject.__init__(self, galsim.SBConvolve([self.original_image, psf_inv]))
 
     def getHalfLightRadius(self):
         raise NotImplementedError("Half light radius calculation not implemented for RealGalaxy "
@@ -2401,6 +2736,10 @@ class Convolve(GSObject):
         if len(args) == 1 and isinstance(args[0], list):
             args = args[0]
 
+        # Keep copies of the components, so draw(method='auto') can consider other ways to draw
+        # this.  They need to be copies, since the apply* methods change objects in place.
+        self._components = [ obj.copy() for obj in args ]
+
         hard_edge = True
         for obj in args:
             if not obj.hasHardEdges():
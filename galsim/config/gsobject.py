@@ -33,6 +33,75 @@ valid_gsobject_types = {
     'RealGalaxy' : '_BuildRealGalaxy',
 }
 
+# The build function for each type in valid_gsobject_types.  These are looked up the first 
+# time each type is used.
+_build_funcs = {}
+
+# Very rough estimates of the relative time it takes to draw each type of object.  These are 
+# only used to divide up the work among multiple processes, so they don't need to be accurate.
+# Types that aren't listed here are taken to have cost = 1.
+gsobject_costs = {
+    'None' : 0.,
+    'Gaussian' : 1.,
+    'Pixel' : 1.,
+    'Exponential' : 2.,
+    'Moffat' : 3.,
+    'Airy' : 5.,
+    'Kolmogorov' : 5.,
+    'Sersic' : 10.,
+    'DeVaucouleurs' : 20.,
+    'OpticalPSF' : 20.,
+    'RealGalaxy' : 100.,
+}
+
+def EstimateGSObjectCost(config, key, base):
+    """@brief Estimate the relative cost of drawing the object in config[key].
+
+    This only looks at the types in the config dict (plus a few constant parameters), so it 
+    is much faster than building the object, and it doesn't change anything in the config.
+    base['seq_index'] should be set to the obj_num of the object in question, since that 
+    is used to figure out which item of a List will be used.
+
+    @returns cost
+    """
+    if isinstance(config,list):
+        if not (0 <= key < len(config)):
+            return 0.
+    elif key not in config:
+        return 0.
+    ck = config[key]
+    if not isinstance(ck,dict) or 'type' not in ck:
+        return 1.
+    type = ck['type']
+
+    if type in [ 'Add', 'Sum', 'Convolve', 'Convolution' ]:
+        items = ck.get('items',[])
+        return sum([ EstimateGSObjectCost(items, i, base) for i in range(len(items)) ])
+    elif type == 'List':
+        items = ck.get('items',[])
+        if len(items) == 0:
+            return 1.
+        index = ck.get('index',None)
+        if ( index is None or (isinstance(index,dict) and index.get('type') == 'Sequence' and
+                               set(index.keys()) <= set(['type','nitems'])) ):
+            # This is the default index, which just cycles through the items.
+            return EstimateGSObjectCost(items, base['seq_index'] % len(items), base)
+        elif isinstance(index,int) and index >= 0 and index < len(items):
+            return EstimateGSObjectCost(items, index, base)
+        else:
+            # Otherwise, just use the mean cost of the items.
+            costs = [ EstimateGSObjectCost(items, i, base) for i in range(len(items)) ]
+            return sum(costs) / len(costs)
+    elif type == 'Ring':
+        # The rotated copies take just as long to draw as the first one.
+        return EstimateGSObjectCost(ck, 'first', base)
+    elif type == 'Sersic' and isinstance(ck.get('n',None),(int,float)):
+        # Larger n profiles need much larger FFTs.
+        return gsobject_costs['Sersic'] * max(ck['n'],0.5) / 2.
+    else:
+        return gsobject_costs.get(type, 1.)
+
+
 class SkipThisObject(Exception):
     """
     A class that a builder can throw to indicate that nothing went wrong, but for some
@@ -147,7 +216,9 @@ def BuildGSObject(config, key, base=None):
 
     # See if this type has a specialized build function:
     if type in valid_gsobject_types:
-        build_func = eval(valid_gsobject_types[type])
+        if type not in _build_funcs:
+            _build_funcs[type] = eval(valid_gsobject_types[type])
+        build_func = _build_funcs[type]
         gsobject, safe = build_func(ck, key, base, ignore)
     # Next, we check if this name is in the galsim dictionary.
     elif type in galsim.__dict__:
@@ -387,7 +458,7 @@ def _BuildSimple(config, key, base, ignore):
     type = config['type']
     try:
         if type in galsim.__dict__:
-            init_func = eval("galsim."+type)
+            init_func = galsim.__dict__[type]
         else:
             init_func = eval(type)
     except:
@@ -37,25 +37,6 @@ def BuildImages(nimages, config, logger=None, image_num=0, obj_num=0, nproc=1,
     @return (images, psf_images, weight_images, badpix_images)  (All in tuple are lists)
     """
     import time
-    def worker(input, output):
-        for (kwargs, config, image_num, obj_num, nim, info) in iter(input.get, 'STOP'):
-            results = []
-            # Make new copies of config and kwargs so we can update them without
-            # clobbering the versions for other tasks on the queue.
-            import copy
-            kwargs1 = copy.copy(kwargs)
-            config1 = copy.deepcopy(config)
-            for i in range(nim):
-                t1 = time.time()
-                kwargs1['config'] = config1
-                kwargs1['image_num'] = image_num + i
-                kwargs1['obj_num'] = obj_num
-                im = BuildImage(**kwargs1)
-                obj_num += galsim.config.GetNObjForImage(config, image_num+i)
-                t2 = time.time()
-                results.append( [im[0], im[1], im[2], im[3], t2-t1 ] )
-            output.put( (results, info, current_process().name) )
-    
     # The kwargs to pass to BuildImage
     kwargs = {
         'make_psf_image' : make_psf_image,
@@ -87,8 +68,6 @@ def BuildImages(nimages, config, logger=None, image_num=0, obj_num=0, nproc=1,
                 "config.image.nproc <= 0, but unable to determine number of cpus.")
     
     if nproc > 1:
-        from multiprocessing import Process, Queue, current_process
-
         # Initialize the images list to have the correct size.
         # This is important here, since we'll be getting back images in a random order,
         # and we need them to go in the right places (in order to have deterministic
@@ -99,10 +78,10 @@ def BuildImages(nimages, config, logger=None, image_num=0, obj_num=0, nproc=1,
         badpix_images = [ None for i in range(nimages) ]
 
         # Number of images to do in each task:
-        # At most nimages / nproc.
-        # At least 1 normally, but number in Ring if doing a Ring test
-        # Shoot for gemoetric mean of these two.
-        max_nim = nimages / nproc
+        # At least 1 normally, but number in Ring if doing a Ring test.
+        # The images can take very different amounts of time to build, so we use an estimate
+        # of the cost of each image to make chunks that start out big and get smaller 
+        # towards the end.
         min_nim = 1
         #print 'gal' in config
         if ( ('image' not in config or 'type' not in config['image'] or 
@@ -111,69 +90,58 @@ def BuildImages(nimages, config, logger=None, image_num=0, obj_num=0, nproc=1,
              config['gal']['type'] == 'Ring' and 'num' in config['gal'] ):
             min_nim = galsim.config.ParseValue(config['gal'], 'num', config, int)[0]
             #print 'Found ring: num = ',min_nim
-        if max_nim < min_nim: 
-            nim_per_task = min_nim
-        else:
-            import math
-            # This formula keeps nim a multiple of min_nim, so Rings are intact.
-            nim_per_task = min_nim * int(math.sqrt(float(max_nim) / float(min_nim)))
-        #print 'nim_per_task = ',nim_per_task
+
+        # The cost of each image is the total cost of the objects on it.
+        costs = []
+        obj_nums = []
+        for k in range(nimages):
+            obj_nums.append(obj_num)
+            nobj = galsim.config.GetNObjForImage(config, image_num+k)
+            costs.append(sum([ galsim.config.EstimateStampCost(config, obj_num+i) 
+                               for i in range(nobj) ]))
+            obj_num += nobj
+        # This keeps the number in each chunk a multiple of min_nim, so Rings are intact.
+        chunks = galsim.config.MakeTaskChunks(costs, nproc, min_nim)
 
         # Set up the task list
-        task_queue = Queue()
-        for k in range(0,nimages,nim_per_task):
-            # Send kwargs, config, im_num, nim, k
-            if k + nim_per_task > nimages:
-                task_queue.put( ( kwargs, config, image_num+k, obj_num, nimages-k, k ) )
-            else:
-                task_queue.put( ( kwargs, config, image_num+k, obj_num, nim_per_task, k ) )
-            for i in range(nim_per_task):
-                obj_num += galsim.config.GetNObjForImage(config, image_num+k+i)
+        # The input objects that don't change get rebuilt in the workers (normally from their 
+        # input cache), so we don't need to pickle them for each task.
+        shared_config = galsim.config.RemoveSharedInputs(config)
+        tasks = []
+        for (k, nim) in chunks:
+            task_kwargs = { 'kwargs' : kwargs, 'config' : shared_config, 
+                            'image_num' : image_num+k, 'obj_num' : obj_nums[k], 'nim' : nim }
+            tasks.append( (_BuildImagesTask, task_kwargs, k) )
 
         # Run the tasks
-        # Each Process command starts up a parallel process that will keep checking the queue 
-        # for a new task. If there is one there, it grabs it and does it. If not, it waits 
-        # until there is one to grab. When it finds a 'STOP', it shuts down. 
-        done_queue = Queue()
-        p_list = []
-        for j in range(nproc):
-            p = Process(target=worker, args=(task_queue, done_queue), name='Process-%d'%(j+1))
-            p.start()
-            p_list.append(p)
-
-        # In the meanwhile, the main process keeps going.  We pull each set of images off of the 
-        # done_queue and put them in the appropriate place in the lists.
-        # This loop is happening while the other processes are still working on their tasks.
-        # You'll see that these logging statements get print out as the stamp images are still 
-        # being drawn.  
-        for i in range(0,nimages,nim_per_task):
-            results, k, proc = done_queue.get()
-            for result in results:
-                images[k] = result[0]
-                psf_images[k] = result[1]
-                weight_images[k] = result[2]
-                badpix_images[k] = result[3]
-                if logger:
-                    # Note: numpy shape is y,x
-                    ys, xs = result[0].array.shape
-                    t = result[4]
-                    logger.info('%s: Image %d: size = %d x %d, time = %f sec', 
-                                proc, image_num+k, xs, ys, t)
-                k += 1
-
-        # Stop the processes
-        # The 'STOP's could have been put on the task list before starting the processes, or you
-        # can wait.  In some cases it can be useful to clear out the done_queue (as we just did)
-        # and then add on some more tasks.  We don't need that here, but it's perfectly fine to do.
-        # Once you are done with the processes, putting nproc 'STOP's will stop them all.
-        # This is important, because the program will keep running as long as there are running
-        # processes, even if the main process gets to the end.  So you do want to make sure to 
-        # add those 'STOP's at some point!
-        for j in range(nproc):
-            task_queue.put('STOP')
-        for j in range(nproc):
-            p_list[j].join()
-        task_queue.close()
+        # The worker pool has a set of parallel processes that keep checking the task queue
+        # for a new task. If there is one there, a worker grabs it and does it. If not, it waits 
+        # until there is one to grab.  If we are being run from within galsim.config.Process,
+        # then the pool (and its processes) will be reused for the next call, so we don't
+        # pay the start up cost each time.
+        pool = galsim.config.AcquireWorkerPool(nproc)
+        try:
+            # In the meanwhile, the main process keeps going.  We pull each set of images off 
+            # of the done queue and put them in the appropriate place in the lists.
+            # This loop is happening while the other processes are still working on their
+            # tasks.  You'll see that these logging statements get print out as the stamp
+            # images are still being drawn.  
+            for results, k, proc in pool.run(tasks):
+                for result in results:
+                    images[k] = result[0]
+                    psf_images[k] = result[1]
+                    weight_images[k] = result[2]
+                    badpix_images[k] = result[3]
+                    if logger:
+                        # Note: numpy shape is y,x
+                        ys, xs = result[0].array.shape
+                        t = result[4]
+                        logger.info('%s: Image %d: size = %d x %d, time = %f sec', 
+                                    proc, image_num+k, xs, ys, t)
+                    k += 1
+        finally:
+            # If this was the only user of the pool, this stops the processes.
+            galsim.config.ReleaseWorkerPool()
 
     else : # nproc == 1
 
@@ -206,6 +174,271 @@ def BuildImages(nimages, config, logger=None, image_num=0, obj_num=0, nproc=1,
     return images, psf_images, weight_images, badpix_images
  
 
+def _BuildImagesTask(kwargs, config, image_num, obj_num, nim):
+    """
+    The function that a WorkerPool process runs to build nim consecutive images.
+
+    @return a list of [image, psf_image, weight_image, badpix_image, time] for each image.
+    """
+    import time
+    results = []
+    # Make new copies of config and kwargs so we can update them without
+    # clobbering the versions for other tasks on the queue.
+    import copy
+    kwargs1 = copy.copy(kwargs)
+    config1 = galsim.config.CopyConfig(config)
+    galsim.config.RestoreSharedInputs(config1)
+    for i in range(nim):
+        t1 = time.time()
+        kwargs1['config'] = config1
+        kwargs1['image_num'] = image_num + i
+        kwargs1['obj_num'] = obj_num
+        im = BuildImage(**kwargs1)
+        obj_num += galsim.config.GetNObjForImage(config, image_num+i)
+        t2 = time.time()
+        results.append( [im[0], im[1], im[2], im[3], t2-t1 ] )
+    return results
+
+
+class Canvas(object):
+    """
+    The full images for a Tiled or Scattered image, into which the stamps are added as soon
+    as they are built.
+
+    This is what BuildTiledImage and BuildScatteredImage use when image.stream = True.
+    Normally, all the stamps (and the psf, weight and badpix stamps) are kept in memory until
+    they have all been built, and then they are added into the full image.  For a very large
+    number of objects, this can use a lot of memory.  With a Canvas, each stamp is added 
+    into the full images when it is done and then dropped, so the memory doesn't grow with
+    the number of objects.
+
+    @param xsize        The x size of the full images.
+    @param ysize        The y size of the full images.
+    @param pixel_scale  The pixel scale of the full images.
+    @param make_psf_image      Whether to make psf_image.
+    @param make_weight_image   Whether to make weight_image.
+    @param make_badpix_image   Whether to make badpix_image.
+    @param tile_bounds  If given, a list of the bounds for each stamp in the full image
+                        (for Tiled images).  Otherwise, each stamp is added using its own bounds.
+
+    The full images are available as the attribute images, which is a list
+    [ image, psf_image, weight_image, badpix_image ], where the last three may be None.
+    """
+    # Whether the worker processes can add their stamps directly into this canvas.
+    shared = False
+
+    def __init__(self, xsize, ysize, pixel_scale, 
+                 make_psf_image=False, make_weight_image=False, make_badpix_image=False,
+                 tile_bounds=None):
+        self.bounds = galsim.BoundsI(1,xsize,1,ysize)
+        self.tile_bounds = tile_bounds
+        self.images = []
+        for (make, image_type) in [ (True, galsim.ImageF), (make_psf_image, galsim.ImageF),
+                                    (make_weight_image, galsim.ImageF),
+                                    (make_badpix_image, galsim.ImageS) ]:
+            if make:
+                im = image_type(xsize,ysize)
+                im.setZero()
+                im.setScale(pixel_scale)
+                self.images.append(im)
+            else:
+                self.images.append(None)
+
+    def addStamp(self, k, stamps):
+        """Add the stamp images for object k to the full images.
+
+        @param k        The index of the stamp (only used for Tiled images).
+        @param stamps   The stamp images (image, psf_image, weight_image, badpix_image).
+
+        @returns whether any of the stamp fell on the full image.
+        """
+        if self.tile_bounds:
+            bounds = self.tile_bounds[k]
+        else:
+            bounds = stamps[0].bounds & self.bounds
+            if not bounds.isDefined():
+                return False
+        self._add(bounds, stamps)
+        return True
+
+    def _add(self, bounds, stamps):
+        for i in range(4):
+            im = self.images[i]
+            stamp = stamps[i]
+            if im is None or stamp is None:
+                continue
+            if not self.tile_bounds:
+                stamp = stamp[bounds]
+            if i == 3:
+                # The badpix image is a bit mask, so combine with | rather than +.
+                im[bounds] |= stamp
+            else:
+                im[bounds] += stamp
+
+    def release(self):
+        """Release any resources used in a worker process.  (Nothing to do here.)
+        """
+        pass
+
+    def close(self):
+        """Release any resources used once all the stamps are done.  (Nothing to do here.)
+        """
+        pass
+
+
+class SharedCanvas(Canvas):
+    """
+    A Canvas whose images live in a memory-mapped file, so that the worker processes can add 
+    their stamps directly into them.
+
+    This is what BuildTiledImage and BuildScatteredImage use when image.shared_canvas = True
+    or when image.canvas_dir is set.  Rather than sending the pixels for every stamp back to 
+    the main process through a Queue, which can become the bottleneck for large fields with 
+    many stamps, each worker adds its stamps straight into the full images.
+
+    By default, the file is a temporary file in /dev/shm (if available), so the pixels are 
+    really just in shared memory.  If dir is given, the file goes there instead.  Then
+    the full images don't need to fit in memory at all, since the OS pages them to and
+    from disk as needed.
+
+    The worker processes open the file by name.  Since stamps can overlap, the images are 
+    split into bands of rows, and a process takes a lock (an fcntl lock on the file) on all 
+    the bands that a stamp touches before adding it in.
+
+    @param xsize        The x size of the full images.
+    @param ysize        The y size of the full images.
+    @param pixel_scale  The pixel scale of the full images.
+    @param make_psf_image      Whether to make psf_image.
+    @param make_weight_image   Whether to make weight_image.
+    @param make_badpix_image   Whether to make badpix_image.
+    @param tile_bounds  If given, a list of the bounds for each stamp in the full image
+                        (for Tiled images).  Otherwise, each stamp is added using its own bounds.
+    @param band_size    The number of rows in each band. (default = 64)
+    @param dir          The directory in which to put the file. (default = None, which means
+                        /dev/shm if available, or else the system's default temporary directory)
+    """
+    shared = True
+
+    def __init__(self, xsize, ysize, pixel_scale, 
+                 make_psf_image=False, make_weight_image=False, make_badpix_image=False,
+                 tile_bounds=None, band_size=64, dir=None):
+        import os, tempfile
+        import numpy
+        self.bounds = galsim.BoundsI(1,xsize,1,ysize)
+        self.tile_bounds = tile_bounds
+        self.band_size = max(band_size, 1)
+
+        # Figure out where each image goes in the file.
+        self.layout = []
+        nbytes = 0
+        for (make, dtype) in [ (True, numpy.float32), (make_psf_image, numpy.float32),
+                               (make_weight_image, numpy.float32),
+                               (make_badpix_image, numpy.int16) ]:
+            if make:
+                dtype = numpy.dtype(dtype)
+                self.layout.append( (nbytes, dtype, pixel_scale) )
+                nbytes += dtype.itemsize * xsize * ysize
+                # Keep each image 8-byte aligned.
+                nbytes += -nbytes % 8
+            else:
+                self.layout.append(None)
+
+        if dir is None and os.path.isdir('/dev/shm'):
+            dir = '/dev/shm'
+        elif dir and not os.path.isdir(dir):
+            os.mkdir(dir)
+        fd, self.file_name = tempfile.mkstemp(prefix='galsim_canvas_', dir=dir)
+        # This makes a sparse file full of zeros, so we don't need to zero the images.
+        os.ftruncate(fd, max(nbytes,1))
+        os.close(fd)
+        self._fd = None
+        self.images = self._open()
+
+    def _open(self):
+        """Map the file into memory, returning the images that use it.
+        """
+        import os
+        import numpy
+        self._fd = os.open(self.file_name, os.O_RDWR)
+        shape = (self.bounds.ymax, self.bounds.xmax)
+        images = []
+        for item in self.layout:
+            if item is None:
+                images.append(None)
+            else:
+                offset, dtype, scale = item
+                array = numpy.memmap(self.file_name, dtype=dtype, mode='r+', offset=offset, 
+                                     shape=shape)
+                im = galsim.ImageView[dtype.type](array, 1, 1)
+                im.setScale(scale)
+                images.append(im)
+        return images
+
+    def __getstate__(self):
+        # Only send the information about how to open the file, not the images themselves.
+        d = self.__dict__.copy()
+        d['_fd'] = None
+        d['images'] = None
+        return d
+
+    def _add(self, bounds, stamps):
+        import fcntl
+        if self.images is None:
+            # We are in a worker process, so we need to open the file first.
+            self.images = self._open()
+
+        # Lock all the bands that this stamp touches.  They are always locked in increasing 
+        # order, so we can't deadlock.
+        band1 = (bounds.ymin - self.bounds.ymin) / self.band_size
+        nbands = (bounds.ymax - self.bounds.ymin) / self.band_size - band1 + 1
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, nbands, band1)
+        try:
+            Canvas._add(self, bounds, stamps)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, nbands, band1)
+
+    def release(self):
+        """Close this worker process's handle on the file.
+        """
+        import os
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self.images = None
+
+    def close(self):
+        """Remove the file.  The images in the main process are still valid after this.
+        """
+        import os
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        if os.path.exists(self.file_name):
+            os.remove(self.file_name)
+
+
+def _MakeCanvas(params, nproc, xsize, ysize, pixel_scale, 
+                make_psf_image, make_weight_image, make_badpix_image,
+                tile_bounds=None, band_size=64):
+    """
+    Make the Canvas to use for a Tiled or Scattered image according to the image.stream, 
+    image.shared_canvas and image.canvas_dir parameters.
+
+    @returns the Canvas, or None if the stamps should be added in the usual way.
+    """
+    kwargs = { 'xsize' : xsize, 'ysize' : ysize, 'pixel_scale' : pixel_scale,
+               'make_psf_image' : make_psf_image, 'make_weight_image' : make_weight_image,
+               'make_badpix_image' : make_badpix_image, 'tile_bounds' : tile_bounds }
+    if 'canvas_dir' in params:
+        return SharedCanvas(band_size=band_size, dir=params['canvas_dir'], **kwargs)
+    elif params.get('shared_canvas',False) and nproc != 1:
+        return SharedCanvas(band_size=band_size, **kwargs)
+    elif params.get('stream',False):
+        return Canvas(**kwargs)
+    else:
+        return None
+
+
 def BuildImage(config, logger=None, image_num=0, obj_num=0,
                make_psf_image=False, make_weight_image=False, make_badpix_image=False):
     """
@@ -358,7 +591,7 @@ def BuildTiledImage(config, logger=None, image_num=0, obj_num=0,
             'border' : int , 'xborder' : int , 'yborder' : int ,
             'pixel_scale' : float , 'nproc' : int ,
             'sky_level' : float, 'sky_level_pixel' : float,
-            'order' : str }
+            'order' : str , 'stream' : bool , 'shared_canvas' : bool , 'canvas_dir' : str }
     params = galsim.config.GetAllParams(
         config['image'], 'image', config, req=req, opt=opt, ignore=ignore)[0]
 
@@ -471,64 +704,85 @@ def BuildTiledImage(config, logger=None, image_num=0, obj_num=0,
 
     nproc = params.get('nproc',1)
 
-    full_image = galsim.ImageF(full_xsize,full_ysize)
-    full_image.setZero()
-    full_image.setScale(pixel_scale)
+    # The bounds of each stamp in the full image.
+    tile_bounds = []
+    for k in range(nobjects):
+        ix = ix_list[k]
+        iy = iy_list[k]
+        xmin = ix * (stamp_xsize + xborder) + 1
+        xmax = xmin + stamp_xsize-1
+        ymin = iy * (stamp_ysize + yborder) + 1
+        ymax = ymin + stamp_ysize-1
+        tile_bounds.append(galsim.BoundsI(xmin,xmax,ymin,ymax))
 
-    # Also define the overall image center, since we need that to calculate the position 
-    # of each stamp relative to the center.
-    image_cen = full_image.bounds.center()
-    config['image_cen'] = galsim.PositionD(image_cen.x,image_cen.y)
+    # If requested, use a Canvas, which adds each stamp into the full images as soon as it is
+    # built (possibly directly in the worker processes), rather than keeping them all around.
+    canvas = _MakeCanvas(params, nproc, full_xsize, full_ysize, pixel_scale,
+                         make_psf_image, make_weight_image, make_badpix_image,
+                         tile_bounds=tile_bounds, band_size=stamp_ysize)
 
-    if make_psf_image:
-        full_psf_image = galsim.ImageF(full_xsize,full_ysize)
-        full_psf_image.setZero()
-        full_psf_image.setScale(pixel_scale)
+    if canvas:
+        full_image, full_psf_image, full_weight_image, full_badpix_image = canvas.images
     else:
-        full_psf_image = None
+        full_image = galsim.ImageF(full_xsize,full_ysize)
+        full_image.setZero()
+        full_image.setScale(pixel_scale)
 
-    if make_weight_image:
-        full_weight_image = galsim.ImageF(full_xsize,full_ysize)
-        full_weight_image.setZero()
-        full_weight_image.setScale(pixel_scale)
-    else:
-        full_weight_image = None
+        if make_psf_image:
+            full_psf_image = galsim.ImageF(full_xsize,full_ysize)
+            full_psf_image.setZero()
+            full_psf_image.setScale(pixel_scale)
+        else:
+            full_psf_image = None
 
-    if make_badpix_image:
-        full_badpix_image = galsim.ImageS(full_xsize,full_ysize)
-        full_badpix_image.setZero()
-        full_badpix_image.setScale(pixel_scale)
-    else:
-        full_badpix_image = None
+        if make_weight_image:
+            full_weight_image = galsim.ImageF(full_xsize,full_ysize)
+            full_weight_image.setZero()
+            full_weight_image.setScale(pixel_scale)
+        else:
+            full_weight_image = None
 
-    stamp_images = galsim.config.BuildStamps(
-            nobjects=nobjects, config=config,
-            xsize=stamp_xsize, ysize=stamp_ysize, obj_num=obj_num, 
-            nproc=nproc, sky_level_pixel=sky_level_pixel, do_noise=do_noise, logger=logger,
-            make_psf_image=make_psf_image,
-            make_weight_image=make_weight_image,
-            make_badpix_image=make_badpix_image)
+        if make_badpix_image:
+            full_badpix_image = galsim.ImageS(full_xsize,full_ysize)
+            full_badpix_image.setZero()
+            full_badpix_image.setScale(pixel_scale)
+        else:
+            full_badpix_image = None
+
+    # Also define the overall image center, since we need that to calculate the position 
+    # of each stamp relative to the center.
+    image_cen = full_image.bounds.center()
+    config['image_cen'] = galsim.PositionD(image_cen.x,image_cen.y)
+
+    try:
+        stamp_images = galsim.config.BuildStamps(
+                nobjects=nobjects, config=config,
+                xsize=stamp_xsize, ysize=stamp_ysize, obj_num=obj_num, 
+                nproc=nproc, sky_level_pixel=sky_level_pixel, do_noise=do_noise, logger=logger,
+                make_psf_image=make_psf_image,
+                make_weight_image=make_weight_image,
+                make_badpix_image=make_badpix_image,
+                canvas=canvas)
+    finally:
+        if canvas:
+            canvas.close()
 
     images = stamp_images[0]
     psf_images = stamp_images[1]
     weight_images = stamp_images[2]
     badpix_images = stamp_images[3]
 
-    for k in range(nobjects):
-        ix = ix_list[k]
-        iy = iy_list[k]
-        xmin = ix * (stamp_xsize + xborder) + 1
-        xmax = xmin + stamp_xsize-1
-        ymin = iy * (stamp_ysize + yborder) + 1
-        ymax = ymin + stamp_ysize-1
-        b = galsim.BoundsI(xmin,xmax,ymin,ymax)
-        full_image[b] += images[k]
-        if make_psf_image:
-            full_psf_image[b] += psf_images[k]
-        if make_weight_image:
-            full_weight_image[b] += weight_images[k]
-        if make_badpix_image:
-            full_badpix_image[b] |= badpix_images[k]
+    # If we used a canvas, the stamps have already been added.
+    if not canvas:
+        for k in range(nobjects):
+            b = tile_bounds[k]
+            full_image[b] += images[k]
+            if make_psf_image:
+                full_psf_image[b] += psf_images[k]
+            if make_weight_image:
+                full_weight_image[b] += weight_images[k]
+            if make_badpix_image:
+                full_badpix_image[b] |= badpix_images[k]
 
     if not do_noise:
         if 'noise' in config['image']:
@@ -576,7 +830,8 @@ def BuildScatteredImage(config, logger=None, image_num=0, obj_num=0,
     opt = { 'size' : int , 'xsize' : int , 'ysize' : int , 
             'stamp_size' : int , 'stamp_xsize' : int , 'stamp_ysize' : int ,
             'pixel_scale' : float , 'nproc' : int ,
-            'sky_level' : float , 'sky_level_pixel' : float }
+            'sky_level' : float , 'sky_level_pixel' : float ,
+            'stream' : bool , 'shared_canvas' : bool , 'canvas_dir' : str }
     params = galsim.config.GetAllParams(
         config['image'], 'image', config, req=req, opt=opt, ignore=ignore)[0]
 
@@ -667,72 +922,96 @@ def BuildScatteredImage(config, logger=None, image_num=0, obj_num=0,
 
     nproc = params.get('nproc',1)
 
-    full_image = galsim.ImageF(full_xsize,full_ysize)
-    full_image.setZero()
-    full_image.setScale(pixel_scale)
+    # For Scattered images, the stamps might be different sizes, so if stamp_ysize isn't
+    # given, just use bands of 64 rows for the SharedCanvas.
+    if stamp_ysize:
+        band_size = stamp_ysize
+    else:
+        band_size = 64
+
+    # If requested, use a Canvas, which adds each stamp into the full images as soon as it is
+    # built (possibly directly in the worker processes), rather than keeping them all around.
+    canvas = _MakeCanvas(params, nproc, full_xsize, full_ysize, pixel_scale,
+                         make_psf_image, make_weight_image, make_badpix_image,
+                         band_size=band_size)
+
+    if canvas:
+        full_image, full_psf_image, full_weight_image, full_badpix_image = canvas.images
+    else:
+        full_image = galsim.ImageF(full_xsize,full_ysize)
+        full_image.setZero()
+        full_image.setScale(pixel_scale)
+
+        if make_psf_image:
+            full_psf_image = galsim.ImageF(full_xsize,full_ysize)
+            full_psf_image.setZero()
+            full_psf_image.setScale(pixel_scale)
+        else:
+            full_psf_image = None
+
+        if make_weight_image:
+            full_weight_image = galsim.ImageF(full_xsize,full_ysize)
+            full_weight_image.setZero()
+            full_weight_image.setScale(pixel_scale)
+        else:
+            full_weight_image = None
+
+        if make_badpix_image:
+            full_badpix_image = galsim.ImageS(full_xsize,full_ysize)
+            full_badpix_image.setZero()
+            full_badpix_image.setScale(pixel_scale)
+        else:
+            full_badpix_image = None
 
     # Also define the overall image center, since we need that to calculate the position 
     # of each stamp relative to the center.
     image_cen = full_image.bounds.center()
     config['image_cen'] = galsim.PositionD(image_cen.x,image_cen.y)
 
-    if make_psf_image:
-        full_psf_image = galsim.ImageF(full_xsize,full_ysize)
-        full_psf_image.setZero()
-        full_psf_image.setScale(pixel_scale)
-    else:
-        full_psf_image = None
-
-    if make_weight_image:
-        full_weight_image = galsim.ImageF(full_xsize,full_ysize)
-        full_weight_image.setZero()
-        full_weight_image.setScale(pixel_scale)
-    else:
-        full_weight_image = None
-
-    if make_badpix_image:
-        full_badpix_image = galsim.ImageS(full_xsize,full_ysize)
-        full_badpix_image.setZero()
-        full_badpix_image.setScale(pixel_scale)
-    else:
-        full_badpix_image = None
-
-    stamp_images = galsim.config.BuildStamps(
-            nobjects=nobjects, config=config,
-            xsize=stamp_xsize, ysize=stamp_ysize, obj_num=obj_num,
-            nproc=nproc, sky_level_pixel=sky_level_pixel, do_noise=False, logger=logger,
-            make_psf_image=make_psf_image,
-            make_weight_image=make_weight_image,
-            make_badpix_image=make_badpix_image)
+    try:
+        stamp_images = galsim.config.BuildStamps(
+                nobjects=nobjects, config=config,
+                xsize=stamp_xsize, ysize=stamp_ysize, obj_num=obj_num,
+                nproc=nproc, sky_level_pixel=sky_level_pixel, do_noise=False, logger=logger,
+                make_psf_image=make_psf_image,
+                make_weight_image=make_weight_image,
+                make_badpix_image=make_badpix_image,
+                canvas=canvas)
+    finally:
+        if canvas:
+            canvas.close()
 
     images = stamp_images[0]
     psf_images = stamp_images[1]
     weight_images = stamp_images[2]
     badpix_images = stamp_images[3]
 
-    for k in range(nobjects):
-        bounds = images[k].bounds & full_image.bounds
-        #print 'stamp bounds = ',images[k].bounds
-        #print 'full bounds = ',full_image.bounds
-        #print 'Overlap = ',bounds
-        if bounds.isDefined():
-            #print 'stamp = ',images[k][bounds].array
-            full_image[bounds] += images[k][bounds]
-            #print 'on image = ',full_image[bounds].array
-            if make_psf_image:
-                full_psf_image[bounds] += psf_images[k][bounds]
-            if make_weight_image:
-                full_weight_image[bounds] += weight_images[k][bounds]
-            if make_badpix_image:
-                full_badpix_image[bounds] |= badpix_images[k][bounds]
-        else:
-            if logger:
-                logger.warn(
-                    "Object centered at (%d,%d) is entirely off the main image,\n"%(
-                        images[k].bounds.center().x, images[k].bounds.center().y) +
-                    "whose bounds are (%d,%d,%d,%d)."%(
-                        full_image.bounds.xmin, full_image.bounds.xmax,
-                        full_image.bounds.ymin, full_image.bounds.ymax))
+    # If we used a canvas, the stamps have already been added.  (And any warnings
+    # about objects off the image were given in BuildStamps.)
+    if not canvas:
+        for k in range(nobjects):
+            bounds = images[k].bounds & full_image.bounds
+            #print 'stamp bounds = ',images[k].bounds
+            #print 'full bounds = ',full_image.bounds
+            #print 'Overlap = ',bounds
+            if bounds.isDefined():
+                #print 'stamp = ',images[k][bounds].array
+                full_image[bounds] += images[k][bounds]
+                #print 'on image = ',full_image[bounds].array
+                if make_psf_image:
+                    full_psf_image[bounds] += psf_images[k][bounds]
+                if make_weight_image:
+                    full_weight_image[bounds] += weight_images[k][bounds]
+                if make_badpix_image:
+                    full_badpix_image[bounds] |= badpix_images[k][bounds]
+            else:
+                if logger:
+                    logger.warn(
+                        "Object centered at (%d,%d) is entirely off the main image,\n"%(
+                            images[k].bounds.center().x, images[k].bounds.center().y) +
+                        "whose bounds are (%d,%d,%d,%d)."%(
+                            full_image.bounds.xmin, full_image.bounds.xmax,
+                            full_image.bounds.ymin, full_image.bounds.ymax))
 
     if 'noise' in config['image']:
         # Apply the noise to the full image
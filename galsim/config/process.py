@@ -28,17 +28,238 @@ valid_input_types = {
     #   used later).
     # - whether the class has a nobjects field, in which case it also must have a constructor
     #   kwarg nobjects_only to efficiently do only enough to calculate nobjects.
-    'catalog' : ('InputCatalog', [], True), 
-    'real_catalog' : ('RealGalaxyCatalog', [], True),
-    'nfw_halo' : ('NFWHalo', [], False),
+    # - whether the object is left unchanged after it is built, in which case it can be 
+    #   shared by all the tasks for a file rather than being copied (and pickled) for each one.
+    #   This item is optional.  If it is omitted, the object is not shared.
+    'catalog' : ('InputCatalog', [], True, True), 
+    'real_catalog' : ('RealGalaxyCatalog', [], True, True),
+    'nfw_halo' : ('NFWHalo', [], False, True),
     'power_spectrum' : ('PowerSpectrum',
                         # power_spectrum uses these extra parameters for buildGrid later.
                         ['grid_spacing', 'interpolant'], 
+                        False,
+                        # It also gets a new grid for each image, so it can't be shared.
                         False),
-    'fits_header' : ('FitsHeader', [], False), 
+    'fits_header' : ('FitsHeader', [], False, True), 
 }
 
 
+class WorkerPool(object):
+    """
+    A set of long-lived worker processes that pull tasks off a common task queue.
+
+    galsim.config.Process keeps a single WorkerPool alive for the whole run, and the file,
+    image and stamp levels all hand their work to it rather than each level spinning up
+    (and tearing down) its own set of processes.  This saves paying the cost of starting
+    the processes, importing galsim and reading the input catalogs over and over.
+
+    A task is a tuple (func, kwargs, info).  The worker calls func(**kwargs) and puts
+    (result, info, proc_name) onto the done queue.  Since the task is sent to the worker
+    through a Queue, func needs to be picklable, which means it must be a module-level
+    function (not a nested function or a lambda).
+
+    You normally wouldn't make one of these directly.  Use AcquireWorkerPool and 
+    ReleaseWorkerPool instead, which make sure the same pool is used by all levels.
+    """
+    def __init__(self):
+        from multiprocessing import Queue
+        self.task_queue = Queue()
+        self.done_queue = Queue()
+        self.p_list = []
+        # The number of tasks whose results haven't been taken off the done queue yet.
+        self.npending = 0
+
+    def start(self, nproc):
+        """Make sure there are at least nproc workers running.
+        """
+        from multiprocessing import Process
+        for j in range(len(self.p_list),nproc):
+            # The name is actually the default name for the first time we do this,
+            # but after that it just keeps incrementing the numbers, rather than starting
+            # over at Process-1.  So for the sake of the info output, we name the processes 
+            # explicitly.
+            p = Process(target=_PoolWorker, args=(self.task_queue, self.done_queue),
+                        name='Process-%d'%(j+1))
+            p.start()
+            self.p_list.append(p)
+
+    def run(self, tasks):
+        """Put all the tasks on the task queue and yield the results as they come back.
+
+        The results come back in whatever order the workers finish them, so the info item
+        of each task should be used to put the results in the right place.
+
+        @param tasks        A list of (func, kwargs, info) tuples.
+
+        @returns a generator of (result, info, proc_name) tuples.
+        """
+        # In case the caller stopped reading the results of an earlier run part way through.
+        self.drain()
+        for task in tasks:
+            self.task_queue.put(task)
+            self.npending += 1
+        for k in range(len(tasks)):
+            result, info, proc = self.done_queue.get()
+            self.npending -= 1
+            if isinstance(result, _WorkerError):
+                # Take the rest of the results off the done queue before raising, so they
+                # don't get mixed up with those of a later run, and so close() doesn't wait
+                # forever for workers that are blocked putting them there.
+                self.drain()
+                raise RuntimeError("%s raised an exception while working on task %s:\n%s"%(
+                        proc, info, result.tb))
+            yield result, info, proc
+
+    def drain(self):
+        """Take the results of any unfinished tasks off the done queue and drop them.
+
+        This waits for the workers to finish those tasks.  If the workers have all stopped,
+        there won't be any more results, so this returns without waiting for them.
+        """
+        from Queue import Empty
+        while self.npending > 0 and any([ p.is_alive() for p in self.p_list ]):
+            try:
+                self.done_queue.get(timeout=0.1)
+                self.npending -= 1
+            except Empty:
+                pass
+        self.npending = 0
+
+    def close(self):
+        """Stop all the workers and wait for them to finish.
+        """
+        # Putting nproc 'STOP's on the queue will stop them all.  This is important, because
+        # the program will keep running as long as there are running processes, even if the
+        # main process gets to the end.
+        for p in self.p_list:
+            self.task_queue.put('STOP')
+        # A process doesn't finish until everything it put on a queue has been read, so make
+        # sure nothing is left on the done queue (e.g. if the caller stopped reading the
+        # results of run early) before joining them.
+        self.drain()
+        for p in self.p_list:
+            p.join()
+        self.task_queue.close()
+        self.p_list = []
+
+
+class _WorkerError(object):
+    """A picklable stand-in for an exception raised in a worker process.
+    """
+    def __init__(self, tb):
+        self.tb = tb
+
+
+def _PoolWorker(task_queue, done_queue):
+    """The target function for each process in a WorkerPool.
+    """
+    from multiprocessing import current_process
+    # This process got a copy of the parent's pool when it was forked, but it shouldn't
+    # use it.  If a task wants to do its own multiprocessing, this worker makes a pool of its
+    # own the first time, and keeps it for the rest of its tasks rather than starting new
+    # processes for each one.  So the worker itself counts as a user of that pool, and closes
+    # it when it stops.
+    global _worker_pool, _worker_pool_users
+    _worker_pool = None
+    _worker_pool_users = 1
+    for (func, kwargs, info) in iter(task_queue.get, 'STOP'):
+        try:
+            result = func(**kwargs)
+        except Exception:
+            import traceback
+            result = _WorkerError(traceback.format_exc())
+        done_queue.put( (result, info, current_process().name) )
+    if _worker_pool is not None:
+        _worker_pool.close()
+
+
+_worker_pool = None
+_worker_pool_users = 0
+
+def AcquireWorkerPool(nproc=0):
+    """
+    Get the WorkerPool to use for multiprocessing, making sure it has at least nproc workers.
+
+    If there is already a pool in use (e.g. because we are inside galsim.config.Process), that
+    pool is returned, and it is started up with more workers if necessary.  Otherwise a new
+    pool is made.  Each call should be paired with a call to ReleaseWorkerPool.  The pool is 
+    closed when the last user releases it.
+
+    @param nproc        The minimum number of workers to have running. (default = 0, which
+                        just reserves the pool without starting any workers yet)
+
+    @returns the WorkerPool
+    """
+    global _worker_pool, _worker_pool_users
+    if _worker_pool is None:
+        _worker_pool = WorkerPool()
+    _worker_pool_users += 1
+    _worker_pool.start(nproc)
+    return _worker_pool
+
+def ReleaseWorkerPool():
+    """
+    Release a pool obtained from AcquireWorkerPool.  When there are no more users, the
+    worker processes are stopped.
+    """
+    global _worker_pool, _worker_pool_users
+    _worker_pool_users -= 1
+    if _worker_pool_users <= 0:
+        if _worker_pool is not None:
+            _worker_pool.close()
+        _worker_pool = None
+        _worker_pool_users = 0
+
+
+def MakeTaskChunks(costs, nproc, min_size=1):
+    """
+    Split a list of work items into chunks of consecutive items to use as tasks for
+    a WorkerPool.
+
+    The chunks start out large and get smaller towards the end of the list (a.k.a. guided
+    scheduling).  Each chunk gets about 1/(2 nproc) of the estimated cost that remains
+    after the previous chunks.  Since the workers take the next task off the queue as soon
+    as they finish the last one, this keeps the overhead of lots of small tasks down at the
+    start, but lets the workers share out the last bits of work evenly, rather than having
+    all but one of them sit idle while the last big chunk finishes.
+
+    @param costs        A list of the estimated (relative) cost of each item.
+    @param nproc        How many processes will be working on the tasks.
+    @param min_size     The minimum number of items in a chunk.  All chunks (except possibly
+                        the last) have a multiple of this many items.  (default = 1)
+
+    @returns a list of (start, n) for each chunk.
+    """
+    nitems = len(costs)
+    remaining = float(sum(costs))
+    chunks = []
+    start = 0
+    while start < nitems:
+        target = remaining / (2*nproc)
+        end = min(start + min_size, nitems)
+        cost = sum(costs[start:end])
+        while end < nitems:
+            next_cost = sum(costs[end:end+min_size])
+            if cost + next_cost > target: break
+            cost += next_cost
+            end += min_size
+        end = min(end, nitems)
+        chunks.append( (start, end-start) )
+        remaining -= cost
+        start = end
+    return chunks
+
+
+# We keep the most recently built object for each input type around so that we don't need
+# to read in the same catalog (or build the same PowerSpectrum, etc.) for every file.
+# This is especially helpful in the WorkerPool processes, which each do many files.
+# The values are tuples (run_id, kwargs, input_obj).  The objects are only reused within
+# a single call to Process (identified by config['run_id']), since the input files might
+# change between calls, and the worker processes might be used for more than one call.
+_input_cache = {}
+_run_count = 0
+
+
 def ProcessInput(config, file_num=0, logger=None):
     """
     Process the input field, reading in any specified input files or setting up
@@ -51,6 +272,9 @@ def ProcessInput(config, file_num=0, logger=None):
         etc.
     """
     config['seq_index'] = file_num
+    # Save the file_num, so we can rebuild the shared input objects in a worker process
+    # if necessary.  cf. RemoveSharedInputs.
+    config['file_num'] = file_num
     # Process the input field (read any necessary input files)
     if 'input' in config:
         input = config['input']
@@ -61,12 +285,7 @@ def ProcessInput(config, file_num=0, logger=None):
         # with the parameters given in the config file.
         #print 'valid_input_types = ',valid_input_types
         for key in [ k for k in valid_input_types.keys() if k in input ]:
-            #print 'key = ',key
-            field = input[key]
-            #print 'field = ',field
-            field['type'], ignore = valid_input_types[key][0:2]
-            #print 'type, ignore = ',field['type'],ignore
-            input_obj = galsim.config.gsobject._BuildSimple(field, key, config, ignore)[0]
+            input_obj = _BuildInput(config, key)
             #print 'input_obj = ',input_obj
             if logger and  valid_input_types[key][2]:
                 logger.info('Read %d objects from %s',input_obj.nobjects,key)
@@ -78,6 +297,99 @@ def ProcessInput(config, file_num=0, logger=None):
         galsim.config.CheckAllParams(input, 'input', ignore=valid_keys)
 
 
+def _BuildInput(config, key):
+    """
+    Build the input object for config['input'][key], reusing the last one we built if 
+    the parameters are the same.
+    """
+    #print 'key = ',key
+    field = config['input'][key]
+    #print 'field = ',field
+    field['type'], ignore = valid_input_types[key][0:2]
+    #print 'type, ignore = ',field['type'],ignore
+    init_func = eval("galsim."+field['type'])
+    kwargs = galsim.config.GetAllParams(field, key, config,
+                                        req = init_func._req_params,
+                                        opt = init_func._opt_params,
+                                        single = init_func._single_params,
+                                        ignore = ignore)[0]
+    # If we just built the same input object (e.g. for the previous file), reuse it.
+    run_id = config.get('run_id',None)
+    if (key in _input_cache and _input_cache[key][0] == run_id and
+        _input_cache[key][1] == kwargs):
+        input_obj = _input_cache[key][2]
+    else:
+        # Build it from the kwargs we already have, rather than getting the parameters again,
+        # which would draw new values for any random parameters.
+        if init_func._takes_rng:
+            if 'rng' not in config:
+                raise ValueError("No config['rng'] available for %s.type = %s"%(
+                        key,field['type']))
+            input_obj = init_func(rng=config['rng'], **kwargs)
+        else:
+            input_obj = init_func(**kwargs)
+            _input_cache[key] = (run_id, kwargs, input_obj)
+    return input_obj
+
+
+def CopyConfig(config):
+    """
+    Make a copy of config that can be modified (e.g. by setting current_val or seq_index)
+    without changing the original.
+
+    Only the dicts and lists are copied.  Everything else (in particular the input objects
+    like the catalogs, but also any built GSObjects) is shared with the original, which is 
+    much faster than copy.deepcopy when these objects are large.
+
+    @returns the copied config dict
+    """
+    if isinstance(config, dict):
+        return dict([ (k, CopyConfig(v)) for (k,v) in config.iteritems() ])
+    elif isinstance(config, list):
+        return [ CopyConfig(v) for v in config ]
+    else:
+        return config
+
+
+def _IsSharedInput(key):
+    """Whether the input object for key can be shared by all the tasks for a file.
+    """
+    v = valid_input_types[key]
+    return len(v) > 3 and v[3]
+
+
+def RemoveSharedInputs(config):
+    """
+    Return a shallow copy of config without the input objects that are unchanged after being 
+    built.  
+
+    This is what we send to the worker processes.  Those objects can be large (e.g. a 
+    RealGalaxyCatalog) so we don't want to pickle them for each task.  The worker gets them 
+    back from RestoreSharedInputs, which normally just reuses the objects that it built for 
+    an earlier task.
+
+    @returns the new config dict
+    """
+    config1 = dict(config)
+    if 'input' in config and 'file_num' in config:
+        for key in valid_input_types.keys():
+            if key in config['input'] and key in config and _IsSharedInput(key):
+                del config1[key]
+    return config1
+
+
+def RestoreSharedInputs(config):
+    """
+    Rebuild (or more typically, retrieve from the cache) any input objects that were removed
+    by RemoveSharedInputs.
+    """
+    if 'input' in config and 'file_num' in config:
+        for key in valid_input_types.keys():
+            if key in config['input'] and key not in config and _IsSharedInput(key):
+                config['seq_index'] = config['file_num']
+                config[key] = _BuildInput(config, key)
+
+
 def ProcessInputNObjects(config):
     """Process the input field, just enough to determine the number of objects.
     """
@@ -125,8 +437,25 @@ def Process(config, logger=None):
     function handles processing the output field, calling other functions to
     build and write the specified files.  The input field is processed before
     building each file.
+
+    If output.resume is True, the checksum of each file is recorded in a manifest file 
+    (output.manifest, default = root + '.manifest') once the file is completed.  Any files
+    that are already listed there (with the right checksum) are skipped, so a run that 
+    died part way through can be restarted with the same config to build the rest.
+
+    If output.nshards is set, only the files in shard number output.shard (from 0 to 
+    nshards-1) are built.  The files are split into nshards contiguous ranges, and the 
+    files in each shard are identical to what they would be if all the files were built
+    in a single run.
     """
 
+    # Give this run an id, so the input objects built for it aren't reused by a later run.
+    # (cf. _BuildInput)  The old ones aren't needed anymore, so let them go.
+    global _run_count
+    _run_count += 1
+    config['run_id'] = '%d.%d'%(os.getpid(), _run_count)
+    _input_cache.clear()
+
     # If we don't have a root specified yet, we generate it from the current script.
     if 'root' not in config:
         import inspect
@@ -168,6 +497,31 @@ def Process(config, logger=None):
         nfiles = 1 
     #print 'nfiles = ',nfiles
 
+    # If requested, only build one shard of the files.  This lets a large run be split up 
+    # into several jobs (e.g. on different nodes of a cluster), each of which builds a 
+    # contiguous range of the files.  Shard numbers go from 0 to nshards-1.
+    if 'nshards' in output:
+        nshards = galsim.config.ParseValue(output, 'nshards', config, int)[0]
+        if 'shard' not in output:
+            raise AttributeError("Attribute shard is required when output.nshards is set")
+        shard = galsim.config.ParseValue(output, 'shard', config, int)[0]
+        if nshards <= 0:
+            raise AttributeError("Invalid output.nshards=%d (must be > 0)"%nshards)
+        if shard < 0 or shard >= nshards:
+            raise AttributeError(
+                "Invalid output.shard=%d (must be between 0 and nshards-1)"%shard)
+        first_file = shard * nfiles / nshards
+        end_file = (shard+1) * nfiles / nshards
+        if logger:
+            logger.info('Building shard %d of %d: files %d .. %d',
+                        shard, nshards, first_file, end_file-1)
+    else:
+        nshards = 1
+        first_file = 0
+        end_file = nfiles
+    # The number of files that we will actually build here.
+    nfiles_build = end_file - first_file
+
     # Figure out how many processes we will use for building the files.
     # (If nfiles = 1, but nimages > 1, we'll do the multi-processing at the image stage.)
     if 'nproc' in output:
@@ -177,29 +531,29 @@ def Process(config, logger=None):
 
     # If set, nproc2 will be passed to the build function to be acted on at that level.
     nproc2 = None
-    if nproc > nfiles:
-        if nfiles == 1 and (type == 'MultiFits' or type == 'DataCube'):
+    if nproc > nfiles_build:
+        if nfiles_build == 1 and (type == 'MultiFits' or type == 'DataCube'):
             nproc2 = nproc 
             nproc = 1
         else:
             if logger:
                 logger.warn(
                     "Trying to use more processes than files: output.nproc=%d, "%nproc +
-                    "output.nfiles=%d.  Reducing nproc to %d."%(nfiles,nfiles))
-            nproc = nfiles
+                    "output.nfiles=%d.  Reducing nproc to %d."%(nfiles_build,nfiles_build))
+            nproc = nfiles_build
     if nproc <= 0:
         # Try to figure out a good number of processes to use
         try:
             from multiprocessing import cpu_count
             ncpu = cpu_count()
-            if nfiles == 1 and (type == 'MultiFits' or type == 'DataCube'):
+            if nfiles_build == 1 and (type == 'MultiFits' or type == 'DataCube'):
                 nproc2 = ncpu # Use this value in BuildImage rather than here.
                 nproc = 1
                 if logger:
                     logger.debug("ncpu = %d.",ncpu)
             else:
-                if ncpu > nfiles:
-                    nproc = nfiles
+                if ncpu > nfiles_build:
+                    nproc = nfiles_build
                 else:
                     nproc = ncpu
                 if logger:
@@ -211,176 +565,266 @@ def Process(config, logger=None):
             if logger:
                 logger.info("Unable to determine ncpu.  Using %d processes",nproc)
     
-    # Set up the multi-process worker function if we're going to need it.
-    if nproc > 1:
-        # NB: See the function BuildStamps for more verbose comments about how
-        # the multiprocessing stuff works.
-        from multiprocessing import Process, Queue, current_process
-
-        def worker(input, output):
-            import time
-            for (kwargs, file_num, file_name) in iter(input.get, 'STOP'):
-                #print current_process().name,': worker got: ',file_num,file_name,kwargs
-                ProcessInput(kwargs['config'], file_num=file_num)
-                #print current_process().name,': After ProcessInput for file ',file_num
-                result = build_func(**kwargs)
-                #print current_process().name,': result for ',file_num,' = ',result
-                output.put( (result, file_num, file_name, current_process().name) )
-                #print current_process().name,': put the result for ',file_num,' on output queue'
-
-        # Set up the task list
-        task_queue = Queue()
-
-    # Now start working on the files.
-
-    image_num = 0
-    obj_num = 0
-
-    extra_keys = [ 'psf', 'weight', 'badpix' ]
-    last_file_name = {}
-    for key in extra_keys:
-        last_file_name[key] = None
-
-    for file_num in range(nfiles):
-        #print 'file, image, obj = ',file_num, image_num, obj_num
-        # Set the index for any sequences in the input or output parameters.
-        # These sequences are indexed by the file_num.
-        # (In image, they are indexed by image_num, and after that by obj_num.)
-        config['seq_index'] = file_num
-
-        # Get the file_name
-        if 'file_name' in output:
-            SetDefaultExt(output['file_name'],'.fits')
-            file_name = galsim.config.ParseValue(output, 'file_name', config, str)[0]
-        elif 'root' in config:
-            # If a file_name isn't specified, we use the name of the config file + '.fits'
-            file_name = config['root'] + '.fits'
-        else:
-            raise AttributeError(
-                "No output.file_name specified and unable to generate it automatically.")
-        
-        # Prepend a dir to the beginning of the filename if requested.
-        if 'dir' in output:
-            dir = galsim.config.ParseValue(output, 'dir', config, str)[0]
-            if dir and not os.path.isdir(dir): os.mkdir(dir)
-            file_name = os.path.join(dir,file_name)
+    # If resuming a previous run, we skip any files that were already completed.
+    # We know which ones those are from the manifest, which lists the checksum of each
+    # file once it has been successfully written.
+    if 'resume' in output:
+        resume = galsim.config.ParseValue(output, 'resume', config, bool)[0]
+    else:
+        resume = False
+    if resume:
+        if 'manifest' in output:
+            manifest_file = galsim.config.ParseValue(output, 'manifest', config, str)[0]
+        elif nshards > 1:
+            # Each shard keeps its own manifest, so they don't all try to write to the 
+            # same file at once.
+            manifest_file = config['root'] + '_%d_of_%d.manifest'%(shard,nshards)
         else:
-            dir = None
-
-        # Assign some of the kwargs we know now:
-        kwargs = {
-            'file_name' : file_name,
-            'image_num' : image_num,
-            'obj_num' : obj_num
-        }
-        if nproc2:
-            kwargs['nproc'] = nproc2
-
-        import copy
-        kwargs['config'] = copy.deepcopy(config)
-        output = kwargs['config']['output']
-        # This also updates nimages or nobjects as needed if they are being automatically
-        # set from an input catalog.
-        nobj = nobj_func(kwargs['config'],file_num,image_num)
-
-        if type in [ 'MultiFits', 'DataCube' ]:
-            if 'nimages' not in output:
-                raise AttributeError("Attribute nimages is required for output.type = %s"%type)
-            kwargs['nimages'] = galsim.config.ParseValue(output,'nimages',kwargs['config'],int)[0]
-
-        # Check if we need to build extra images for write out as well
-        for extra_key in [ key for key in extra_keys if key in output ]:
-            #print 'extra = ',extra
-            extra_file_name = None
-            output_extra = output[extra_key]
-
-            output_extra['type'] = 'default'
-            single = [ { 'file_name' : str, 'hdu' : int } ]
-            opt = { 'dir' : str }
-            ignore = []
-            if extra_key == 'psf': 
-                ignore.append('real_space')
-            if extra_key == 'weight': 
-                ignore.append('include_obj_var')
-            if 'file_name' in output_extra:
-                SetDefaultExt(output_extra['file_name'],'.fits')
-            params, safe = galsim.config.GetAllParams(output_extra,extra_key,kwargs['config'],
-                                                      opt=opt, single=single, ignore=ignore)
-
-            if 'file_name' in params:
-                extra_file_name = params['file_name']
-                if 'dir' in params:
-                    dir = params['dir']
-                    if dir and not os.path.isdir(dir): os.mkdir(dir)
-                # else keep dir from above.
-                if dir:
-                    extra_file_name = os.path.join(dir,extra_file_name)
-                # If we already wrote this file, skip it this time around.
-                # (Typically this is applicable for psf, where we only want 1 psf file.)
-                #print 'last_file_name for ',key,' = ',last_file_name[key]
-                #print 'extra_file_name = ',extra_file_name
-                if last_file_name[key] == extra_file_name:
-                    #print 'skipping'
-                    continue
-                #print 'assigning this to kwargs'
-                kwargs[ extra_key+'_file_name' ] = extra_file_name
-                last_file_name[key] = extra_file_name
-            elif type != 'Fits':
+            manifest_file = config['root'] + '.manifest'
+        checksums = _ReadManifest(manifest_file)
+        if logger:
+            logger.info('Resuming run.  Manifest %s lists %d completed files.',
+                        manifest_file, len(checksums))
+
+    # Any multiprocessing we do (whether at the file, image or stamp level) uses a single
+    # WorkerPool, which we keep alive until all the files are done.  That way the worker
+    # processes (and the input catalogs they have already read) get reused from one file
+    # (or image) to the next.
+    pool = AcquireWorkerPool()
+    try:
+        if nproc > 1:
+            # The tasks to send to the pool.  Each is (func, kwargs, info).
+            tasks = []
+
+        # Now start working on the files.
+
+        image_num = 0
+        obj_num = 0
+
+        extra_keys = [ 'psf', 'weight', 'badpix' ]
+        last_file_name = {}
+        for key in extra_keys:
+            last_file_name[key] = None
+
+        # We need to go through all the files before first_file too, so that image_num, obj_num
+        # and the rest come out the same as they would if we were building all the files.
+        for file_num in range(end_file):
+            #print 'file, image, obj = ',file_num, image_num, obj_num
+            # Set the index for any sequences in the input or output parameters.
+            # These sequences are indexed by the file_num.
+            # (In image, they are indexed by image_num, and after that by obj_num.)
+            config['seq_index'] = file_num
+
+            # Get the file_name
+            if 'file_name' in output:
+                SetDefaultExt(output['file_name'],'.fits')
+                file_name = galsim.config.ParseValue(output, 'file_name', config, str)[0]
+            elif 'root' in config:
+                # If a file_name isn't specified, we use the name of the config file + '.fits'
+                file_name = config['root'] + '.fits'
+            else:
                 raise AttributeError(
-                    "Only the file_name version of %s output is possible for "%extra_key+
-                    "output type == %s."%type)
+                    "No output.file_name specified and unable to generate it automatically.")
+        
+            # Prepend a dir to the beginning of the filename if requested.
+            if 'dir' in output:
+                dir = galsim.config.ParseValue(output, 'dir', config, str)[0]
+                if dir and not os.path.isdir(dir): os.mkdir(dir)
+                file_name = os.path.join(dir,file_name)
             else:
-                kwargs[ extra_key+'_hdu' ] = params['hdu']
+                dir = None
+
+            # Assign some of the kwargs we know now:
+            kwargs = {
+                'file_name' : file_name,
+                'image_num' : image_num,
+                'obj_num' : obj_num
+            }
+            if nproc2:
+                kwargs['nproc'] = nproc2
+
+            kwargs['config'] = CopyConfig(config)
+            output = kwargs['config']['output']
+            # This also updates nimages or nobjects as needed if they are being automatically
+            # set from an input catalog.
+            nobj = nobj_func(kwargs['config'],file_num,image_num)
+
+            if type in [ 'MultiFits', 'DataCube' ]:
+                if 'nimages' not in output:
+                    raise AttributeError("Attribute nimages is required for output.type = %s"%type)
+                kwargs['nimages'] = galsim.config.ParseValue(output,'nimages',kwargs['config'],int)[0]
+
+            # Check if we need to build extra images for write out as well
+            for extra_key in [ key for key in extra_keys if key in output ]:
+                #print 'extra = ',extra
+                extra_file_name = None
+                output_extra = output[extra_key]
+
+                output_extra['type'] = 'default'
+                single = [ { 'file_name' : str, 'hdu' : int } ]
+                opt = { 'dir' : str }
+                ignore = []
+                if extra_key == 'psf': 
+                    ignore.append('real_space')
+                if extra_key == 'weight': 
+                    ignore.append('include_obj_var')
+                if 'file_name' in output_extra:
+                    SetDefaultExt(output_extra['file_name'],'.fits')
+                params, safe = galsim.config.GetAllParams(output_extra,extra_key,kwargs['config'],
+                                                          opt=opt, single=single, ignore=ignore)
+
+                if 'file_name' in params:
+                    extra_file_name = params['file_name']
+                    if 'dir' in params:
+                        dir = params['dir']
+                        if dir and not os.path.isdir(dir): os.mkdir(dir)
+                    # else keep dir from above.
+                    if dir:
+                        extra_file_name = os.path.join(dir,extra_file_name)
+                    # If we already wrote this file, skip it this time around.
+                    # (Typically this is applicable for psf, where we only want 1 psf file.)
+                    #print 'last_file_name for ',key,' = ',last_file_name[key]
+                    #print 'extra_file_name = ',extra_file_name
+                    if last_file_name[key] == extra_file_name:
+                        #print 'skipping'
+                        continue
+                    #print 'assigning this to kwargs'
+                    kwargs[ extra_key+'_file_name' ] = extra_file_name
+                    last_file_name[key] = extra_file_name
+                elif type != 'Fits':
+                    raise AttributeError(
+                        "Only the file_name version of %s output is possible for "%extra_key+
+                        "output type == %s."%type)
+                else:
+                    kwargs[ extra_key+'_hdu' ] = params['hdu']
     
-        # This is where we actually build the file.
-        # If we're doing multiprocessing, we send this information off to the task_queue.
-        # Otherwise, we just call build_func.
-        if nproc > 1:
-            #print 'put task on the queue: ',file_num,file_name,kwargs
-            task_queue.put( (kwargs, file_num, file_name) )
-        else:
-            ProcessInput(kwargs['config'], file_num=file_num, logger=logger)
-            # Apparently the logger isn't picklable, so can't send that for nproc > 1
-            kwargs['logger'] = logger 
-            t = build_func(**kwargs)
-            if logger:
-                logger.warn('File %d = %s: time = %f sec', file_num, file_name, t)
-
-        # nobj is a list of nobj for each image in that file.
-        # So len(nobj) = nimages and sum(nobj) is the total number of objects
-        image_num += len(nobj)
-        obj_num += sum(nobj)
-
-
-    # If we're doing multiprocessing, here is the machinery to run through the task_queue
-    # and process the results.
-    if nproc > 1:
-        # Run the tasks
-        done_queue = Queue()
-        p_list = []
-        for j in range(nproc):
-            p = Process(target=worker, args=(task_queue, done_queue), name='Process-%d'%(j+1))
-            p.start()
-            p_list.append(p)
-
-        # Log the results.
-        for k in range(nfiles):
-            t, file_num, file_name, proc = done_queue.get()
-            #print 'received results for ',file_num,file_name,t,proc
-            if logger:
-                logger.warn('%s: File %d = %s: time = %f sec', proc, file_num, file_name, t)
+            # All the files that will be written for this file_num.
+            all_file_names = [ file_name ] + [ kwargs[ extra_key+'_file_name' ]
+                                               for extra_key in extra_keys
+                                               if extra_key+'_file_name' in kwargs ]
+
+            # This is where we actually build the file.
+            # If we're doing multiprocessing, we add this to the list of tasks for the pool.
+            # Otherwise, we just call build_func.
+            # Note: we still need to go through all of the above for files that we skip when
+            # resuming (or that are in an earlier shard), so that image_num and obj_num (and 
+            # hence the random number sequences) come out the same as they would for a fresh 
+            # run of all the files.
+            if file_num < first_file:
+                # This file is built by some other shard.
+                pass
+            elif resume and _CheckManifest(all_file_names, checksums):
+                if logger:
+                    logger.warn('File %d = %s: already done', file_num, file_name)
+            elif nproc > 1:
+                #print 'add task to the list: ',file_num,file_name,kwargs
+                task_kwargs = { 'build_func' : build_func, 'kwargs' : kwargs,
+                                'file_num' : file_num }
+                tasks.append( (_BuildFile, task_kwargs, (file_num, file_name, all_file_names)) )
+            else:
+                ProcessInput(kwargs['config'], file_num=file_num, logger=logger)
+                # Apparently the logger isn't picklable, so can't send that for nproc > 1
+                kwargs['logger'] = logger 
+                t = build_func(**kwargs)
+                if logger:
+                    logger.warn('File %d = %s: time = %f sec', file_num, file_name, t)
+                if resume:
+                    _AddToManifest(manifest_file, all_file_names)
+
+            # nobj is a list of nobj for each image in that file.
+            # So len(nobj) = nimages and sum(nobj) is the total number of objects
+            image_num += len(nobj)
+            obj_num += sum(nobj)
+
+
+        # If we're doing multiprocessing, here is where we send the tasks to the worker pool
+        # and process the results.
+        if nproc > 1 and len(tasks) > 0:
+            pool.start(nproc)
+            # Log the results.
+            for t, (file_num, file_name, all_file_names), proc in pool.run(tasks):
+                #print 'received results for ',file_num,file_name,t,proc
+                if logger:
+                    logger.warn('%s: File %d = %s: time = %f sec', proc, file_num, file_name, t)
+                if resume:
+                    _AddToManifest(manifest_file, all_file_names)
 
-        # Stop the processes
-        for j in range(nproc):
-            task_queue.put('STOP')
-        for j in range(nproc):
-            p_list[j].join()
-        task_queue.close()
+    finally:
+        ReleaseWorkerPool()
 
     if logger:
         logger.debug('Done building files')
 
 
+def _BuildFile(build_func, kwargs, file_num):
+    """
+    The function that a WorkerPool process runs to build a single file.
+    """
+    ProcessInput(kwargs['config'], file_num=file_num)
+    return build_func(**kwargs)
+
+
+def _FileChecksum(file_name):
+    """
+    Calculate the md5 checksum of a file.
+    """
+    import hashlib
+    md5 = hashlib.md5()
+    fin = open(file_name, 'rb')
+    try:
+        while True:
+            buf = fin.read(1<<20)
+            if not buf: break
+            md5.update(buf)
+    finally:
+        fin.close()
+    return md5.hexdigest()
+
+
+def _ReadManifest(manifest_file):
+    """
+    Read the manifest of completed files from a previous run, if there is one.
+
+    The manifest has the same format as the output of md5sum, so it can also be checked 
+    with md5sum -c.
+
+    @returns a dict of the checksums indexed by file name.
+    """
+    checksums = {}
+    if os.path.isfile(manifest_file):
+        for line in open(manifest_file):
+            items = line.rstrip('\n').split(None,1)
+            # Ignore any partial line at the end if the last run died while writing it.
+            if len(items) == 2 and len(items[0]) == 32:
+                checksums[items[1]] = items[0]
+    return checksums
+
+
+def _CheckManifest(file_names, checksums):
+    """
+    Check whether the given files were all completed according to the manifest, and that
+    they haven't been changed since.
+    """
+    for file_name in file_names:
+        if file_name not in checksums or not os.path.isfile(file_name):
+            return False
+        if _FileChecksum(file_name) != checksums[file_name]:
+            return False
+    return True
+
+
+def _AddToManifest(manifest_file, file_names):
+    """
+    Add the given files to the manifest once they have been completed.
+    """
+    fout = open(manifest_file, 'a')
+    try:
+        for file_name in file_names:
+            fout.write('%s  %s\n'%(_FileChecksum(file_name), file_name))
+    finally:
+        fout.close()
+
+
 def BuildFits(file_name, config, logger=None, 
               image_num=0, obj_num=0,
               psf_file_name=None, psf_hdu=None,
@@ -593,8 +1037,7 @@ def BuildDataCube(file_name, nimages, config, nproc=1, logger=None,
     # Enforce this by buliding the first image outside the below loop and setting
     # config['image_xsize'] and config['image_ysize'] to be the size of the first image.
     t2 = time.time()
-    import copy
-    config1 = copy.deepcopy(config)
+    config1 = CopyConfig(config)
     all_images = galsim.config.BuildImage(
             config=config1, logger=logger, image_num=image_num, obj_num=obj_num,
             make_psf_image=make_psf_image, 
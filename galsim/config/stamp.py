@@ -23,7 +23,8 @@ import galsim
 
 def BuildStamps(nobjects, config, xsize, ysize, 
                 obj_num=0, nproc=1, sky_level_pixel=None, do_noise=True, logger=None,
-                make_psf_image=False, make_weight_image=False, make_badpix_image=False):
+                make_psf_image=False, make_weight_image=False, make_badpix_image=False,
+                canvas=None):
     """
     Build a number of postage stamp images as specified by the config dict.
 
@@ -39,24 +40,14 @@ def BuildStamps(nobjects, config, xsize, ysize,
     @param make_psf_image      Whether to make psf_image.
     @param make_weight_image   Whether to make weight_image.
     @param make_badpix_image   Whether to make badpix_image.
+    @param canvas              If given, a Canvas to add each stamp into as soon as it is
+                               built.  If canvas.shared is True, the worker processes add
+                               their stamps directly.  Otherwise, the main process adds them
+                               as they arrive.  Either way, the returned lists just have None
+                               for each stamp.
 
     @return (images, psf_images, weight_images, badpix_images)  (All in tuple are lists)
     """
-    def worker(input, output):
-        for (kwargs, config, obj_num, nobj, info) in iter(input.get, 'STOP'):
-            results = []
-            # Make new copies of config and kwargs so we can update them without
-            # clobbering the versions for other tasks on the queue.
-            # (The config modifications come in BuildSingleStamp.)
-            import copy
-            kwargs1 = copy.copy(kwargs)
-            config1 = copy.deepcopy(config)
-            for i in range(nobj):
-                kwargs1['config'] = config1
-                kwargs1['obj_num'] = obj_num + i
-                results.append(BuildSingleStamp(**kwargs1))
-            output.put( (results, info, current_process().name) )
-    
     # The kwargs to pass to build_func.
     # We'll be adding to this below...
     kwargs = {
@@ -92,8 +83,6 @@ def BuildStamps(nobjects, config, xsize, ysize,
                 "config.image.nproc <= 0, but unable to determine number of cpus.")
     
     if nproc > 1:
-        from multiprocessing import Process, Queue, current_process
-
         # Initialize the images list to have the correct size.
         # This is important here, since we'll be getting back images in a random order,
         # and we need them to go in the right places (in order to have deterministic
@@ -104,79 +93,61 @@ def BuildStamps(nobjects, config, xsize, ysize,
         badpix_images = [ None for i in range(nobjects) ]
 
         # Number of objects to do in each task:
-        # At most nobjects / nproc.
-        # At least 1 normally, but number in Ring if doing a Ring test
-        # Shoot for geometric mean of these two.
-        max_nobj = nobjects / nproc
+        # At least 1 normally, but number in Ring if doing a Ring test.
+        # The objects can take very different amounts of time to draw, so rather than use 
+        # the same number for every task, we use an estimate of the cost of each object 
+        # to make chunks that start out big and get smaller towards the end.
         min_nobj = 1
         if ( 'gal' in config and isinstance(config['gal'],dict) and 'type' in config['gal'] and
              config['gal']['type'] == 'Ring' and 'num' in config['gal'] ):
             min_nobj = galsim.config.ParseValue(config['gal'], 'num', config, int)[0]
-        if max_nobj < min_nobj: 
-            nobj_per_task = min_nobj
-        else:
-            import math
-            # This formula keeps nobj a multiple of min_nobj, so Rings are intact.
-            nobj_per_task = min_nobj * int(math.sqrt(float(max_nobj) / float(min_nobj)))
+        costs = [ EstimateStampCost(config, obj_num+k) for k in range(nobjects) ]
+        # This keeps the number in each chunk a multiple of min_nobj, so Rings are intact.
+        chunks = galsim.config.MakeTaskChunks(costs, nproc, min_nobj)
 
         # Set up the task list
-        task_queue = Queue()
-        for k in range(0,nobjects,nobj_per_task):
-            # Send kwargs, config, obj_num, nobj, k
-            if k + nobj_per_task > nobjects:
-                task_queue.put( ( kwargs, config, obj_num+k, nobjects-k, k ) )
-            else:
-                task_queue.put( ( kwargs, config, obj_num+k, nobj_per_task, k ) )
+        # The input objects that don't change get rebuilt in the workers (normally from their 
+        # input cache), so we don't need to pickle them for each task.
+        shared_config = galsim.config.RemoveSharedInputs(config)
+        # Only a SharedCanvas can be written to by the workers.  A regular Canvas stays
+        # here, and we add the stamps to it as they come back.
+        if canvas and canvas.shared:
+            task_canvas = canvas
+        else:
+            task_canvas = None
+        tasks = []
+        for (k, nobj) in chunks:
+            task_kwargs = { 'kwargs' : kwargs, 'config' : shared_config, 'obj_num' : obj_num+k,
+                            'nobj' : nobj, 'canvas' : task_canvas, 'k' : k }
+            tasks.append( (_BuildStampsTask, task_kwargs, k) )
 
         # Run the tasks
-        # Each Process command starts up a parallel process that will keep checking the queue 
-        # for a new task. If there is one there, it grabs it and does it. If not, it waits 
-        # until there is one to grab. When it finds a 'STOP', it shuts down. 
-        done_queue = Queue()
-        p_list = []
-        for j in range(nproc):
-            # The name is actually the default name for the first time we do this,
-            # but after that it just keeps incrementing the numbers, rather than starting
-            # over at Process-1.  As far as I can tell, it's not actually spawning more 
-            # processes, so for the sake of the info output, we name the processes 
-            # explicitly.
-            p = Process(target=worker, args=(task_queue, done_queue), name='Process-%d'%(j+1))
-            p.start()
-            p_list.append(p)
-
-        # In the meanwhile, the main process keeps going.  We pull each set of images off of the 
-        # done_queue and put them in the appropriate place in the lists.
-        # This loop is happening while the other processes are still working on their tasks.
-        # You'll see that these logging statements get print out as the stamp images are still 
-        # being drawn.  
-        for i in range(0,nobjects,nobj_per_task):
-            results, k, proc = done_queue.get()
-            for result in results:
-                images[k] = result[0]
-                psf_images[k] = result[1]
-                weight_images[k] = result[2]
-                badpix_images[k] = result[3]
-                if logger:
-                    # Note: numpy shape is y,x
-                    ys, xs = result[0].array.shape
-                    t = result[4]
-                    logger.info('%s: Stamp %d: size = %d x %d, time = %f sec', 
-                                proc, obj_num+k, xs, ys, t)
-                k += 1
-
-        # Stop the processes
-        # The 'STOP's could have been put on the task list before starting the processes, or you
-        # can wait.  In some cases it can be useful to clear out the done_queue (as we just did)
-        # and then add on some more tasks.  We don't need that here, but it's perfectly fine to do.
-        # Once you are done with the processes, putting nproc 'STOP's will stop them all.
-        # This is important, because the program will keep running as long as there are running
-        # processes, even if the main process gets to the end.  So you do want to make sure to 
-        # add those 'STOP's at some point!
-        for j in range(nproc):
-            task_queue.put('STOP')
-        for j in range(nproc):
-            p_list[j].join()
-        task_queue.close()
+        # The worker pool has a set of parallel processes that keep checking the task queue
+        # for a new task. If there is one there, a worker grabs it and does it. If not, it waits 
+        # until there is one to grab.  If we are being run from within galsim.config.Process,
+        # then the pool (and its processes) will be reused for the next call, so we don't
+        # pay the start up cost each time.
+        pool = galsim.config.AcquireWorkerPool(nproc)
+        try:
+            # In the meanwhile, the main process keeps going.  We pull each set of images off 
+            # of the done queue and put them in the appropriate place in the lists.
+            # This loop is happening while the other processes are still working on their
+            # tasks.  You'll see that these logging statements get print out as the stamp
+            # images are still being drawn.  
+            for results, k, proc in pool.run(tasks):
+                for result in results:
+                    if canvas and not task_canvas:
+                        result = _AddToCanvas(canvas, k, result)
+                    images[k] = result[0]
+                    psf_images[k] = result[1]
+                    weight_images[k] = result[2]
+                    badpix_images[k] = result[3]
+                    if logger:
+                        _LogStamp(logger, proc+': ', obj_num+k, result, canvas)
+                    k += 1
+        finally:
+            # If this was the only user of the pool, this stops the processes.
+            galsim.config.ReleaseWorkerPool()
 
     else : # nproc == 1
 
@@ -191,15 +162,14 @@ def BuildStamps(nobjects, config, xsize, ysize,
             kwargs['obj_num'] = obj_num+k
             kwargs['logger'] = logger
             result = BuildSingleStamp(**kwargs)
+            if canvas:
+                result = _AddToCanvas(canvas, k, result)
             images += [ result[0] ]
             psf_images += [ result[1] ]
             weight_images += [ result[2] ]
             badpix_images += [ result[3] ]
             if logger:
-                # Note: numpy shape is y,x
-                ys, xs = result[0].array.shape
-                t = result[4]
-                logger.info('Stamp %d: size = %d x %d, time = %f sec', obj_num+k, xs, ys, t)
+                _LogStamp(logger, '', obj_num+k, result, canvas)
 
 
     if logger:
@@ -208,6 +178,88 @@ def BuildStamps(nobjects, config, xsize, ysize,
     return images, psf_images, weight_images, badpix_images
  
 
+def EstimateStampCost(config, obj_num):
+    """
+    Estimate the relative cost of building the stamp for object obj_num.
+
+    This is used to divide up the objects among multiple processes.  See
+    galsim.config.EstimateGSObjectCost for details.
+
+    @return cost
+    """
+    # EstimateGSObjectCost needs seq_index to be set, but leave the config as we found it.
+    orig_seq_index = config.get('seq_index',None)
+    config['seq_index'] = obj_num
+    cost = 0.
+    for key in [ 'psf', 'pix', 'gal' ]:
+        cost += galsim.config.EstimateGSObjectCost(config, key, config)
+    if orig_seq_index is None:
+        del config['seq_index']
+    else:
+        config['seq_index'] = orig_seq_index
+    # Even an empty stamp has some overhead.
+    return max(cost, 1.)
+
+
+def _BuildStampsTask(kwargs, config, obj_num, nobj, canvas=None, k=0):
+    """
+    The function that a WorkerPool process runs to build nobj consecutive stamps.
+
+    @return a list of the BuildSingleStamp results for each stamp.
+    """
+    results = []
+    # Make new copies of config and kwargs so we can update them without
+    # clobbering the versions for other tasks on the queue.
+    # (The config modifications come in BuildSingleStamp.)
+    import copy
+    kwargs1 = copy.copy(kwargs)
+    config1 = galsim.config.CopyConfig(config)
+    galsim.config.RestoreSharedInputs(config1)
+    for i in range(nobj):
+        kwargs1['config'] = config1
+        kwargs1['obj_num'] = obj_num + i
+        result = BuildSingleStamp(**kwargs1)
+        if canvas:
+            result = _AddToCanvas(canvas, k+i, result)
+        results.append(result)
+    if canvas:
+        canvas.release()
+    return results
+
+
+def _AddToCanvas(canvas, k, result):
+    """
+    Add the stamp images from a BuildSingleStamp result to the canvas.
+
+    @return a result tuple without the images, which can be sent back through a Queue cheaply:
+            (None, None, None, None, time, bounds, on_image)
+    """
+    on_image = canvas.addStamp(k, result[0:4])
+    return None, None, None, None, result[4], result[0].bounds, on_image
+
+
+def _LogStamp(logger, prefix, obj_num, result, canvas):
+    """
+    Write the info line about a stamp that has been built.
+    """
+    t = result[4]
+    if canvas:
+        b = result[5]
+        xs = b.xmax - b.xmin + 1
+        ys = b.ymax - b.ymin + 1
+        if not result[6]:
+            logger.warn(
+                "Object centered at (%d,%d) is entirely off the main image,\n"%(
+                    b.center().x, b.center().y) +
+                "whose bounds are (%d,%d,%d,%d)."%(
+                    canvas.bounds.xmin, canvas.bounds.xmax,
+                    canvas.bounds.ymin, canvas.bounds.ymax))
+    else:
+        # Note: numpy shape is y,x
+        ys, xs = result[0].array.shape
+    logger.info('%sStamp %d: size = %d x %d, time = %f sec', prefix, obj_num, xs, ys, t)
+
+
 def BuildSingleStamp(config, xsize, ysize,
                      obj_num=0, sky_level_pixel=None, do_noise=True, logger=None,
                      make_psf_image=False, make_weight_image=False, make_badpix_image=False):
@@ -407,6 +459,28 @@ def BuildGal(config, logger=None):
 
 
 
+def _GetPSFPix(psf, pix, config, real_space=None):
+    """
+    Get the convolution of psf and pix.
+
+    When the psf and pix are safe, BuildPSF and BuildPix return the same objects for every
+    stamp, so in that case we reuse the convolution we made last time, rather than making
+    a new one for each stamp.
+
+    @return the convolution of psf and pix.
+    """
+    # config['psf_pix'][real_space] = (psf, pix, psf_pix) from the last time.
+    if 'psf_pix' not in config:
+        config['psf_pix'] = {}
+    if real_space in config['psf_pix']:
+        last_psf, last_pix, psf_pix = config['psf_pix'][real_space]
+        if last_psf is psf and last_pix is pix:
+            return psf_pix
+    psf_pix = galsim.Convolve([psf, pix], real_space=real_space)
+    config['psf_pix'][real_space] = (psf, pix, psf_pix)
+    return psf_pix
+
+
 def DrawStampFFT(psf, pix, gal, config, xsize, ysize, sky_level_pixel, final_shift):
     """
     Draw an image using the given psf, pix and gal profiles (which may be None)
@@ -428,6 +502,12 @@ def DrawStampFFT(psf, pix, gal, config, xsize, ysize, sky_level_pixel, final_shi
         else:
             final = nopix
         config['wcs_shear'] = wcs_shear
+    elif psf is not None and pix is not None and gal is not None:
+        # The psf and pix are often the same for every object, so use the pre-combined 
+        # convolution of the two.  SBConvolve flattens nested convolutions, so this is the
+        # same as convolving all three together.
+        psf_pix = _GetPSFPix(psf, pix, config, real_space=False)
+        final = galsim.Convolve([psf_pix, gal], real_space=False)
     else:
         fft_list = [ prof for prof in (psf,pix,gal) if prof is not None ]
         final = galsim.Convolve(fft_list)
@@ -852,7 +932,11 @@ def DrawPSFStamp(psf, pix, config, bounds, final_shift):
     else:
         real_space = None
         
-    final_psf = galsim.Convolve(psf_list, real_space=real_space)
+    if wcs_shear or pix is None:
+        final_psf = galsim.Convolve(psf_list, real_space=real_space)
+    else:
+        # Make a copy, since we apply the shifts below.
+        final_psf = _GetPSFPix(psf, pix, config, real_space=real_space).copy()
 
     if 'image' in config and 'pixel_scale' in config['image']:
         pixel_scale = galsim.config.ParseValue(config['image'], 'pixel_scale', config, float)[0]
@@ -53,6 +53,10 @@ valid_value_types = {
     'PowerSpectrumMagnification' : [ float ],
 }
  
+# The generator function for each type in valid_value_types.  These are looked up the first
+# time each type is used.
+_generate_funcs = {}
+
 def ParseValue(config, param_name, base, value_type):
     """@brief Read or generate a parameter value from config.
 
@@ -99,7 +103,7 @@ def ParseValue(config, param_name, base, value_type):
         #print 'type = ',type
 
         # First check if the value_type is valid.
-        if type not in valid_value_types.keys():
+        if type not in valid_value_types:
             raise AttributeError(
                 "Unrecognized type = %s specified for parameter %s"%(type,param_name))
             
@@ -108,7 +112,9 @@ def ParseValue(config, param_name, base, value_type):
                 "Invalid value_type = %s specified for parameter %s with type = %s."%(
                     value_type, param_name, type))
 
-        generate_func = eval('_GenerateFrom' + type)
+        if type not in _generate_funcs:
+            _generate_funcs[type] = eval('_GenerateFrom' + type)
+        generate_func = _generate_funcs[type]
         #print 'generate_func = ',generate_func
         val, safe = generate_func(param, param_name, base, value_type)
         #print 'returned val, safe = ',val,safe
@@ -122,6 +128,12 @@ def ParseValue(config, param_name, base, value_type):
                 "Could not convert %s param = %s to type %s."%(param_name,val,value_type))
         param['current_val'] = val
         #print param_name,' = ',val
+
+        # If the value will be the same every time, replace the dict with the value itself.
+        # Then next time, we can return it right away at the top of this function, rather
+        # than checking and parsing all the parameters again.
+        if safe:
+            config[param_name] = val
         return val, safe
 
 
@@ -179,7 +191,7 @@ def CheckAllParams(param, param_name, req={}, opt={}, single=[], ignore=[]):
     @return a dict, get, with get[key] = value_type for all keys to get
     """
     get = {}
-    valid_keys = req.keys() + opt.keys()
+    valid_keys = set(req.keys() + opt.keys())
     # Check required items:
     for (key, value_type) in req.items():
         if key in param:
@@ -197,7 +209,7 @@ def CheckAllParams(param, param_name, req={}, opt={}, single=[], ignore=[]):
     for s in single: 
         if not s: # If no items in list, don't require one of them to be present.
             break
-        valid_keys += s.keys()
+        valid_keys.update(s.keys())
         count = 0
         for (key, value_type) in s.items():
             if key in param:
@@ -213,9 +225,9 @@ def CheckAllParams(param, param_name, req={}, opt={}, single=[], ignore=[]):
                     s.keys(),param_name,param['type']))
 
     # Check that there aren't any extra keys in param:
-    valid_keys += ignore
-    valid_keys += [ 'type', 'current_val' ]  # These might be there, and it's ok.
-    valid_keys += [ '#' ] # When we read in json files, there represent comments
+    valid_keys.update(ignore)
+    valid_keys.update([ 'type', 'current_val' ])  # These might be there, and it's ok.
+    valid_keys.update([ '#' ]) # When we read in json files, there represent comments
     for key in param.keys():
         if key not in valid_keys:
             raise AttributeError(
@@ -889,6 +901,14 @@ def _type_by_letter(key):
     else:
         raise AttributeError("Invalid Eval variable: %s (starts with an invalid letter)"%key)
 
+# Eval strings are compiled the first time they are used, and the code is saved here, indexed 
+# by the string.  The values are tuples (code, names), where names is the set of the names
+# used by the code.
+_eval_code = {}
+
+# These are the variables from the base config that are available to Eval strings.
+_eval_base_variables = [ 'pos', 'rng', 'catalog', 'real_catalog', 'nfw_halo', 'power_spectrum' ]
+
 def _GenerateFromEval(param, param_name, base, value_type):
     """@brief Evaluate a string as the provided type
     """
@@ -907,10 +927,16 @@ def _GenerateFromEval(param, param_name, base, value_type):
     string = params['str']
     #print 'string = ',string
 
+    # We allow the use of math functions
+    import math
+    import numpy
+    import os
+    namespace = { 'math' : math, 'numpy' : numpy, 'os' : os }
+
     # Bring the user-defined variables into scope.
     for key in opt.keys():
-        exec(key[1:] + ' = params[key]')
-        #print key[1:],'=',eval(key[1:])
+        namespace[key[1:]] = params[key]
+        #print key[1:],'=',params[key]
 
     # Also bring in any top level eval_variables
     if 'eval_variables' in base:
@@ -927,45 +953,36 @@ def _GenerateFromEval(param, param_name, base, value_type):
         #print 'params = ',params
         safe = safe and safe1
         for key in opt.keys():
-            exec(key[1:] + ' = params[key]')
-            #print key[1:],'=',eval(key[1:])
-
-    # Also, we allow the use of math functions
-    import math
-    import numpy
-    import os
+            namespace[key[1:]] = params[key]
+            #print key[1:],'=',params[key]
 
-    # Try evaluating the string as is.
-    try:
-        val = value_type(eval(string))
-        #print 'Simple success: val = ',val
-        return val, safe
-    except:
-        pass
-
-    # Then try bringing in the allowed variables to see if that works:
-    if 'pos' in base:
-        pos = base['pos']
-        #print 'pos = ',pos
-    if 'rng' in base:
-        rng = base['rng']
-    if 'catalog' in base:
-        catalog = base['catalog']
-    if 'real_catalog' in base:
-        real_catalog = base['real_catalog']
-    if 'nfw_halo' in base:
-        nfw_halo = base['nfw_halo']
-    if 'power_spectrum' in base:
-        power_spectrum = base['power_spectrum']
+    if string not in _eval_code:
+        try:
+            code = compile(string, '<string>', 'eval')
+        except SyntaxError:
+            raise ValueError("Unable to evaluate string %r as a %s for %s"%(
+                    string,value_type,param_name))
+        _eval_code[string] = (code, set(code.co_names))
+    code, names = _eval_code[string]
+
+    # If the string uses any of the allowed variables from base (that aren't user-defined
+    # variables of the same name), bring those in too.  Then the value will be different
+    # for each object, so it's not safe.
+    for key in _eval_base_variables:
+        if key in names and key not in namespace and key in base:
+            #print 'Needs ',key
+            namespace[key] = base[key]
+            safe = False
 
     try:
-        val = value_type(eval(string))
-        #print 'Needed pos: val = ',val
-        return val, False
+        val = value_type(eval(code, globals(), namespace))
+        #print 'val = ',val
     except:
         raise ValueError("Unable to evaluate string %r as a %s for %s"%(
                 string,value_type,param_name))
 
+    return val, safe
+
 
 def SetDefaultIndex(config, num):
     """
@@ -192,11 +192,11 @@ class _CorrFunc(object):
         gaussvec = galsim.ImageD(image.bounds)
         gaussvec.addNoise(g)
         noise_array = np.sqrt(2.) * np.fft.ifft2(gaussvec.array * rootps)
-        # Make contiguous and add/assign to the image
+        # Add/assign to the image.  Adding can use the (non-contiguous) real part directly.
         if add_to_image:
-            image += galsim.ImageViewD(np.ascontiguousarray(noise_array.real))
+            image += noise_array.real
         else:
-            image = galsim.ImageViewD(np.ascontiguousarray(noise_array.real))
+            image = galsim.image.asImageView(noise_array.real)
         return image
 
     def applyTransformation(self, ellipse):
@@ -503,8 +503,8 @@ class ImageCorrFunc(_CorrFunc):
             cf_array[cf_array_prelim.shape[0], :] = bottom_row[::-1] # inverts order as required
 
         # Store power spectrum and correlation function in an image 
-        original_ps_image = galsim.ImageViewD(np.ascontiguousarray(ps_array))
-        original_cf_image = galsim.ImageViewD(np.ascontiguousarray(cf_array))
+        original_ps_image = galsim.image.asImageView(ps_array)
+        original_cf_image = galsim.image.asImageView(cf_array)
 
         # Correctly record the original image scale if set
         if dx > 0.:
@@ -116,7 +116,9 @@ for Class in _galsim.ImageView.itervalues():
     
     The array argument to the constructor must have contiguous values along rows, which should be
     the case for newly-constructed arrays, but may not be true for some views and generally will not
-    be true for array transposes.
+    be true for array transposes.  The ImageView uses the memory of the array directly, without
+    copying it.  To make an ImageView from an arbitrary array, use galsim.image.asImageView, which
+    only copies the array if it cannot be used directly.
     
     An ImageView also has a '.array' attribute that provides a numpy array view into the ImageView
     instance's pixels.  Regardless of how the ImageView was constructed, this array and the
@@ -150,6 +152,29 @@ for Class in _galsim.ConstImageView.itervalues():
     to modify the array.
     """
 
+def asImageView(array, dtype=numpy.float64, xmin=1, ymin=1):
+    """Return an ImageView[dtype] of a NumPy array, copying the array only if necessary.
+
+    If the array already has the given dtype (in native byte order), is 2-d, aligned and writeable,
+    and has contiguous values along rows, then the returned ImageView shares its memory with the
+    array.  Otherwise, the values are first copied into a new contiguous array of the right type.
+
+    @param array   The NumPy array (or anything that can be converted to one).
+    @param dtype   The pixel type of the ImageView.  (Default `dtype = numpy.float64`)
+    @param xmin    The x value of the first column.  (Default `xmin = 1`)
+    @param ymin    The y value of the first row.  (Default `ymin = 1`)
+    @returns the ImageView.
+    """
+    array = numpy.asarray(array)
+    dtype = numpy.dtype(dtype)
+    if not (array.dtype == dtype and array.ndim == 2 and
+            array.flags.aligned and array.flags.writeable and
+            array.strides[1] == dtype.itemsize and
+            array.strides[0] >= array.shape[1] * dtype.itemsize and
+            array.strides[0] % dtype.itemsize == 0):
+        array = numpy.array(array, dtype=dtype, order='C')
+    return _galsim.ImageView[dtype.type](array, xmin, ymin)
+
 def Image_setitem(self, key, value):
     self.subImage(key).copyFrom(value)
 
@@ -584,28 +584,17 @@ class PowerSpectrum(object):
             sbii_g2 = galsim.SBInterpolatedImage(self.im_g2, xInterp=interpolant2d)
 
         # interpolate if necessary
-        g1,g2 = [], []
-        for iter_pos in [ galsim.PositionD(pos_x[i],pos_y[i]) for i in range(len(pos_x)) ]:
-            # Check that the position is in the bounds of the interpolated image
-            if not self.bounds.includes(iter_pos):
-                import warnings
-                warnings.warn(
-                    "Warning: position (%f,%f) not within the bounds "%(pos.x,pos.y) +
-                    "of the gridded shear values: " + str(self.bounds) +
-                    ".  Returning a shear of (0,0) for this point.")
-                g1.append(0.)
-                g2.append(0.)
-            else:
-                g1.append(sbii_g1.xValue(iter_pos+self.offset))
-                g2.append(sbii_g2.xValue(iter_pos+self.offset))
+        g1, g2 = self._interpolate([sbii_g1, sbii_g2], pos_x, pos_y,
+                                   "of the gridded shear values: ",
+                                   ".  Returning a shear of (0,0) for this point.")
         if isinstance(pos, galsim.PositionD):
             return g1[0], g2[0]
         elif isinstance(pos[0], np.ndarray):
-            return np.array(g1), np.array(g2)
+            return g1, g2
         elif len(pos_x) == 1 and not isinstance(pos[0],list):
             return g1[0], g2[0]
         else:
-            return g1, g2
+            return g1.tolist(), g2.tolist()
 
     def getConvergence(self, pos, units=galsim.arcsec):
         """
@@ -656,26 +645,17 @@ class PowerSpectrum(object):
         sbii_kappa = galsim.SBInterpolatedImage(self.im_kappa, xInterp=interpolant2d)
 
         # interpolate if necessary
-        kappa = []
-        for iter_pos in [ galsim.PositionD(pos_x[i],pos_y[i]) for i in range(len(pos_x)) ]:
-            # Check that the position is in the bounds of the interpolated image
-            if not self.bounds.includes(iter_pos):
-                import warnings
-                warnings.warn(
-                    "Warning: position (%f,%f) not within the bounds "%(pos.x,pos.y) +
-                    "of the gridded convergence values: " + str(self.bounds) + 
-                    ".  Returning a convergence of 0 for this point.")
-                kappa.append(0.)
-            else:
-                kappa.append(sbii_kappa.xValue(iter_pos+self.offset))
+        kappa, = self._interpolate([sbii_kappa], pos_x, pos_y,
+                                   "of the gridded convergence values: ",
+                                   ".  Returning a convergence of 0 for this point.")
         if isinstance(pos, galsim.PositionD):
             return kappa[0]
         elif isinstance(pos[0], np.ndarray):
-            return np.array(kappa)
+            return kappa
         elif len(pos_x) == 1 and not isinstance(pos[0],list): 
             return kappa[0]
         else:
-            return kappa
+            return kappa.tolist()
 
     def getMagnification(self, pos, units=galsim.arcsec):
         """
@@ -733,26 +713,17 @@ class PowerSpectrum(object):
         sbii_mu = galsim.SBInterpolatedImage(mu, xInterp=interpolant2d)
 
         # interpolate if necessary
-        mu = []
-        for iter_pos in [ galsim.PositionD(pos_x[i],pos_y[i]) for i in range(len(pos_x)) ]:
-            # Check that the position is in the bounds of the interpolated image
-            if not self.bounds.includes(iter_pos):
-                import warnings
-                warnings.warn(
-                    "Warning: position (%f,%f) not within the bounds "%(pos.x,pos.y) +
-                    "of the gridded convergence values: " + str(self.bounds) + 
-                    ".  Returning a magnification of 0 for this point.")
-                mu.append(0.)
-            else:
-                mu.append(sbii_mu.xValue(iter_pos+self.offset))
+        mu, = self._interpolate([sbii_mu], pos_x, pos_y,
+                                "of the gridded convergence values: ",
+                                ".  Returning a magnification of 0 for this point.")
         if isinstance(pos, galsim.PositionD):
             return mu[0]
         elif isinstance(pos[0], np.ndarray):
-            return np.array(mu)
+            return mu
         elif len(pos_x) == 1 and not isinstance(pos[0],list): 
             return mu[0]
         else:
-            return mu
+            return mu.tolist()
 
     def getLensing(self, pos, units=galsim.arcsec):
         """
@@ -818,30 +789,44 @@ class PowerSpectrum(object):
         sbii_mu = galsim.SBInterpolatedImage(mu, xInterp=interpolant2d)
 
         # interpolate if necessary
-        g1, g2, mu = [], [], []
-        for iter_pos in [ galsim.PositionD(pos_x[i],pos_y[i]) for i in range(len(pos_x)) ]:
-            # Check that the position is in the bounds of the interpolated image
-            if not self.bounds.includes(iter_pos):
-                import warnings
-                warnings.warn(
-                    "Warning: position (%f,%f) not within the bounds "%(pos.x,pos.y) +
-                    "of the gridded convergence values: " + str(self.bounds) + 
-                    ".  Returning 0 for lensing observables at this point.")
-                g1.append(0.)
-                g2.append(0.)
-                mu.append(0.)
-            else:
-                g1.append(sbii_g1.xValue(iter_pos+self.offset))
-                g2.append(sbii_g2.xValue(iter_pos+self.offset))
-                mu.append(sbii_mu.xValue(iter_pos+self.offset))
+        g1, g2, mu = self._interpolate([sbii_g1, sbii_g2, sbii_mu], pos_x, pos_y,
+                                       "of the gridded convergence values: ",
+                                       ".  Returning 0 for lensing observables at this point.")
         if isinstance(pos, galsim.PositionD):
             return g1[0], g2[0], mu[0]
         elif isinstance(pos[0], np.ndarray):
-            return np.array(g1), np.array(g2), np.array(mu)
+            return g1, g2, mu
         elif len(pos_x) == 1 and not isinstance(pos[0],list): 
             return g1[0], g2[0], mu[0]
         else:
-            return g1, g2, mu
+            return g1.tolist(), g2.tolist(), mu.tolist()
+
+    def _interpolate(self, sbii_list, pos_x, pos_y, msg1, msg2):
+        """Evaluate each of the SBInterpolatedImages in sbii_list at the given positions.
+
+        All the positions are evaluated in a single C++ call for each SBInterpolatedImage.
+        Positions that are outside the grid get a value of 0, with a warning made from
+        msg1 and msg2.
+
+        @returns a list of NumPy arrays, one for each item in sbii_list.
+        """
+        inside = ( (pos_x >= self.bounds.xmin) & (pos_x <= self.bounds.xmax) &
+                   (pos_y >= self.bounds.ymin) & (pos_y <= self.bounds.ymax) )
+        if not inside.all():
+            import warnings
+            for i in np.where(~inside)[0]:
+                warnings.warn(
+                    "Warning: position (%f,%f) not within the bounds "%(pos_x[i],pos_y[i]) +
+                    msg1 + str(self.bounds) + msg2)
+        x = pos_x[inside] + self.offset.x
+        y = pos_y[inside] + self.offset.y
+        vals = []
+        for sbii in sbii_list:
+            val = np.zeros(len(pos_x))
+            if len(x) > 0:
+                val[inside] = galsim.GSObject(sbii).xValue(x, y)
+            vals.append(val)
+        return vals
 
 class PowerSpectrumRealizer(object):
     """Class for generating realizations of power spectra with any area and pixel size.
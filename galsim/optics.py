@@ -187,8 +187,8 @@ def wavefront_image(array_shape=(256, 256), dx=1., lam_over_diam=2., defocus=0.,
         array_shape=array_shape, dx=dx, lam_over_diam=lam_over_diam, defocus=defocus, astig1=astig1,
         astig2=astig2, coma1=coma1, coma2=coma2, spher=spher, circular_pupil=circular_pupil, 
         obscuration=obscuration)
-    imreal = galsim.ImageViewD(np.ascontiguousarray(array.real.astype(np.float64)))
-    imimag = galsim.ImageViewD(np.ascontiguousarray(array.imag.astype(np.float64)))
+    imreal = galsim.image.asImageView(array.real)
+    imimag = galsim.image.asImageView(array.imag)
     if array_shape[0] != array_shape[1]:
         import warnings
         warnings.warn(
@@ -270,7 +270,7 @@ def psf_image(array_shape=(256, 256), dx=1., lam_over_diam=2., defocus=0., astig
         array_shape=array_shape, dx=dx, lam_over_diam=lam_over_diam, defocus=defocus, astig1=astig1,
         astig2=astig2, coma1=coma1, coma2=coma2, spher=spher, circular_pupil=circular_pupil, 
         obscuration=obscuration, flux=flux)
-    im = galsim.ImageViewD(array.astype(np.float64))
+    im = galsim.image.asImageView(array)
     im.setScale(dx)
     return im
 
@@ -345,8 +345,8 @@ def otf_image(array_shape=(256, 256), dx=1., lam_over_diam=2., defocus=0., astig
         array_shape=array_shape, dx=dx, lam_over_diam=lam_over_diam, defocus=defocus, astig1=astig1,
         astig2=astig2, coma1=coma1, coma2=coma2, spher=spher, circular_pupil=circular_pupil, 
         obscuration=obscuration)
-    imreal = galsim.ImageViewD(np.ascontiguousarray(array.real.astype(np.float64)))
-    imimag = galsim.ImageViewD(np.ascontiguousarray(array.imag.astype(np.float64)))
+    imreal = galsim.image.asImageView(array.real)
+    imimag = galsim.image.asImageView(array.imag)
     if array_shape[0] != array_shape[1]:
         import warnings
         warnings.warn(
@@ -423,7 +423,7 @@ def mtf_image(array_shape=(256, 256), dx=1., lam_over_diam=2., defocus=0., astig
         array_shape=array_shape, dx=dx, lam_over_diam=lam_over_diam, defocus=defocus, astig1=astig1,
         astig2=astig2, coma1=coma1, coma2=coma2, spher=spher, circular_pupil=circular_pupil, 
         obscuration=obscuration)
-    im = galsim.ImageViewD(array.astype(np.float64))
+    im = galsim.image.asImageView(array)
     if array_shape[0] != array_shape[1]:
         import warnings
         warnings.warn(
@@ -505,7 +505,7 @@ def ptf_image(array_shape=(256, 256), dx=1., lam_over_diam=2., defocus=0., astig
         array_shape=array_shape, dx=dx, lam_over_diam=lam_over_diam, defocus=defocus, astig1=astig1,
         astig2=astig2, coma1=coma1, coma2=coma2, spher=spher, circular_pupil=circular_pupil, 
         obscuration=obscuration)
-    im = galsim.ImageViewD(array.astype(np.float64))
+    im = galsim.image.asImageView(array)
     if array_shape[0] != array_shape[1]:
         import warnings
         warnings.warn(
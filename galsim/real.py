@@ -116,6 +116,8 @@ class RealGalaxyCatalog(object):
     _opt_params = { 'image_dir' : str , 'dir' : str, 'preload' : bool }
     _single_params = []
     _takes_rng = False
+    # The maximum number of interpolated images that RealGalaxy caches with the catalog.
+    _max_interpolated_cache = 10
 
     # nobject_only is an intentionally undocumented kwarg that should be used only by
     # the config structure.  It indicates that all we care about is the nobjects parameter.
@@ -169,10 +171,36 @@ class RealGalaxyCatalog(object):
         self.preloaded = False
         self.do_preload = preload
 
+        # Interpolated images of the entries, cached by RealGalaxy.  Each one holds a padded
+        # image and its Fourier transform, so only the most recently used ones are kept.
+        # _interpolated_keys lists the keys in order of use, most recent last.
+        self._interpolated_cache = {}
+        self._interpolated_keys = []
+
         # eventually I think we'll want information about the training dataset, 
         # i.e. (dataset, ID within dataset)
         # also note: will be adding bits of information, like noise properties and galaxy fit params
 
+    def _getInterpolated(self, key):
+        """Internal function to get the cached interpolated images for key, or None.
+        """
+        if key not in self._interpolated_cache:
+            return None
+        self._interpolated_keys.remove(key)
+        self._interpolated_keys.append(key)
+        return self._interpolated_cache[key]
+
+    def _setInterpolated(self, key, value):
+        """Internal function to cache the interpolated images for key, dropping the least recently
+        used ones if there are more than _max_interpolated_cache.
+        """
+        if key in self._interpolated_cache:
+            self._interpolated_keys.remove(key)
+        self._interpolated_cache[key] = value
+        self._interpolated_keys.append(key)
+        while len(self._interpolated_keys) > self._max_interpolated_cache:
+            del self._interpolated_cache[self._interpolated_keys.pop(0)]
+
     def _get_index_for_id(self, id):
         """Internal function to find which index number corresponds to the value ID in the ident 
         field.
@@ -217,11 +245,13 @@ class RealGalaxyCatalog(object):
         if self.do_preload and not self.preloaded:
             self.preload()
         if self.preloaded:
-            array = self.loaded_files[self.gal_file_name[i]][self.gal_hdu[i]].data
+            # Always copy the preloaded data, so the returned image doesn't share memory with it.
+            array = numpy.array(self.loaded_files[self.gal_file_name[i]][self.gal_hdu[i]].data,
+                                dtype=numpy.float64)
         else:
             file_name = os.path.join(self.image_dir,self.gal_file_name[i])
             array = pyfits.getdata(file_name,self.gal_hdu[i])
-        return galsim.ImageViewD(numpy.ascontiguousarray(array.astype(numpy.float64)))
+        return galsim.image.asImageView(array)
 
     def getPSF(self, i):
         """Returns the PSF at index `i` as an ImageViewD object.
@@ -235,11 +265,13 @@ class RealGalaxyCatalog(object):
         if self.do_preload and not self.preloaded:
             self.preload()
         if self.preloaded:
-            array = self.loaded_files[self.PSF_file_name[i]][self.PSF_hdu[i]].data
+            # Always copy the preloaded data, so the returned image doesn't share memory with it.
+            array = numpy.array(self.loaded_files[self.PSF_file_name[i]][self.PSF_hdu[i]].data,
+                                dtype=numpy.float64)
         else:
             file_name = os.path.join(self.image_dir,self.PSF_file_name[i])
             array = pyfits.getdata(file_name,self.PSF_hdu[i])
-        return galsim.ImageViewD(numpy.ascontiguousarray(array.astype(numpy.float64)))
+        return galsim.image.asImageView(array)
 
 
 def simReal(real_galaxy, target_PSF, target_pixel_scale, g1=0.0, g2=0.0, rotation_angle=None, 
@@ -0,0 +1,158 @@
+// -*- c++ -*-
+/*
+ * Copyright 2012, 2013 The GalSim developers:
+ * https://github.com/GalSim-developers
+ *
+ * This file is part of GalSim: The modular galaxy image simulation toolkit.
+ *
+ * GalSim is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * GalSim is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with GalSim.  If not, see <http://www.gnu.org/licenses/>
+ */
+
+#ifndef ALIAS_TABLE_H
+#define ALIAS_TABLE_H
+
+#include <vector>
+#include <cmath>
+
+#include "Std.h"
+
+namespace galsim {
+
+    /**
+     * @brief Class for random draws among a fixed set of choices with known probabilities
+     *
+     * This implements Walker's alias method, using Vose's algorithm to build the table.
+     * For n choices, the table has n bins of equal probability 1/n.  Bin i is shared between
+     * choice i, which gets a fraction `prob[i]` of the bin, and one other choice `alias[i]`,
+     * which gets the rest.  So a draw only needs one uniform deviate: its integer part (after
+     * multiplying by n) selects the bin, and its fractional part selects between the two choices
+     * in that bin.  This takes the same time for any number of choices and any distribution of
+     * probabilities.
+     *
+     * The absolute values of the weights are used as the relative probabilities.  Choices with
+     * zero weight are never selected.
+     */
+    class AliasTable
+    {
+    public:
+        /// @brief Make an empty table.  Call build() before using find().
+        AliasTable() {}
+
+        /**
+         * @brief Make the table for the given weights.
+         *
+         * @param[in] weights The relative probability of each choice.
+         */
+        explicit AliasTable(const std::vector<double>& weights) { build(weights); }
+
+        /**
+         * @brief (Re)build the table for the given weights.
+         *
+         * @param[in] weights The relative probability of each choice.  At least one must be
+         *            non-zero.
+         */
+        void build(const std::vector<double>& weights)
+        {
+            const int n = weights.size();
+            dbg<<"Build AliasTable with "<<n<<" entries\n";
+            _prob.resize(n);
+            _alias.resize(n);
+            double totalAbsWeight = 0.;
+            int imax = 0;
+            for (int i=0; i<n; ++i) {
+                totalAbsWeight += std::abs(weights[i]);
+                if (std::abs(weights[i]) > std::abs(weights[imax])) imax = i;
+            }
+            dbg<<"totalAbsWeight = "<<totalAbsWeight<<std::endl;
+
+            // Scale the weights so the mean is 1, and split the choices into those with less
+            // than one bin's worth of probability and those with at least that much.
+            std::vector<double> scaled(n);
+            std::vector<int> small;
+            std::vector<int> large;
+            for (int i=0; i<n; ++i) {
+                scaled[i] = std::abs(weights[i]) * n / totalAbsWeight;
+                _alias[i] = i;
+                if (scaled[i] < 1.) small.push_back(i);
+                else large.push_back(i);
+            }
+            // Fill each small one's bin with probability from a large one.
+            while (!small.empty() && !large.empty()) {
+                int s = small.back();
+                small.pop_back();
+                int l = large.back();
+                _prob[s] = scaled[s];
+                _alias[s] = l;
+                scaled[l] -= 1. - scaled[s];
+                if (scaled[l] < 1.) {
+                    large.pop_back();
+                    small.push_back(l);
+                }
+            }
+            // Any that are left have exactly one bin's worth of probability, apart from
+            // rounding errors.
+            for (size_t k=0; k<large.size(); ++k) _prob[large[k]] = 1.;
+            for (size_t k=0; k<small.size(); ++k) {
+                int s = small[k];
+                // But don't let a zero-weight choice pick up a bin from rounding errors.
+                if (weights[s] == 0.) {
+                    _prob[s] = 0.;
+                    _alias[s] = imax;
+                } else {
+                    _prob[s] = 1.;
+                }
+            }
+        }
+
+        /// @brief The number of choices in the table.
+        int size() const { return _prob.size(); }
+
+        /**
+         * @brief Choose a member of the table based on a uniform deviate
+         *
+         * The parameter unitRandom must be a uniform deviate in the interval [0,1), and on
+         * output, it is replaced by another value that is uniformly distributed in [0,1) and
+         * independent of which member was chosen.  It may be used for further random draws
+         * within the chosen member.
+         *
+         * @param[in,out] unitRandom On input, a random number between 0 and 1.  On output,
+         *               holds a new uniform deviate.
+         * @returns The index of the chosen member.
+         */
+        int find(double& unitRandom) const
+        {
+            const int n = _prob.size();
+            double t = unitRandom * n;
+            // Note: Don't need floor here, since t is positive, so floor is superfluous.
+            int i = int(t);
+            if (i >= n) i = n-1;  // should not happen, but be safe
+            double frac = t - i;
+            if (frac < _prob[i]) {
+                unitRandom = frac / _prob[i];
+                return i;
+            } else {
+                unitRandom = (frac - _prob[i]) / (1. - _prob[i]);
+                return _alias[i];
+            }
+        }
+
+    private:
+
+        std::vector<double> _prob;  ///< The fraction of bin i that goes to choice i
+        std::vector<int> _alias;    ///< The choice that gets the rest of bin i
+    };
+
+}
+
+#endif
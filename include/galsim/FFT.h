@@ -28,7 +28,9 @@
  *
  * Notes:
  * 
- * * Requires that the FFTW is set up to do double-precision.
+ * * Requires that the FFTW is set up to do double-precision.  If the single-precision FFTW
+ * library is also available, the transforms can optionally be done in single precision.
+ * See SetFFTPrecision.
  *
  * * All tables have even dimensions (enforced on construction).
  *
@@ -68,6 +70,7 @@
 
 #include "Std.h"
 #include "Interpolant.h"
+#include "Mutex.h"
 
 // Define this to get extra debugging checks in the FFT routines.
 // Since these routines are not available to the end user, once code is working
@@ -107,12 +110,18 @@ namespace galsim {
         enum { isreal = true }; 
         typedef T fftw_type;
     };
-    template <typename T>
-    struct FFTW_Traits<std::complex<T> >
+    template <>
+    struct FFTW_Traits<std::complex<double> >
     { 
         enum { isreal = false }; 
         typedef fftw_complex fftw_type;
     };
+    template <>
+    struct FFTW_Traits<std::complex<float> >
+    { 
+        enum { isreal = false }; 
+        typedef fftwf_complex fftw_type;
+    };
 
     // Handle the FFTW3 memory allocation, which assured 16-bit alignment for SSE usage.
     // FFTW3 now states that C++ complex<double> will be bit-compatible with 
@@ -190,6 +199,74 @@ namespace galsim {
      */
     int goodFFTSize(int input);
 
+    /**
+     * @brief Set the number of threads to use for large Fourier-space draws.
+     *
+     * These threads are used in SBProfile::fourierDraw to fill in the k-space grid, to wrap it
+     * and to do the FFT itself.  This only has an effect if GalSim was compiled with OpenMP
+     * (WITH_OPENMP=true), and the FFT is only done with multiple threads if a multi-threaded
+     * FFTW library was found as well.  If `nthreads <= 0`, the number of CPUs is used.
+     * The default is 1.
+     */
+    void SetNumThreads(int nthreads);
+
+    /// @brief Get the number of threads to use for large Fourier-space draws.
+    int GetNumThreads();
+
+    /**
+     * @brief Set how much effort FFTW should spend finding a fast plan for each FFT size.
+     *
+     * The plans are made once for each size and direction and then cached for the rest of
+     * the process, so a more expensive rigor is only paid for the first transform of each size.
+     * Valid values are "estimate" (the default), "measure", "patient" and "exhaustive", which
+     * correspond to the FFTW planner flags of the same names.  Changing the rigor clears the
+     * plan cache.
+     */
+    void SetFFTPlanRigor(const std::string& rigor);
+
+    /// @brief Get the current FFTW planner rigor.
+    std::string GetFFTPlanRigor();
+
+    /**
+     * @brief Load FFTW wisdom from a file written by SaveFFTWisdom (or fftw-wisdom).
+     *
+     * With wisdom for the sizes you use, plans made with the "measure" or "patient" rigor
+     * are available without redoing the measurements.  This clears the plan cache.
+     */
+    void LoadFFTWisdom(const std::string& file_name);
+
+    /// @brief Save the current FFTW wisdom to a file.
+    void SaveFFTWisdom(const std::string& file_name);
+
+    /**
+     * @brief Make the cached plans for every size that goodFFTSize returns in the range
+     * [min_size, max_size].
+     */
+    void PrepareFFTPlans(int min_size, int max_size);
+
+    /// @brief Destroy all of the cached FFTW plans.
+    void ClearFFTPlans();
+
+    /**
+     * @brief Set the precision used for the FFTs in KTable::transform and XTable::transform.
+     *
+     * Valid values are "double" (the default) and "float".  In single precision, the tables
+     * are converted to float arrays for the FFT itself and back to double afterwards, so the
+     * FFT moves half as much memory and runs roughly twice as fast for large sizes.  The
+     * round-off error of a float FFT is of order 1.e-7 log2(N) relative to the largest value
+     * in the table, so a drawn image has errors of order 1.e-6 of its peak pixel value (and a
+     * relative error in the flux of about the same size).  This is fine for most simulations
+     * whose output is an ImageF, but not for quantities that need more precision than that.
+     *
+     * This only has an effect if the single-precision FFTW library (libfftw3f) was found when
+     * GalSim was compiled.  Otherwise the FFTs are always done in double precision.
+     * Wisdom from LoadFFTWisdom and SaveFFTWisdom only applies to the double-precision plans.
+     */
+    void SetFFTPrecision(const std::string& precision);
+
+    /// @brief Get the precision actually used for the FFTs, "double" or "float".
+    std::string GetFFTPrecision();
+
     class XTable;
 
     /**
@@ -335,6 +412,9 @@ namespace galsim {
         size_t index2(int ix, int iy) const  //Return index into data array.
         { return iy*(_N/2+1)+ix; }
 
+        /// Add row iyin of this table to the wrapped table out, where it lands in row iyout.
+        void wrapRow(KTable& out, int iyin, int iyout) const;
+
 #ifdef FFT_DEBUG
         void check_array() const 
         { if (!_array.get()) throw FFTError("KTable operation on null array"); }
@@ -348,6 +428,7 @@ namespace galsim {
         mutable int _cacheStartY;
         mutable double _cacheX;
         mutable const InterpolantXY* _cacheInterp;
+        mutable Mutex _cache_mutex; ///< Held by the thread using the above cache.
 
         friend class XTable; 
     };
@@ -479,6 +560,7 @@ namespace galsim {
         mutable double _cacheX;
         mutable int _cacheStartY;
         mutable const InterpolantXY* _cacheInterp;
+        mutable Mutex _cache_mutex; ///< Held by the thread using the above cache.
 
         friend class KTable;
     };
@@ -31,6 +31,7 @@
 #include "Random.h"
 #include "PhotonArray.h"
 #include "OneDimensionalDeviate.h"
+#include "Mutex.h"
 
 namespace galsim {
 
@@ -137,7 +138,7 @@ namespace galsim {
          * @returns Integral of positive portions of kernel
          */
         virtual double getPositiveFlux() const 
-        { checkSampler(); return _sampler->getPositiveFlux(); }
+        { lockedCheckSampler(); return _sampler->getPositiveFlux(); }
 
         /**
          * @brief Return the (absolute value of) integral of the negative portions of the kernel
@@ -148,7 +149,7 @@ namespace galsim {
          * @returns Integral of abs value of negative portions of kernel
          */
         virtual double getNegativeFlux() const 
-        { checkSampler(); return _sampler->getNegativeFlux(); }
+        { lockedCheckSampler(); return _sampler->getNegativeFlux(); }
 
         /**
          * @brief Return array of displacements drawn from this kernel.  
@@ -164,7 +165,7 @@ namespace galsim {
          * @returns a PhotonArray containing the vector of displacements for interpolation kernel.
          */
         virtual boost::shared_ptr<PhotonArray> shoot(int N, UniformDeviate ud) const 
-        { checkSampler(); return _sampler->shoot(N, ud); }
+        { lockedCheckSampler(); return _sampler->shoot(N, ud); }
 
     protected:
         InterpolantFunction _interp; ///< The function to interface the Interpolant to sampler
@@ -172,6 +173,16 @@ namespace galsim {
         /// Class that draws photons from this Interpolant
         mutable boost::shared_ptr<OneDimensionalDeviate> _sampler;  
 
+        /// Protects _sampler, which is built the first time it is needed.
+        mutable Mutex _sampler_mutex;
+
+        /// @brief Call checkSampler() while holding _sampler_mutex.
+        void lockedCheckSampler() const
+        {
+            MutexLock lock(_sampler_mutex);
+            checkSampler();
+        }
+
         /// @brief Allocate photon sampler and do all of its pre-calculations
         virtual void checkSampler() const 
         {
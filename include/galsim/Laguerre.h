@@ -431,12 +431,12 @@ namespace galsim {
         double flux(int maxP=-1) const;
         double apertureFlux(double R, int maxP=-1) const;
 
-        // Return reference to a matrix that generates ???realPsi transformations
+        // Return a matrix that generates ???realPsi transformations
         // under infinitesimal point transforms (translate, dilate, shear).
         // Returned matrix is at least as large as needed to go order x (order+2)
         // The choices for generators:
         enum GType { iX = 0, iY, iMu, iE1, iE2, iRot, nGen };
-        static const tmv::ConstMatrixView<double> Generator(
+        static tmv::Matrix<double> Generator(
             GType iparam, int orderOut, int orderIn);
 
         boost::shared_ptr<double> getOwner() const { return _owner; }
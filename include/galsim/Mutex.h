@@ -0,0 +1,156 @@
+// -*- c++ -*-
+/*
+ * Copyright 2012, 2013 The GalSim developers:
+ * https://github.com/GalSim-developers
+ *
+ * This file is part of GalSim: The modular galaxy image simulation toolkit.
+ *
+ * GalSim is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * GalSim is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with GalSim.  If not, see <http://www.gnu.org/licenses/>
+ */
+
+#ifndef MUTEX_H
+#define MUTEX_H
+
+/**
+ * @file Mutex.h @brief Simple wrappers around pthread mutexes.
+ *
+ * The python layer releases the GIL while drawing, so any cached data that is shared between
+ * SBProfiles (static lookup tables, lazily built samplers, etc.) needs to be protected by a
+ * lock when it is modified.
+ *
+ * For static caches, declare a pthread_mutex_t with PTHREAD_MUTEX_INITIALIZER in the .cpp file.
+ * That is initialized before any dynamic initialization happens, so it is safe to use from
+ * the constructors of other static objects.  For caches that belong to a particular object,
+ * use a (mutable) Mutex member.
+ *
+ * Data that is built lazily and then only read can use double-checked locking, but only
+ * through a ReadyFlag (or another boost::atomic), so that the check done without the lock
+ * is guaranteed to see all of the data once it sees the flag.
+ */
+
+#include <pthread.h>
+#include "boost/atomic.hpp"
+
+namespace galsim {
+
+    /**
+     * @brief A mutex that can be a member of a copyable class.
+     *
+     * A copy gets its own new mutex, since the lock protects the data of a particular object.
+     */
+    class Mutex
+    {
+    public:
+        Mutex() { pthread_mutex_init(&_m, 0); }
+        Mutex(const Mutex& ) { pthread_mutex_init(&_m, 0); }
+        Mutex& operator=(const Mutex& ) { return *this; }
+        ~Mutex() { pthread_mutex_destroy(&_m); }
+
+        pthread_mutex_t& get() { return _m; }
+
+    private:
+        pthread_mutex_t _m;
+    };
+
+    /**
+     * @brief Lock a mutex for the lifetime of this object.
+     */
+    class MutexLock
+    {
+    public:
+        explicit MutexLock(pthread_mutex_t& m) : _m(m) { pthread_mutex_lock(&_m); }
+        explicit MutexLock(Mutex& m) : _m(m.get()) { pthread_mutex_lock(&_m); }
+        ~MutexLock() { pthread_mutex_unlock(&_m); }
+
+    private:
+        MutexLock(const MutexLock& rhs); ///< Hides the copy constructor.
+        void operator=(const MutexLock& rhs); ///< Hides assignment operator.
+
+        pthread_mutex_t& _m;
+    };
+
+    /**
+     * @brief Lock a mutex for the lifetime of this object if it isn't already locked.
+     *
+     * This is for caches that only speed things up, where a thread that finds the cache in use
+     * by another thread can do its calculation without it rather than wait.
+     */
+    class MutexTryLock
+    {
+    public:
+        explicit MutexTryLock(Mutex& m) : _m(m.get()), _locked(pthread_mutex_trylock(&_m) == 0) {}
+        ~MutexTryLock() { if (_locked) pthread_mutex_unlock(&_m); }
+
+        /// Whether this object got the lock.
+        bool locked() const { return _locked; }
+
+    private:
+        MutexTryLock(const MutexTryLock& rhs); ///< Hides the copy constructor.
+        void operator=(const MutexTryLock& rhs); ///< Hides assignment operator.
+
+        pthread_mutex_t& _m;
+        bool _locked;
+    };
+
+    /**
+     * @brief A flag that says whether some lazily built data is ready to use.
+     *
+     * Check isSet() without the lock.  If it is false, take the lock, check again, build the
+     * data, and then call set().  set() has release semantics and isSet() has acquire
+     * semantics, so a thread that sees the flag set also sees all of the data that was written
+     * before it was set.  (A plain bool doesn't guarantee this.)
+     *
+     * A copy starts with the current value of the flag.
+     */
+    class ReadyFlag
+    {
+    public:
+        ReadyFlag() : _flag(false) {}
+        ReadyFlag(const ReadyFlag& rhs) : _flag(rhs.isSet()) {}
+        ReadyFlag& operator=(const ReadyFlag& rhs) 
+        { _flag.store(rhs.isSet(), boost::memory_order_release); return *this; }
+
+        bool isSet() const { return _flag.load(boost::memory_order_acquire); }
+        void set() { _flag.store(true, boost::memory_order_release); }
+        void clear() { _flag.store(false, boost::memory_order_release); }
+
+    private:
+        boost::atomic<bool> _flag;
+    };
+
+    /**
+     * @brief A value that several threads may read and write without a lock, such as a
+     * starting guess for a search, where any value that some thread stored is acceptable.
+     *
+     * The loads and stores are atomic but impose no ordering, so this must not be used to
+     * publish other data.  A copy starts with the current value.
+     */
+    template <typename T>
+    class RelaxedAtomic
+    {
+    public:
+        explicit RelaxedAtomic(T value=T()) : _value(value) {}
+        RelaxedAtomic(const RelaxedAtomic& rhs) : _value(rhs.load()) {}
+        RelaxedAtomic& operator=(const RelaxedAtomic& rhs) { store(rhs.load()); return *this; }
+
+        T load() const { return _value.load(boost::memory_order_relaxed); }
+        void store(T value) { _value.store(value, boost::memory_order_relaxed); }
+
+    private:
+        boost::atomic<T> _value;
+    };
+
+}
+
+#endif
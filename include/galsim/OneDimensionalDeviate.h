@@ -27,7 +27,7 @@
 #include <functional>
 #include "Random.h"
 #include "PhotonArray.h"
-#include "ProbabilityTree.h"
+#include "AliasTable.h"
 
 namespace galsim {
 
@@ -40,15 +40,18 @@ namespace galsim {
         /** Absolute error allowed [assumes the total flux is O(1)] **/
         const double ABSOLUTE_ERROR = 1e-8;
 
-        /** Max range of allowed (abs value of) photon fluxes within an Interval before rejection
-            sampling is invoked **/
+        /** Max range of allowed (abs value of) photon fluxes within an Interval before it is
+            split into a table of cells **/
         const double ALLOWED_FLUX_VARIATION = 0.81;
 
+        /** Number of cells in the table of an Interval whose flux density varies too much **/
+        const int INTERVAL_TABLE_SIZE = 32;
+
         /** Range will be split into this many parts to bracket extrema **/
         const int RANGE_DIVISION_FOR_EXTREMA = 32;
 
-        /** Intervals with less than this fraction of probability are ok to use dominant-sampling
-            method. **/
+        /** Intervals with less than this fraction of probability are not split further, but
+            are sampled with a table of cells. **/
         const double SMALL_FRACTION_OF_FLUX = 1.e-4;
 
     }
@@ -78,8 +81,7 @@ namespace galsim {
      *
      * An `Interval` is a contiguous domain over which a `FluxDensity` function is well-behaved,
      * having no sign changes or extrema, which will makes it easier to sample the FluxDensity
-     * function over its domain using either rejection sampling or by weighting uniformly 
-     * distributed photons.
+     * function over its domain by weighting uniformly distributed photons.
      *
      * This class could be made a subclass of `OneDimensionalDeviate` as it should only be used by
      * methods of that class.
@@ -91,17 +93,15 @@ namespace galsim {
      * The object keeps track of the integrated flux (or unnormalized probability) in its
      * interval/annulus, and the cumulative flux of all intervals up to and including this one.
      *
-     * The `drawWithin()` method will select one photon (and flux) drawn from within this interval
-     * or annulus, such that the expected flux distribution matches the FluxDensity function.  This
-     * can be done one of two ways: If `_useRejectionMethod=true`, then an x (or r) position is
-     * chosen that would match the chosen cumulative flux were the FluxDensity uniform over the
-     * interval.  Then the FluxDensity is evaluated, compared to the maximum within the interval
-     * (which is always an endpoint), and a UniformDeviate is drawn to decide whether to keep or
-     * reject this x photon.  This repeats until a position is kept.
-     *
-     * If `_useRejectionMethod=false`, then no rejection is done.  The photon is kept, but is given
-     * a flux value equal to the FluxDensity at x relative to the mean over the interval.  This is
-     * faster but makes the statistics of the photons harder to interpret.
+     * The interval is divided into one or more cells, which are equal-sized ranges of x (or
+     * equal-area annuli).  If the FluxDensity is nearly constant over the interval, there is
+     * a single cell.  Otherwise, the FluxDensity is tabulated at the cell boundaries, and the
+     * flux in each cell is estimated from the table.  The caller chooses a cell with probability
+     * proportional to its flux, and then the `drawWithin()` method selects one photon (and flux)
+     * uniformly within that cell.  The photon is given a flux value equal to the FluxDensity at x
+     * relative to the mean over the cell, so that the expected flux distribution matches the
+     * FluxDensity function exactly, even though the cell fluxes are only estimates.  Since the
+     * FluxDensity is nearly constant within each cell, the photon fluxes are all close to +-1.
      *
      * See the `OneDimensionalDeviate` docstrings for more information.
      */
@@ -129,15 +129,28 @@ namespace galsim {
             _fluxIsReady(false) {}
 
         /**
-         * @brief Draw one photon position and flux from within this interval
-         * @param[in] unitRandom An initial uniform deviate to select photon
+         * @brief Draw one photon position and flux from within a cell of this interval
+         * @param[in] iCell The index of the cell to use.
+         * @param[in] unitRandom A uniform deviate to select the photon within the cell.
          * @param[out] x (or radial) coordinate of the selected photon.
-         * @param[out] flux flux of the selected photon, nominally +-1, but can differ if not 
-         *             using rejection.
-         * @param[out] ud UniformDeviate used for rejection sampling, if needed.
+         * @param[out] flux flux of the selected photon, nominally +-1.  This assumes that the
+         *             cell was chosen with probability proportional to getCellAbsFlux(iCell).
          */
-        void drawWithin(double unitRandom, double& x, double& flux,
-                        UniformDeviate ud) const;
+        void drawWithin(int iCell, double unitRandom, double& x, double& flux) const;
+
+        /**
+         * @brief Get the number of cells in this interval.
+         *
+         * The cells are set up by split().
+         */
+        int getNCells() const { return _cellAbsFlux.size(); }
+
+        /**
+         * @brief Get the (estimated) absolute flux in one cell of this interval.
+         *
+         * The cell fluxes add up to the absolute value of getFlux().
+         */
+        double getCellAbsFlux(int iCell) const { return _cellAbsFlux[iCell]; }
 
         /**
          * @brief Get integrated flux over this interval or annulus.
@@ -163,8 +176,9 @@ namespace galsim {
          * @brief Return a list of intervals that divide this one into acceptably small ones.
          *
          * This routine works by recursive bisection.  Intervals that are returned have all had 
-         * their fluxes integrated.  Intervals are split until the FluxDensity does not vary too 
-         * much within an interval, or when their flux is below `smallFlux`.
+         * their fluxes integrated and their cells set up.  Intervals are split until the
+         * FluxDensity does not vary too much within an interval, or when their flux is below
+         * `smallFlux`.  The latter are divided into a table of INTERVAL_TABLE_SIZE cells.
          * @param[in] smallFlux Flux below which a sub-interval is not further split.
          * @returns List contiguous Intervals whose union is this one.
          */
@@ -184,16 +198,11 @@ namespace galsim {
         /// if flux were constant.
         double interpolateFlux(double fraction) const; 
 
-        /**
-         * Set this variable true if returning equal fluxes with rejection method, vs returning 
-         * non-unity flux weight.
-         */
-        bool _useRejectionMethod;
-
-        /// 1. / (Maximum absolute flux density in the interval (assumed to be at an endpoint))
-        double _invMaxAbsDensity; 
+        /// @brief Set up ncell equal cells, using a table of the FluxDensity if ncell > 1.
+        void makeCells(int ncell);
 
-        double _invMeanAbsDensity; ///< 1. / (Mean absolute flux density in the interval)
+        std::vector<double> _cellAbsFlux; ///< Estimated absolute flux in each cell
+        std::vector<double> _cellInvMeanAbsDensity; ///< 1. / (Mean absolute density in each cell)
     };
 
     /**
@@ -208,14 +217,13 @@ namespace galsim {
      * As explained in SBProfile::shoot(), both positive and negative-flux photons can exist, but we
      * aim that the absolute value of flux be nearly constant so that statistical errors are
      * predictable.  This code does this by first dividing the domain of the function into
-     * `Interval` objects, with known integrated (absolute) flux in each.  To shoot a photon, a
-     * UniformDeviate is selected and scaled to represent the cumulative flux that should exist
-     * within the position of the photon.  The class first uses the binary-search feature built into
-     * the Standard Library `set` container to locate the `Interval` that will contain the photon.
-     * Then it asks the `Interval` to decide where within the `Interval` to place the photon.  As
-     * noted in the `Interval` docstring, this can be done either by rejection sampling, or - if the
-     * range of FluxDensity values within an interval is small - by simply adjusting the flux to
-     * account for deviations from uniform flux density within the interval.
+     * `Interval` objects, with known integrated (absolute) flux in each, and each `Interval` into
+     * cells over which the FluxDensity is nearly constant.  To shoot a photon, a UniformDeviate
+     * is used to select a cell with probability proportional to its flux from an `AliasTable`,
+     * which takes the same time however many cells there are.  The remaining randomness in the
+     * deviate is then used by the `Interval` to place the photon uniformly within the cell,
+     * adjusting its flux to account for deviations from uniform flux density within the cell.
+     * So each photon takes a fixed amount of work, with no rejection sampling.
      *
      * On construction, the class must be provided with some information about the nature of the
      * function being sampled.  The length scale and flux scale of the function should be of order
@@ -262,7 +270,10 @@ namespace galsim {
     private:
 
         const FluxDensity& _fluxDensity; ///< Function being sampled
-        ProbabilityTree<Interval> _pt; ///< Binary tree of intervals for photon shooting
+        std::vector<Interval> _intervals; ///< The intervals the domain is split into
+        std::vector<int> _cellInterval; ///< The index in _intervals of each cell in _aliasTable
+        std::vector<int> _cellIndex; ///< The index of each cell within its interval
+        AliasTable _aliasTable; ///< Alias table of all the cells for photon shooting
         double _positiveFlux; ///< Stored total positive flux
         double _negativeFlux; ///< Stored total negative flux
         const bool _isRadial; ///< True for 2d axisymmetric function, false for 1d function
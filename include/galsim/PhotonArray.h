@@ -81,6 +81,20 @@ namespace galsim {
             _flux.reserve(N);
         }
 
+        /** @brief Change the number of photons in the array.
+         *
+         * The memory is kept when the array shrinks, so the same PhotonArray can be reused for
+         * many sets of photons without reallocating.  New photons have zero flux.
+         *
+         * @param[in] N new number of photons.
+         */
+        void resize(int N)
+        {
+            _x.resize(N,0.);
+            _y.resize(N,0.);
+            _flux.resize(N,0.);
+        }
+
         /**
          * @brief Set characteristics of a photon
          *
@@ -120,6 +134,16 @@ namespace galsim {
          */
         double getFlux(int i) const { return _flux[i]; }
 
+        /**
+         * @brief Direct access to the x, y and flux arrays, each of length size().
+         *
+         * These are invalidated by anything that changes the size of the PhotonArray
+         * (append, reserve, resize).
+         */
+        double* getXArray() { return _x.empty() ? 0 : &_x[0]; }
+        double* getYArray() { return _y.empty() ? 0 : &_y[0]; }
+        double* getFluxArray() { return _flux.empty() ? 0 : &_flux[0]; }
+
         /**
          * @brief Return sum of all photons' fluxes
          *
@@ -198,6 +222,11 @@ namespace galsim {
          * surface brightness, so photons' fluxes are divided by image pixel area.
          * Photons past the edges of the image are discarded.
          *
+         * When there are many photons and the image is too large to stay in cache, the photons
+         * are first sorted into buckets by image row, so the image is updated one row at a time.
+         * The sort is stable, so each pixel receives its photons in the same order either way,
+         * and the result is the same.
+         *
          * @param[in] target the Image to which the photons' flux will be added.
          * @returns The total flux of photons the landed inside the image bounds.
          */
@@ -83,6 +83,8 @@ namespace galsim {
             }
         }
 
+        void getFootprint(double& xmin, double& xmax, double& ymin, double& ymax) const;
+
         bool isAxisymmetric() const { return _allAxisymmetric; }
         bool hasHardEdges() const { return _anyHardEdges; }
         bool isAnalyticX() const { return _allAnalyticX; }
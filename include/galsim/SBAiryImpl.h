@@ -23,6 +23,7 @@
 #define SBAIRY_IMPL_H
 
 #include "SBProfileImpl.h"
+#include "Mutex.h"
 #include "SBAiry.h"
 
 namespace galsim {
@@ -265,9 +266,8 @@ namespace galsim {
     /** 
      * @brief A map to hold one copy of the AiryInfo for each obscuration value ever used 
      * during the program run.  Make one static copy of this map.  
-     * *Be careful of this when multithreading:*
-     * Should build one `SBAiry` with each `obscuration` value before dispatching 
-     * multiple threads.
+     * Access to the map is protected by a mutex, so it is safe to construct SBAiry objects
+     * from multiple threads.
      */
     class SBAiry::SBAiryImpl::InfoBarn : public std::map<double, boost::shared_ptr<AiryInfo> > 
     {
@@ -291,6 +291,8 @@ namespace galsim {
              */
             const int MAX_AIRY_TABLES = 100; 
 
+            // Several threads may be constructing profiles at the same time.
+            MutexLock lock(_mutex);
             MapIter it = _map.find(obscuration);
             if (it == _map.end()) {
                 boost::shared_ptr<AiryInfo> info;
@@ -311,6 +313,7 @@ namespace galsim {
     private:
         typedef std::map<double, boost::shared_ptr<AiryInfo> >::iterator MapIter;
         std::map<double, boost::shared_ptr<AiryInfo> > _map;
+        Mutex _mutex;
     };
 
 
@@ -109,6 +109,8 @@ namespace galsim {
             }
         }
 
+        void getFootprint(double& xmin, double& xmax, double& ymin, double& ymax) const;
+
         Position<double> centroid() const 
         { return Position<double>(_x0, _y0); }
 
@@ -28,6 +28,7 @@
 #include "SBProfile.h"
 #include "Interpolant.h"
 #include "FFT.h"
+#include "Mutex.h"
 
 namespace galsim {
 
@@ -151,6 +152,9 @@ namespace galsim {
             /// @brief fourier transforms of the images
             std::vector<boost::shared_ptr<KTable> > vk;
 
+            /// @brief Protects vk, whose elements are only made the first time they are needed.
+            Mutex vk_mutex;
+
             /// @brief Vector of fluxes for each image plane of a multiple image.
             std::vector<double> flux;
 
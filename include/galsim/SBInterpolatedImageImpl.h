@@ -24,7 +24,7 @@
 
 #include "SBProfileImpl.h"
 #include "SBInterpolatedImage.h"
-#include "ProbabilityTree.h"
+#include "AliasTable.h"
 
 namespace galsim {
 
@@ -128,6 +128,7 @@ namespace galsim {
 
         boost::shared_ptr<XTable> _xtab; ///< Final padded real-space image.
         mutable boost::shared_ptr<KTable> _ktab; ///< Final k-space image.
+        mutable ReadyFlag _ktab_ready; ///< Set once checkK() has finished making _ktab.
 
         /// @brief Make ktab if necessary.
         void checkK() const;
@@ -148,23 +149,21 @@ namespace galsim {
         /// @brief Set up photon-shooting quantities, if not ready
         void checkReadyToShoot() const;
 
+        /// @brief Protects _ktab and the photon-shooting structures, which are made lazily.
+        mutable Mutex _mutex;
+
         // Structures used for photon shooting
-        /**
-         * @brief Simple structure used to index all pixels for photon shooting
-         */
-        struct Pixel {
-            double x;
-            double y;
-            bool isPositive;
-            double flux;
-
-            Pixel(double x_=0., double y_=0., double flux_=0.): 
-                x(x_), y(y_), flux(flux_) { isPositive = flux>=0.; }
-            double getFlux() const { return flux; }
-        };
         mutable double _positiveFlux;    ///< Sum of all positive pixels' flux
         mutable double _negativeFlux;    ///< Sum of all negative pixels' flux
-        mutable ProbabilityTree<Pixel> _pt; ///< Binary tree of pixels, for photon-shooting
+        /**
+         * @brief The pixels with non-zero flux, for photon shooting.
+         *
+         * Each pixel is stored by its index (ix+Nin/2) + (iy+Nin/2)*Nin, so only one int is
+         * needed per pixel.  Pixels with negative flux are stored as the bitwise complement of
+         * their index, so their entries are negative.
+         */
+        mutable std::vector<int> _shootPixels;
+        mutable AliasTable _shootTable;  ///< Chooses an element of _shootPixels by |flux|
 
     private:
 
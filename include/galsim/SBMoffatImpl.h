@@ -23,6 +23,7 @@
 #define SBMOFFAT_IMPL_H
 
 #include "SBProfileImpl.h"
+#include "Mutex.h"
 #include "SBMoffat.h"
 
 namespace galsim {
@@ -109,6 +110,8 @@ namespace galsim {
         mutable double _maxK; ///< Maximum k with kValue > 1.e-3
 
         mutable Table<double,double> _ft;  ///< Lookup table for Fourier transform of Moffat.
+        mutable ReadyFlag _ft_ready; ///< Set once setupFT() has finished making _ft.
+        mutable Mutex _ft_mutex; ///< Makes sure only one thread does setupFT().
 
         mutable double _re; ///< Stores the half light radius if set or calculated post-setting.
 
@@ -65,6 +65,16 @@ namespace galsim {
          */
         const double alias_threshold = 5.e-3;
 
+        /**
+         * @brief A threshold parameter used for setting the footprint when drawing directly in
+         * real space.
+         *
+         * Profiles without a finite extent are only evaluated at pixels within a box around
+         * their centroid, outside of which the surface brightness is less than
+         * footprint_threshold times its peak value.
+         */
+        const double footprint_threshold = 1.e-10;
+
         /**
          * @brief A threshold parameter used for setting the maxK value for FFTs.
          *
@@ -126,6 +136,24 @@ namespace galsim {
         //@}
     }
 
+    /**
+     * @brief Set the maximum number of photons that drawShoot shoots at a time.
+     *
+     * drawShoot shoots the photons in chunks of at most this many, and adds each chunk to the
+     * image before shooting the next one, so the memory used is set by the chunk size rather
+     * than the total number of photons.  Smaller chunks stay in cache better, but the
+     * overhead per chunk is larger.  The default is 100000.
+     *
+     * For a given seed and chunk size, the photons are always the same.  Most profiles use
+     * the random numbers differently for a different chunk size though (e.g. SBAdd picks how
+     * many photons come from each component for each chunk), so changing the chunk size gives
+     * a different noise realization.
+     */
+    void SetShootChunkSize(int chunk_size);
+
+    /// @brief Get the maximum number of photons that drawShoot shoots at a time.
+    int GetShootChunkSize();
+
     // All code between the @cond and @endcond is excluded from Doxygen documentation
     //! @cond
 
@@ -227,6 +255,31 @@ namespace galsim {
          */
         std::complex<double> kValue(const Position<double>& k) const;
 
+        /**
+         * @brief Return values of SBProfile at many 2D positions in real space.
+         *
+         * The positions are (x[k], y[k]) for k = 0..nx*ny-1, and the values are written to
+         * val[k].  If the positions form a regular grid, x[j*nx+i] = x0 + i*dx and
+         * y[j*nx+i] = y0 + j*dy (e.g. from numpy.meshgrid), then the values are calculated
+         * all at once, which is often much faster than separate calls to xValue.  Otherwise
+         * xValue is called for each position.
+         *
+         * @param[in] x    Array of nx*ny x values.
+         * @param[in] y    Array of nx*ny y values.
+         * @param[out] val Array of nx*ny values to fill.
+         * @param[in] nx   The number of positions in each row.
+         * @param[in] ny   The number of rows.
+         */
+        void xValues(const double* x, const double* y, double* val, int nx, int ny) const;
+
+        /**
+         * @brief Return values of SBProfile at many 2D positions in k space.
+         *
+         * This works the same way as xValues.
+         */
+        void kValues(const double* kx, const double* ky, std::complex<double>* val,
+                     int nx, int ny) const;
+
         //@{
         /**
          *  @brief Define the range over which the profile is not trivially zero.
@@ -493,6 +546,16 @@ namespace galsim {
          * @param[in] poisson_flux Whether to allow total object flux scaling to vary according to 
          *                         Poisson statistics for `N` samples 
          *                         (default `poisson_flux = true`).
+         * @param[in] nthreads The number of threads to use for shooting the photons.
+         *            If nthreads > 1, each thread gets its own UniformDeviate seeded from `ud`
+         *            and shoots every nthreads-th chunk of photons (see SetShootChunkSize) onto
+         *            its own copy of the image, and the copies are then added to `image`.
+         *            The result depends only on the state of `ud` and nthreads, not on how
+         *            the threads are scheduled, and it is the same when GalSim was compiled
+         *            without OpenMP (in which case the "threads" are run one at a time).
+         *            nthreads > 1 gives a different noise realization than nthreads = 1,
+         *            and it is ignored if max_extra_noise > 0.
+         *            (default `nthreads = 1`)
          * @returns The total flux of photons the landed inside the image bounds.
          *
          * Note: N is input as a double so that very large values of N don't have to
@@ -501,7 +564,8 @@ namespace galsim {
          */
         template <typename T>
         double drawShoot(ImageView<T> image, double N, UniformDeviate ud,
-                         double gain=1., double max_extra_noise=0., bool poisson_flux=true) const;
+                         double gain=1., double max_extra_noise=0., bool poisson_flux=true,
+                         int nthreads=1) const;
 
 
         /** 
@@ -643,6 +707,14 @@ namespace galsim {
         static SBProfileImpl* GetImpl(const SBProfile& rhs);
 
         boost::shared_ptr<SBProfileImpl> _pimpl;
+
+    private:
+
+        // The multi-threaded part of drawShoot.
+        template <typename T>
+        double shootThreaded(const std::vector<int>& chunks, ImageView<T> img, UniformDeviate u,
+                             int nthreads, double flux_scaling, double origN,
+                             double flux_factor) const;
     };
 
 }
@@ -95,6 +95,12 @@ namespace galsim {
             double /*x*/, double& ymin, double& ymax, std::vector<double>& splits) const 
         { getYRange(ymin,ymax,splits); }
 
+        // Get a box outside of which the profile is negligible.  This is the range given
+        // by getXRange and getYRange if they are finite.  Otherwise it is a square around the
+        // centroid, outside of which the profile is less than sbp::footprint_threshold times
+        // its peak.
+        virtual void getFootprint(double& xmin, double& xmax, double& ymin, double& ymax) const;
+
         virtual double getPositiveFlux() const { return getFlux()>0. ? getFlux() : 0.; }
 
         virtual double getNegativeFlux() const { return getFlux()>0. ? 0. : -getFlux(); }
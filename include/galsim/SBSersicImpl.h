@@ -23,6 +23,7 @@
 #define SBSERSIC_IMPL_H
 
 #include "SBProfileImpl.h"
+#include "Mutex.h"
 #include "SBSersic.h"
 
 namespace galsim {
@@ -130,8 +131,8 @@ namespace galsim {
     /** 
      * @brief A map to hold one copy of the SersicInfo for each `n` ever used during the 
      * program run.  Make one static copy of this map.  
-     * *Be careful of this when multithreading:*
-     * Should build one `SBSersic` with each `n` value before dispatching multiple threads.
+     * Access to the map is protected by a mutex, so it is safe to construct SBSersic objects
+     * from multiple threads.
      */
     class SBSersic::InfoBarn : public std::map<double, boost::shared_ptr<SersicInfo> > 
     {
@@ -150,6 +151,8 @@ namespace galsim {
              */
             const int MAX_SERSIC_TABLES = 100; 
 
+            // Several threads may be constructing profiles at the same time.
+            MutexLock lock(_mutex);
             MapIter it = _map.find(n);
             if (it == _map.end()) {
                 boost::shared_ptr<SersicInfo> info(new SersicInfo(n));
@@ -165,6 +168,7 @@ namespace galsim {
     private:
         typedef std::map<double, boost::shared_ptr<SersicInfo> >::iterator MapIter;
         std::map<double, boost::shared_ptr<SersicInfo> > _map;
+        Mutex _mutex;
     };
 
     class SBSersic::SBSersicImpl : public SBProfileImpl
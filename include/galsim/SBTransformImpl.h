@@ -51,6 +51,8 @@ namespace galsim {
         double maxK() const { return _adaptee.maxK() / _minor; }
         double stepK() const { return _adaptee.stepK() / _major; }
 
+        void getFootprint(double& xmin, double& xmax, double& ymin, double& ymax) const;
+
         void getXRange(double& xmin, double& xmax, std::vector<double>& splits) const;
 
         void getYRange(double& ymin, double& ymax, std::vector<double>& splits) const;
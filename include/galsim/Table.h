@@ -32,6 +32,7 @@
 
 #include "Std.h"
 #include "OneDimensionalDeviate.h"
+#include "Mutex.h"
 
 namespace galsim {
 
@@ -115,16 +116,16 @@ namespace galsim {
         enum interpolant { linear, spline, floor, ceil };
 
         /// Construct empty table
-        Table(interpolant i=linear) : iType(i), isReady(false) {} 
+        Table(interpolant i=linear) : iType(i) {} 
 
         /// Table from two arrays:
         Table(const A* argvec, const V* valvec, int N, interpolant in=linear);
         Table(const std::vector<A>& a, const std::vector<V>& v, interpolant in=linear);
 
-        Table(std::istream& is, interpolant in=linear) : iType(in), isReady(false)
+        Table(std::istream& is, interpolant in=linear) : iType(in)
         { read(is); }
 
-        void clear() { v.clear(); isReady=false; }
+        void clear() { v.clear(); isReady.clear(); }
         void read(std::istream& is);
 
         /// new element for table.
@@ -157,7 +158,7 @@ namespace galsim {
         void TransformVal(T& xfrm) 
         {
             for (iter p=v.begin(); p!=v.end(); ++p) p->val = xfrm(p->arg, p->val);
-            isReady=false; setup();
+            isReady.clear(); setup();
         }
 
         template <class T>
@@ -165,7 +166,7 @@ namespace galsim {
         {
             for (iter p=v.begin(); p!=v.end(); ++p)
                 p->arg = xfrm(p->arg, p->val);
-            isReady=false; setup();
+            isReady.clear(); setup();
         }
 
         void dump() const 
@@ -184,10 +185,10 @@ namespace galsim {
         typedef typename std::vector<Entry>::iterator iter;
 
         interpolant iType;
-        mutable bool isReady; //< Flag if table has been prepped.
+        mutable ReadyFlag isReady; //< Flag if table has been prepped.
         mutable bool equalSpaced; //< Flag set if arguments are nearly equally spaced.
         mutable A dx; //<  ...in which case this is argument interval
-        mutable int lastIndex; //< Index for last lookup into table.
+        mutable RelaxedAtomic<int> lastIndex; //< Index for last lookup into table.
 
         mutable std::vector<Entry> v;
         mutable std::vector<V> y2; //< vector of 2nd derivs for spline
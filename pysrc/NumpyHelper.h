@@ -205,7 +205,9 @@ static bp::object MakeNumpyArray(
 // - It should be the same type as required for data (T).
 // - It should have dimensions dim
 // - It should be writeable if isConst=true
+// - It should be aligned
 // - It should have unit stride on the rows if ndim == 2
+// - Its stride should be a multiple of sizeof(T)
 // Also sets data, owner, stride to the appropriate values before returning.
 template <typename T>
 static void CheckNumpyArray(const bp::object& array, int ndim, bool isConst,
@@ -252,10 +254,19 @@ static void CheckNumpyArray(const bp::object& array, int ndim, bool isConst,
         PyErr_SetString(PyExc_TypeError, "numpy.ndarray argument must be writeable");
         bp::throw_error_already_set();
     }
+    if (!(GetNumpyArrayFlags(array.ptr()) & NPY_ARRAY_ALIGNED)) {
+        PyErr_SetString(PyExc_ValueError, "numpy.ndarray argument must be aligned");
+        bp::throw_error_already_set();
+    }
     if (ndim == 2 && GetNumpyArrayStride<T>(array.ptr(), 1) != 1) {
         PyErr_SetString(PyExc_ValueError, "numpy.ndarray argument must have contiguous rows");
         bp::throw_error_already_set();
     }
+    // We use the array memory directly, so the row stride needs to be a whole number of elements.
+    if (PyArray_STRIDE(reinterpret_cast<PyArrayObject*>(array.ptr()), 0) % int(sizeof(T)) != 0) {
+        PyErr_SetString(PyExc_ValueError, "numpy.ndarray argument has an invalid stride");
+        bp::throw_error_already_set();
+    }
 
     stride = GetNumpyArrayStride<T>(array.ptr(), 0);
     data = GetNumpyArrayData<T>(array.ptr());
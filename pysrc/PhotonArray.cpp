@@ -21,6 +21,9 @@
 #include "boost/python.hpp"
 #include "boost/python/stl_iterator.hpp"
 
+#include <map>
+
+#include "NumpyHelper.h"
 #include "PhotonArray.h"
 
 namespace bp = boost::python;
@@ -30,10 +33,27 @@ namespace galsim {
     struct PyPhotonArray 
     {
 
+        // Copy a python sequence into vec, which already has the right size.
+        // Native 1-d float64 NumPy arrays are read directly rather than one element at a time.
+        static void ReadVector(bp::object const & v, std::vector<double>& vec)
+        {
+            const int n = vec.size();
+            if (PyArray_Check(v.ptr()) && GetNumpyArrayTypeCode(v.ptr()) == NPY_FLOAT64 &&
+                GetNumpyArrayNDim(v.ptr()) == 1 &&
+                (GetNumpyArrayFlags(v.ptr()) & NPY_ARRAY_ALIGNED) &&
+                PyArray_ISNOTSWAPPED(reinterpret_cast<PyArrayObject*>(v.ptr()))) {
+                const double* data = GetNumpyArrayData<double>(v.ptr());
+                const int step = GetNumpyArrayStride<double>(v.ptr(), 0);
+                for (int i=0; i<n; ++i) vec[i] = data[i*step];
+            } else {
+                for (int i=0; i<n; ++i) vec[i] = bp::extract<double>(v[i]);
+            }
+        }
+
         static PhotonArray * construct(bp::object const & vx, bp::object const & vy,
                                        bp::object const & vflux) {
             Py_ssize_t size = bp::len(vx);
-            if (size != bp::len(vx)) {
+            if (size != bp::len(vy)) {
                 PyErr_SetString(PyExc_ValueError,
                                 "Length of vx array does not match  length of vy array");
                 bp::throw_error_already_set();
@@ -46,14 +66,81 @@ namespace galsim {
             std::vector<double> vx_(size);
             std::vector<double> vy_(size);
             std::vector<double> vflux_(size);
-            for (Py_ssize_t n = 0; n < size; ++n) {
-                vx_[n] = bp::extract<double>(vx[n]);
-                vy_[n] = bp::extract<double>(vy[n]);
-                vflux_[n] = bp::extract<double>(vflux[n]);
-            }
+            ReadVector(vx, vx_);
+            ReadVector(vy, vy_);
+            ReadVector(vflux, vflux_);
             return new PhotonArray(vx_, vy_, vflux_);
         }
 
+        // The number of NumPy views of each PhotonArray's memory that are still alive.
+        // This is only used while holding the GIL, so it doesn't need a lock.
+        static std::map<const PhotonArray*, int>& ViewCounts()
+        {
+            static std::map<const PhotonArray*, int> counts;
+            return counts;
+        }
+
+        // The owner of a view's memory.  It holds a reference to the python PhotonArray, to keep
+        // it alive, and updates ViewCounts() when the view is destroyed.
+        struct ViewDeleter 
+        {
+            ViewDeleter(PyObject* o, const PhotonArray* pa_) : owner(bp::borrowed(o)), pa(pa_) {}
+            void operator()(double*) 
+            {
+                std::map<const PhotonArray*, int>::iterator it = ViewCounts().find(pa);
+                if (it != ViewCounts().end() && --it->second == 0) ViewCounts().erase(it);
+                owner.reset();
+            }
+            bp::handle<> owner;
+            const PhotonArray* pa;
+        };
+
+        // A NumPy array that uses the memory of one of the PhotonArray's vectors.
+        static bp::object MakeView(bp::object const & self, double* data)
+        {
+            const PhotonArray& pa = bp::extract<const PhotonArray&>(self);
+            if (pa.size() == 0) return bp::import("numpy").attr("zeros")(0);
+            boost::shared_ptr<double> owner(data, ViewDeleter(self.ptr(), &pa));
+            ++ViewCounts()[&pa];
+            return MakeNumpyArray(data, pa.size(), 1, false, owner);
+        }
+
+        // Changing the number of photons can reallocate the memory that the views use,
+        // so don't allow it while any views exist.
+        static void CheckNoViews(const PhotonArray& pa)
+        {
+            if (ViewCounts().count(&pa)) {
+                PyErr_SetString(
+                    PyExc_RuntimeError,
+                    "Cannot change the size of a PhotonArray while views of its x, y or flux "
+                    "arrays exist");
+                bp::throw_error_already_set();
+            }
+        }
+
+        static void Reserve(PhotonArray& pa, int n) { CheckNoViews(pa); pa.reserve(n); }
+        static void Resize(PhotonArray& pa, int n) { CheckNoViews(pa); pa.resize(n); }
+        static void Append(PhotonArray& pa, const PhotonArray& rhs)
+        { CheckNoViews(pa); pa.append(rhs); }
+
+        static bp::object GetXArray(bp::object const & self)
+        {
+            PhotonArray& pa = bp::extract<PhotonArray&>(self);
+            return MakeView(self, pa.getXArray());
+        }
+
+        static bp::object GetYArray(bp::object const & self)
+        {
+            PhotonArray& pa = bp::extract<PhotonArray&>(self);
+            return MakeView(self, pa.getYArray());
+        }
+
+        static bp::object GetFluxArray(bp::object const & self)
+        {
+            PhotonArray& pa = bp::extract<PhotonArray&>(self);
+            return MakeView(self, pa.getFluxArray());
+        }
+
         static void wrap() {
             const char * doc = 
                 "\n"
@@ -66,6 +153,12 @@ namespace galsim {
                 "number of positive and negative photons.  This class holds the\n"
                 "code that allows its flux to be added to a surface-brightness\n"
                 "Image.\n"
+                "\n"
+                "The x, y and flux attributes are NumPy arrays that use the PhotonArray's\n"
+                "memory directly, so the photons can be modified in place (e.g. to add\n"
+                "sensor effects) before calling addTo.  While any of these arrays exist,\n"
+                "methods that change the number of photons (append, reserve, resize)\n"
+                "raise a RuntimeError.\n"
                 ;
             bp::class_<PhotonArray> pyPhotonArray("PhotonArray", doc, bp::no_init);
             pyPhotonArray
@@ -76,14 +169,20 @@ namespace galsim {
                 )
                 .def(bp::init<int>(bp::args("n")))
                 .def("__len__", &PhotonArray::size)
-                .def("reserve", &PhotonArray::reserve)
+                .def("reserve", &Reserve, bp::args("n"))
+                .def("resize", &Resize, bp::args("n"))
+                .add_property("x", &GetXArray)
+                .add_property("y", &GetYArray)
+                .add_property("flux", &GetFluxArray)
                 .def("setPhoton", &PhotonArray::setPhoton, bp::args("i", "x", "y", "flux"))
                 .def("getX", &PhotonArray::getX)
                 .def("getY", &PhotonArray::getY)
                 .def("getFlux", &PhotonArray::getFlux)
                 .def("getTotalFlux", &PhotonArray::getTotalFlux)
                 .def("setTotalFlux", &PhotonArray::setTotalFlux)
-                .def("append", &PhotonArray::append)
+                .def("scaleFlux", &PhotonArray::scaleFlux, bp::args("scale"))
+                .def("scaleXY", &PhotonArray::scaleXY, bp::args("scale"))
+                .def("append", &Append, bp::args("rhs"))
                 .def("convolve", &PhotonArray::convolve)
                 .def("addTo", 
                      (double(PhotonArray::*)(ImageView<float> &) const)&PhotonArray::addTo,
@@ -21,15 +21,173 @@
 #include "boost/python.hpp"
 #include "boost/python/stl_iterator.hpp"
 
+#include <vector>
+
 #include "SBProfile.h"
+#include "FFT.h"
+#include "NumpyHelper.h"
 
 namespace bp = boost::python;
 
 namespace galsim {
 
+    // Release the GIL for as long as this object is in scope.  The destructor reacquires it,
+    // so an exception thrown while the GIL is released still gets translated correctly.
+    class ReleaseGIL 
+    {
+    public:
+        ReleaseGIL() : _state(PyEval_SaveThread()) {}
+        ~ReleaseGIL() { PyEval_RestoreThread(_state); }
+    private:
+        PyThreadState* _state;
+    };
+
     struct PySBProfile 
     {
 
+        // Draw profiles[i] onto images[i] with gains[i] for each i.
+        // The images may be any mix of ImageViewF and ImageViewD.
+        // All the Python objects are unpacked first, so the actual drawing can be done
+        // without holding the GIL.
+        static bp::list drawBatch(
+            const bp::object& profiles, const bp::object& images, const bp::object& gains,
+            double wmult)
+        {
+            const int n = bp::len(profiles);
+            if (bp::len(images) != n || bp::len(gains) != n) {
+                PyErr_SetString(PyExc_ValueError,
+                                "profiles, images and gains must all have the same length");
+                bp::throw_error_already_set();
+            }
+
+            std::vector<SBProfile> prof_vec;
+            std::vector<ImageView<float> > imf_vec;
+            std::vector<ImageView<double> > imd_vec;
+            // For each i, index into imf_vec (if >= 0) or imd_vec (~index if < 0).
+            std::vector<int> index(n);
+            std::vector<double> gain_vec(n);
+            std::vector<double> flux_vec(n);
+            prof_vec.reserve(n);
+            for (int i=0; i<n; ++i) {
+                prof_vec.push_back(bp::extract<const SBProfile&>(profiles[i]));
+                gain_vec[i] = bp::extract<double>(gains[i]);
+                bp::extract<ImageView<float> > imf(images[i]);
+                if (imf.check()) {
+                    index[i] = imf_vec.size();
+                    imf_vec.push_back(imf());
+                } else {
+                    bp::extract<ImageView<double> > imd(images[i]);
+                    if (!imd.check()) {
+                        PyErr_SetString(PyExc_TypeError,
+                                        "images must be ImageViewF or ImageViewD");
+                        bp::throw_error_already_set();
+                    }
+                    index[i] = ~int(imd_vec.size());
+                    imd_vec.push_back(imd());
+                }
+            }
+
+            {
+                ReleaseGIL release;
+                for (int i=0; i<n; ++i) {
+                    if (index[i] >= 0)
+                        flux_vec[i] = prof_vec[i].draw(imf_vec[index[i]], gain_vec[i], wmult);
+                    else
+                        flux_vec[i] = prof_vec[i].draw(imd_vec[~index[i]], gain_vec[i], wmult);
+                }
+            }
+
+            bp::list fluxes;
+            for (int i=0; i<n; ++i) fluxes.append(flux_vec[i]);
+            return fluxes;
+        }
+
+        // Check that x and y are 2-d float64 arrays of the same shape with contiguous rows
+        // and that val is a writeable array of the same shape whose elements are T.
+        // Returns the pointers to the data, and sets nx, ny to the shape.
+        template <typename T>
+        static void CheckValueArrays(
+            const bp::object& x, const bp::object& y, const bp::object& val,
+            double*& xdata, double*& ydata, T*& vdata, int& nx, int& ny)
+        {
+            boost::shared_ptr<double> owner;
+            int xstride, ystride, vstride;
+            CheckNumpyArray(x, 2, true, xdata, owner, xstride);
+            CheckNumpyArray(y, 2, true, ydata, owner, ystride);
+            // numpy.complex128 has the same layout as std::complex<double>, so the python layer
+            // passes a complex val array as a float64 view with twice as many columns.
+            double* vd;
+            CheckNumpyArray(val, 2, false, vd, owner, vstride);
+            vdata = reinterpret_cast<T*>(vd);
+            ny = GetNumpyArrayDim(x.ptr(), 0);
+            nx = GetNumpyArrayDim(x.ptr(), 1);
+            const int vfac = sizeof(T) / sizeof(double);
+            if (GetNumpyArrayDim(y.ptr(), 0) != ny || GetNumpyArrayDim(y.ptr(), 1) != nx ||
+                GetNumpyArrayDim(val.ptr(), 0) != ny || GetNumpyArrayDim(val.ptr(), 1) != nx*vfac) {
+                PyErr_SetString(PyExc_ValueError, "x, y and val arrays must have the same shape");
+                bp::throw_error_already_set();
+            }
+            if (xstride != nx || ystride != nx || vstride != nx*vfac) {
+                PyErr_SetString(PyExc_ValueError, "x, y and val arrays must be contiguous");
+                bp::throw_error_already_set();
+            }
+        }
+
+        static void xValues(const SBProfile& prof, const bp::object& x, const bp::object& y,
+                            const bp::object& val)
+        {
+            double *xdata, *ydata, *vdata;
+            int nx, ny;
+            CheckValueArrays(x, y, val, xdata, ydata, vdata, nx, ny);
+            ReleaseGIL release;
+            prof.xValues(xdata, ydata, vdata, nx, ny);
+        }
+
+        static void kValues(const SBProfile& prof, const bp::object& kx, const bp::object& ky,
+                            const bp::object& val)
+        {
+            double *kxdata, *kydata;
+            std::complex<double>* vdata;
+            int nx, ny;
+            CheckValueArrays(kx, ky, val, kxdata, kydata, vdata, nx, ny);
+            ReleaseGIL release;
+            prof.kValues(kxdata, kydata, vdata, nx, ny);
+        }
+
+        // The draw functions release the GIL while the C++ code runs, so other python threads
+        // can do other work (including drawing other profiles) at the same time.
+        template <typename U>
+        static double draw(const SBProfile& prof, ImageView<U> image, double gain, double wmult)
+        {
+            ReleaseGIL release;
+            return prof.draw(image, gain, wmult);
+        }
+
+        template <typename U>
+        static double fourierDraw(
+            const SBProfile& prof, ImageView<U> image, double gain, double wmult)
+        {
+            ReleaseGIL release;
+            return prof.fourierDraw(image, gain, wmult);
+        }
+
+        template <typename U>
+        static double drawShoot(
+            const SBProfile& prof, ImageView<U> image, double N, UniformDeviate ud,
+            double gain, double max_extra_noise, bool poisson_flux, int nthreads)
+        {
+            ReleaseGIL release;
+            return prof.drawShoot(image, N, ud, gain, max_extra_noise, poisson_flux, nthreads);
+        }
+
+        template <typename U>
+        static void drawK(
+            const SBProfile& prof, ImageView<U> re, ImageView<U> im, double gain, double wmult)
+        {
+            ReleaseGIL release;
+            prof.drawK(re, im, gain, wmult);
+        }
+
         template <typename U, typename W>
         static void wrapTemplates(W & wrapper) {
             // We don't need to wrap templates in a separate function, but it keeps us
@@ -37,26 +195,27 @@ namespace galsim {
             // We also don't need to make 'W' a template parameter in this case,
             // but it's easier to do that than write out the full class_ type.
             wrapper
-                .def("drawShoot", 
-                     (double (SBProfile::*)(ImageView<U>, double, UniformDeviate,
-                                            double, double, bool)
-                      const)&SBProfile::drawShoot,
+                .def("drawShoot", &drawShoot<U>,
                      (bp::arg("image"), bp::arg("N")=0., bp::arg("ud"),
                       bp::arg("gain")=1., bp::arg("max_extra_noise")=0.,
-                      bp::arg("poisson_flux")=true),
+                      bp::arg("poisson_flux")=true, bp::arg("nthreads")=1),
                      "Draw object into existing image using photon shooting.\n"
                      "\n"
                      "Setting optional integer arg possionFlux != 0 allows profile flux to vary \n"
                      "according to Poisson statistics for N samples.\n"
                      "\n"
+                     "If nthreads > 1, the photons are shot in that many threads, each with its\n"
+                     "own random number generator seeded from ud.\n"
+                     "\n"
                      "Returns total flux of photons that landed inside image bounds.")
-                .def("draw", 
-                     (double (SBProfile::*)(ImageView<U>, double, double) const)&SBProfile::draw,
+                .def("draw", &draw<U>,
                      (bp::arg("image"), bp::arg("gain")=1., bp::arg("wmult")=1.),
                      "Draw in-place and return the summed flux.")
-                .def("drawK", 
-                     (void (SBProfile::*)(ImageView<U>, ImageView<U>, 
-                                          double, double) const)&SBProfile::drawK,
+                .def("fourierDraw", &fourierDraw<U>,
+                     (bp::arg("image"), bp::arg("gain")=1., bp::arg("wmult")=1.),
+                     "Draw in-place using a Fourier transform from k space, even if the\n"
+                     "profile is analytic in real space, and return the summed flux.")
+                .def("drawK", &drawK<U>,
                      (bp::arg("re"), bp::arg("im"), bp::arg("gain")=1., bp::arg("wmult")=1.),
                      "Draw k-space image (real and imaginary components).")
                 ;
@@ -104,6 +263,17 @@ namespace galsim {
                      "require an FFT to determine real-space values.")
                 .def("kValue", &SBProfile::kValue,
                      "Return value of SBProfile at a chosen 2d position in k-space.")
+                .def("xValues", &xValues, bp::args("x", "y", "val"),
+                     "Fill val with the values of SBProfile at the positions (x,y) in real space.\n"
+                     "\n"
+                     "x, y and val must be 2-d float64 numpy arrays of the same shape.\n"
+                     "If the positions form a regular grid (e.g. from numpy.meshgrid), the values\n"
+                     "are calculated all at once, which is usually faster.")
+                .def("kValues", &kValues, bp::args("kx", "ky", "val"),
+                     "Fill val with the values of SBProfile at the positions (kx,ky) in k-space.\n"
+                     "\n"
+                     "kx, ky must be 2-d float64 numpy arrays of the same shape, and val must be\n"
+                     "a complex128 array of that shape viewed as float64.")
                 .def("maxK", &SBProfile::maxK, "Value of k beyond which aliasing can be neglected")
                 .def("nyquistDx", &SBProfile::nyquistDx,
                      "Image pixel spacing that does not alias maxK")
@@ -133,6 +303,77 @@ namespace galsim {
                 ;
             wrapTemplates<float>(pySBProfile);
             wrapTemplates<double>(pySBProfile);
+
+            bp::def("_drawBatch", &drawBatch,
+                    (bp::arg("profiles"), bp::arg("images"), bp::arg("gains"),
+                     bp::arg("wmult")=1.),
+                    "Draw each SBProfile in profiles onto the corresponding image view in images\n"
+                    "using the corresponding gain.  Equivalent to calling draw() for each one,\n"
+                    "but done in a single call with the GIL released while drawing.\n"
+                    "\n"
+                    "Returns a list of the summed flux for each image.");
+
+            bp::def("setNumThreads", &SetNumThreads, bp::args("nthreads"),
+                    "Set the number of threads to use for large Fourier-space draws.\n"
+                    "\n"
+                    "These are used to fill in the k-space grid, wrap it and do the FFT.\n"
+                    "This only has an effect if GalSim was compiled with WITH_OPENMP=true.\n"
+                    "If nthreads <= 0, the number of CPUs is used.  The default is 1.");
+            bp::def("getNumThreads", &GetNumThreads,
+                    "Get the number of threads to use for large Fourier-space draws.");
+
+            bp::def("setShootChunkSize", &SetShootChunkSize, bp::args("chunk_size"),
+                    "Set the maximum number of photons that drawShoot shoots at a time.\n"
+                    "\n"
+                    "Each chunk of photons is added to the image before the next one is shot,\n"
+                    "so the memory used does not grow with the total number of photons.\n"
+                    "The default is 100000.  For a given seed, changing the chunk size gives\n"
+                    "a different noise realization.");
+            bp::def("getShootChunkSize", &GetShootChunkSize,
+                    "Get the maximum number of photons that drawShoot shoots at a time.");
+
+            bp::def("goodFFTSize", &goodFFTSize, bp::args("input"),
+                    "Return the smallest 2^n or 3x2^n value that is even and >= input.\n"
+                    "\n"
+                    "These are the sizes that GalSim uses for its FFTs.");
+
+            bp::def("setFFTPlanRigor", &SetFFTPlanRigor, bp::args("rigor"),
+                    "Set how much effort FFTW spends planning each FFT size.\n"
+                    "\n"
+                    "Plans are made once per size and cached, so a slower rigor is only paid\n"
+                    "for the first transform of each size.  Valid values are 'estimate'\n"
+                    "(the default), 'measure', 'patient' and 'exhaustive'.");
+            bp::def("getFFTPlanRigor", &GetFFTPlanRigor,
+                    "Get the current FFTW planner rigor.");
+            bp::def("loadFFTWisdom", &LoadFFTWisdom, bp::args("file_name"),
+                    "Load FFTW wisdom from a file written by saveFFTWisdom.");
+            bp::def("saveFFTWisdom", &SaveFFTWisdom, bp::args("file_name"),
+                    "Save the current FFTW wisdom to a file.");
+            bp::def("prepareFFTPlans", &PrepareFFTPlans,
+                    (bp::arg("min_size")=sbp::minimum_fft_size,
+                     bp::arg("max_size")=sbp::maximum_fft_size),
+                    "Make the cached FFTW plans for all the sizes that GalSim uses for its\n"
+                    "FFTs between min_size and max_size.\n"
+                    "\n"
+                    "A typical production run would do something like:\n"
+                    "\n"
+                    "    >>> galsim.setFFTPlanRigor('measure')\n"
+                    "    >>> if os.path.exists(wisdom_file): galsim.loadFFTWisdom(wisdom_file)\n"
+                    "    >>> galsim.prepareFFTPlans()\n"
+                    "    >>> galsim.saveFFTWisdom(wisdom_file)\n");
+            bp::def("clearFFTPlans", &ClearFFTPlans,
+                    "Destroy all of the cached FFTW plans.");
+            bp::def("setFFTPrecision", &SetFFTPrecision, bp::args("precision"),
+                    "Set the precision of the FFTs used for drawing, 'double' (the default)\n"
+                    "or 'float'.\n"
+                    "\n"
+                    "Single-precision FFTs are roughly twice as fast for large images.  The\n"
+                    "drawn images then have errors of order 1.e-6 of the peak pixel value, and\n"
+                    "a similar relative error in the flux, which is fine for an ImageF output.\n"
+                    "This requires the single-precision FFTW library (libfftw3f) when GalSim is\n"
+                    "compiled.  Without it, the FFTs are always done in double precision.");
+            bp::def("getFFTPrecision", &GetFFTPrecision,
+                    "Get the precision actually used for the FFTs, 'double' or 'float'.");
         }
 
     };
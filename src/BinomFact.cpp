@@ -21,85 +21,110 @@
 
 #include "BinomFact.h"
 #include "Std.h"
+#include "Mutex.h"
 #include <vector>
+#include <algorithm>
 
 namespace galsim {
 
+    // These tables are extended as needed, and they may be used by several threads at once.
+    // So rather than resizing a table in place, a larger one is built while holding the lock
+    // and then replaces the old one.  That way readers never see a vector in the middle of
+    // being resized.  The old tables are not deleted, since another thread might still be
+    // reading from one, but the size at least doubles each time, so there are never many.
+    // The table pointers are atomic, so a thread that reads the new pointer without the lock
+    // also sees the contents of the new table.
+    static pthread_mutex_t binom_fact_mutex = PTHREAD_MUTEX_INITIALIZER;
+    typedef std::vector<double> Table1;
+    typedef std::vector<std::vector<double> > Table2;
+    static boost::atomic<const Table1*> fact_table(0);
+    static boost::atomic<const Table1*> sqrtfact_table(0);
+    static boost::atomic<const Table2*> binom_table(0);
+    static boost::atomic<const Table1*> sqrtn_table(0);
+
+    static int NewTableSize(int old_size, int i)
+    { return std::max(i+1, std::max(2*old_size, 10)); }
+
     double fact(int i)
     {
         assert(i>=0);
-        static std::vector<double> f(10);
-        static bool first=true;
-        if (first) {
-            f[0] = f[1] = 1.;
-            for(int j=2;j<10;j++) f[j] = f[j-1]*(double)j;
-            first = false;
-        }
-        if (i>=(int)f.size()) {
-            for(int j=f.size();j<=i;j++)
-                f.push_back(f[j-1]*(double)j);
-            assert(i==(int)f.size()-1);
+        const Table1* f = fact_table.load(boost::memory_order_acquire);
+        if (!f || i>=(int)f->size()) {
+            MutexLock lock(binom_fact_mutex);
+            f = fact_table.load(boost::memory_order_acquire);
+            if (!f || i>=(int)f->size()) {
+                int n = NewTableSize(f ? f->size() : 0, i);
+                Table1* newf = new Table1(n);
+                (*newf)[0] = 1.;
+                for(int j=1;j<n;j++) (*newf)[j] = (*newf)[j-1]*(double)j;
+                fact_table.store(newf, boost::memory_order_release);
+                f = newf;
+            }
         }
-        assert(i<(int)f.size());
-        return f[i];
+        assert(i<(int)f->size());
+        return (*f)[i];
     }
 
     double sqrtfact(int i)
     {
-        static std::vector<double> f(10);
-        static bool first=true;
-        if (first) {
-            f[0] = f[1] = 1.;
-            for(int j=2;j<10;j++) f[j] = f[j-1]*std::sqrt((double)j);
-            first = false;
+        const Table1* f = sqrtfact_table.load(boost::memory_order_acquire);
+        if (!f || i>=(int)f->size()) {
+            MutexLock lock(binom_fact_mutex);
+            f = sqrtfact_table.load(boost::memory_order_acquire);
+            if (!f || i>=(int)f->size()) {
+                int n = NewTableSize(f ? f->size() : 0, i);
+                Table1* newf = new Table1(n);
+                (*newf)[0] = 1.;
+                for(int j=1;j<n;j++) (*newf)[j] = (*newf)[j-1]*std::sqrt((double)j);
+                sqrtfact_table.store(newf, boost::memory_order_release);
+                f = newf;
+            }
         }
-        if (i>=(int)f.size())
-            for(int j=f.size();j<=i;j++)
-                f.push_back(f[j-1]*std::sqrt((double)j));
-        assert(i<(int)f.size());
-        return f[i];
+        assert(i<(int)f->size());
+        return (*f)[i];
     }
 
     double binom(int i,int j)
     {
-        static std::vector<std::vector<double> > f(10);
-        static bool first=true;
-        if (first) {
-            f[0] = std::vector<double>(1,1.);
-            f[1] = std::vector<double>(2,1.);
-            for(int i1=2;i1<10;i1++) {
-                f[i1] = std::vector<double>(i1+1);
-                f[i1][0] = f[i1][i1] = 1.;
-                for(int j1=1;j1<i1;j1++) f[i1][j1] = f[i1-1][j1-1] + f[i1-1][j1];
-            }
-            first = false;
-        }
         if (j<0 || j>i) return 0.;
-        if (i>=(int)f.size()) {
-            for(int i1=f.size();i1<=i;i1++) {
-                f.push_back(std::vector<double>(i1+1,1.));
-                for(int j1=1;j1<i1;j1++) f[i1][j1] = f[i1-1][j1-1] + f[i1-1][j1];
+        const Table2* f = binom_table.load(boost::memory_order_acquire);
+        if (!f || i>=(int)f->size()) {
+            MutexLock lock(binom_fact_mutex);
+            f = binom_table.load(boost::memory_order_acquire);
+            if (!f || i>=(int)f->size()) {
+                int n = NewTableSize(f ? f->size() : 0, i);
+                Table2* newf = new Table2(n);
+                (*newf)[0] = std::vector<double>(1,1.);
+                for(int i1=1;i1<n;i1++) {
+                    (*newf)[i1] = std::vector<double>(i1+1,1.);
+                    for(int j1=1;j1<i1;j1++) 
+                        (*newf)[i1][j1] = (*newf)[i1-1][j1-1] + (*newf)[i1-1][j1];
+                }
+                binom_table.store(newf, boost::memory_order_release);
+                f = newf;
             }
-            assert(i==(int)f.size()-1);
         }
-        assert(i<(int)f.size());
-        assert(j<(int)f[i].size());
-        return f[i][j];
+        assert(i<(int)f->size());
+        assert(j<(int)(*f)[i].size());
+        return (*f)[i][j];
     }
 
     double sqrtn(int i)
     {
-        static std::vector<double> f(10);
-        static bool first=true;
-        if (first) {
-            for(int j=0;j<10;j++) f[j] = std::sqrt((double)j);
-            first = false;
+        const Table1* f = sqrtn_table.load(boost::memory_order_acquire);
+        if (!f || i>=(int)f->size()) {
+            MutexLock lock(binom_fact_mutex);
+            f = sqrtn_table.load(boost::memory_order_acquire);
+            if (!f || i>=(int)f->size()) {
+                int n = NewTableSize(f ? f->size() : 0, i);
+                Table1* newf = new Table1(n);
+                for(int j=0;j<n;j++) (*newf)[j] = std::sqrt((double)j);
+                sqrtn_table.store(newf, boost::memory_order_release);
+                f = newf;
+            }
         }
-        if (i>=(int)f.size())
-            for(int j=f.size();j<=i;j++)
-                f.push_back(std::sqrt((double)j));
-        assert(i<(int)f.size());
-        return f[i];
+        assert(i<(int)f->size());
+        return (*f)[i];
     }
 
 }
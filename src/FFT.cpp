@@ -25,10 +25,16 @@
 
 #include <limits>
 #include <vector>
+#include <map>
+#include <cstdio>
 #include <cassert>
 #include "FFT.h"
 #include "Std.h"
 
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+
 #ifdef DEBUGLOGGING
 #include <fstream>
 std::ostream* dbgout = new std::ofstream("debug.out");
@@ -37,6 +43,231 @@ int verbose_level = 2;
 
 namespace galsim {
 
+    // fftw_execute is the only thread-safe FFTW routine, so all of the plan creation and
+    // destruction calls in this file need to hold this lock.
+    static pthread_mutex_t fftw_plan_mutex = PTHREAD_MUTEX_INITIALIZER;
+
+    static int num_threads = 1;
+
+    void SetNumThreads(int nthreads)
+    {
+#ifdef _OPENMP
+        if (nthreads <= 0) nthreads = omp_get_num_procs();
+        if (nthreads == num_threads) return;
+        num_threads = nthreads;
+#if defined(FFTW_THREADS) || defined(FFTWF_THREADS)
+        // The cached plans were made for the old number of threads.
+        ClearFFTPlans();
+#endif
+#endif
+    }
+
+    int GetNumThreads() { return num_threads; }
+
+    // Smaller FFTs are faster with a single thread.
+    static const int min_threaded_fft_size = 512;
+
+    // Tell FFTW how many threads to use for the next plan of size N.
+    // This changes a global FFTW setting, so it must be called with fftw_plan_mutex held.
+    static void SetPlanThreads(int N)
+    {
+#ifdef FFTW_THREADS
+        static bool fftw_threads_ready = false;
+        if (!fftw_threads_ready) {
+            fftw_init_threads();
+            fftw_threads_ready = true;
+        }
+        fftw_plan_with_nthreads(N >= min_threaded_fft_size ? GetNumThreads() : 1);
+#endif
+    }
+
+#ifdef FFTW_FLOAT
+    // The same thing for the single-precision library, which has its own settings.
+    static void SetFloatPlanThreads(int N)
+    {
+#ifdef FFTWF_THREADS
+        static bool fftwf_threads_ready = false;
+        if (!fftwf_threads_ready) {
+            fftwf_init_threads();
+            fftwf_threads_ready = true;
+        }
+        fftwf_plan_with_nthreads(N >= min_threaded_fft_size ? GetNumThreads() : 1);
+#endif
+    }
+#endif
+
+    // The planner flag used for the cached plans.
+    static unsigned int fftw_plan_rigor = FFTW_ESTIMATE;
+
+    // Whether KTable::transform and XTable::transform use the single-precision plans.
+    static bool use_float_fft = false;
+
+    // The transforms that we make plans for.
+    enum PlanKind { C2R, R2C, C2R_FLOAT, R2C_FLOAT };
+
+    // A plan that is made once for a given size and kind and then reused for any arrays
+    // of that size with the new-array execute functions (fftw_execute_dft_r2c, etc.), which
+    // are thread-safe.  The arrays used to make the plan are only needed while planning.
+    // FFTW_Array allocates with fftw_malloc, so every array we execute on has the same
+    // alignment as the ones used here.
+    class FFTWPlan
+    {
+    public:
+        // Must be called with fftw_plan_mutex held.
+        FFTWPlan(int N, PlanKind kind) : _kind(kind)
+        {
+            if (kind == R2C || kind == C2R) {
+                FFTW_Array<double> xarray(N);
+                FFTW_Array<std::complex<double> > karray(N);
+                SetPlanThreads(N);
+                if (kind == R2C)
+                    _plan = fftw_plan_dft_r2c_2d(
+                        N, N, xarray.get_fftw(), karray.get_fftw(), fftw_plan_rigor);
+                else
+                    _plan = fftw_plan_dft_c2r_2d(
+                        N, N, karray.get_fftw(), xarray.get_fftw(), fftw_plan_rigor);
+                if (_plan==NULL) throw FFTInvalid();
+            } else {
+#ifdef FFTW_FLOAT
+                FFTW_Array<float> xarray(N);
+                FFTW_Array<std::complex<float> > karray(N);
+                SetFloatPlanThreads(N);
+                if (kind == R2C_FLOAT)
+                    _fplan = fftwf_plan_dft_r2c_2d(
+                        N, N, xarray.get_fftw(), karray.get_fftw(), fftw_plan_rigor);
+                else
+                    _fplan = fftwf_plan_dft_c2r_2d(
+                        N, N, karray.get_fftw(), xarray.get_fftw(), fftw_plan_rigor);
+                if (_fplan==NULL) throw FFTInvalid();
+#else
+                throw FFTError("Single-precision FFTW is not available");
+#endif
+            }
+        }
+
+        // Must be called without fftw_plan_mutex held.
+        ~FFTWPlan()
+        {
+            MutexLock lock(fftw_plan_mutex);
+            if (_kind == R2C || _kind == C2R) fftw_destroy_plan(_plan);
+#ifdef FFTW_FLOAT
+            else fftwf_destroy_plan(_fplan);
+#endif
+        }
+
+        fftw_plan get() const { return _plan; }
+#ifdef FFTW_FLOAT
+        fftwf_plan getFloat() const { return _fplan; }
+#endif
+
+    private:
+        FFTWPlan(const FFTWPlan& rhs); ///< Hides the copy constructor.
+        void operator=(const FFTWPlan& rhs); ///< Hides assignment operator.
+
+        PlanKind _kind;
+        fftw_plan _plan;
+#ifdef FFTW_FLOAT
+        fftwf_plan _fplan;
+#endif
+    };
+
+    // The process-wide plan cache, keyed by size and kind.
+    // A plan is held by shared_ptr, so clearing the cache while another thread is executing
+    // the plan is safe.  The plan is destroyed once that thread is done with it.
+    typedef std::map<std::pair<int,PlanKind>, boost::shared_ptr<FFTWPlan> > PlanCache;
+    static PlanCache* plan_cache = 0;
+
+    static boost::shared_ptr<FFTWPlan> GetPlan(int N, PlanKind kind)
+    {
+        MutexLock lock(fftw_plan_mutex);
+        if (!plan_cache) plan_cache = new PlanCache();
+        boost::shared_ptr<FFTWPlan>& plan = (*plan_cache)[std::make_pair(N,kind)];
+        if (!plan) plan.reset(new FFTWPlan(N,kind));
+        return plan;
+    }
+
+    void ClearFFTPlans()
+    {
+        // Move the plans out of the cache while holding the lock, but let them be
+        // destroyed after releasing it, since ~FFTWPlan needs the lock too.
+        PlanCache old_plans;
+        {
+            MutexLock lock(fftw_plan_mutex);
+            if (plan_cache) plan_cache->swap(old_plans);
+        }
+    }
+
+    void SetFFTPlanRigor(const std::string& rigor)
+    {
+        unsigned int flag;
+        if (rigor == "estimate") flag = FFTW_ESTIMATE;
+        else if (rigor == "measure") flag = FFTW_MEASURE;
+        else if (rigor == "patient") flag = FFTW_PATIENT;
+        else if (rigor == "exhaustive") flag = FFTW_EXHAUSTIVE;
+        else throw FFTError("Invalid plan rigor " + rigor);
+        {
+            MutexLock lock(fftw_plan_mutex);
+            if (flag == fftw_plan_rigor) return;
+            fftw_plan_rigor = flag;
+        }
+        ClearFFTPlans();
+    }
+
+    std::string GetFFTPlanRigor()
+    {
+        if (fftw_plan_rigor == FFTW_MEASURE) return "measure";
+        else if (fftw_plan_rigor == FFTW_PATIENT) return "patient";
+        else if (fftw_plan_rigor == FFTW_EXHAUSTIVE) return "exhaustive";
+        else return "estimate";
+    }
+
+    void LoadFFTWisdom(const std::string& file_name)
+    {
+        std::FILE* fp = std::fopen(file_name.c_str(), "r");
+        if (!fp) throw FFTError("Unable to open wisdom file " + file_name);
+        int ok;
+        {
+            MutexLock lock(fftw_plan_mutex);
+            ok = fftw_import_wisdom_from_file(fp);
+        }
+        std::fclose(fp);
+        if (!ok) throw FFTError("Unable to read wisdom from " + file_name);
+        // Any plans made from now on can use the new wisdom.
+        ClearFFTPlans();
+    }
+
+    void SaveFFTWisdom(const std::string& file_name)
+    {
+        std::FILE* fp = std::fopen(file_name.c_str(), "w");
+        if (!fp) throw FFTError("Unable to open wisdom file " + file_name);
+        {
+            MutexLock lock(fftw_plan_mutex);
+            fftw_export_wisdom_to_file(fp);
+        }
+        std::fclose(fp);
+    }
+
+    void PrepareFFTPlans(int min_size, int max_size)
+    {
+        for (int N = goodFFTSize(min_size); N <= max_size; N = goodFFTSize(N+1)) {
+            GetPlan(N, use_float_fft ? R2C_FLOAT : R2C);
+            GetPlan(N, use_float_fft ? C2R_FLOAT : C2R);
+        }
+    }
+
+    void SetFFTPrecision(const std::string& precision)
+    {
+        if (precision == "double") use_float_fft = false;
+#ifdef FFTW_FLOAT
+        else if (precision == "float") use_float_fft = true;
+#else
+        else if (precision == "float") use_float_fft = false;
+#endif
+        else throw FFTError("Invalid FFT precision " + precision);
+    }
+
+    std::string GetFFTPrecision() { return use_float_fft ? "float" : "double"; }
+
     // A helper function that will return the smallest 2^n or 3x2^n value that is
     // even and >= the input integer.
     int goodFFTSize(int input) 
@@ -120,6 +351,37 @@ namespace galsim {
             _array[i] *= scale;
     }
 
+    void KTable::wrapRow(KTable& out, int iyin, int iyout) const
+    {
+        const int Nout = out._N;
+        int ixin = 0;
+        while (ixin < _N/2) {
+            // number of points to accumulate without conjugation:
+            // Do points that do *not* need to be conjugated:
+            int nx = std::min(_N/2-ixin+1, Nout/2+1);
+            const std::complex<double>* inptr = _array.get() + index(ixin,iyin);
+            std::complex<double>* outptr = out._array.get() + out.index(0,iyout);
+            for (int i=0; i<nx; i++) {
+                *outptr += *inptr;
+                inptr++;
+                outptr++;
+            }
+            ixin += Nout/2;
+            if (ixin >= _N/2) break;
+            // Now do any points that *do* need conjugation
+            // such that output storage locations go backwards
+            inptr = _array.get() + index(ixin,iyin);
+            outptr = out._array.get() + out.index(Nout/2, -iyout);
+            nx = std::min(_N/2-ixin+1, Nout/2+1);
+            for (int i=0; i<nx; i++) {
+                *outptr += conj(*inptr);
+                inptr++;
+                outptr--;
+            }
+            ixin += Nout/2;
+        }
+    }
+
     boost::shared_ptr<KTable> KTable::wrap(int Nout) const 
     {
 #ifdef FFT_DEBUG
@@ -128,36 +390,39 @@ namespace galsim {
         // Make it even:
         Nout = 2*((Nout+1)/2);
         boost::shared_ptr<KTable> out(new KTable(Nout, _dk, std::complex<double>(0.,0.)));
+#ifdef _OPENMP
+        const int nthreads = GetNumThreads();
+        if (nthreads > 1) {
+            // An input row that lands in output row iyout adds to rows iyout and -iyout.
+            // So group the input rows by |iyout|.  Each group can then be done by a different
+            // thread.  Within a group, the rows are still added in the same order as below,
+            // so the result is identical to the single-threaded version.
+            std::vector<std::vector<int> > groups(Nout/2+1);
+            for (int iyin=-_N/2; iyin<_N/2; iyin++) {
+                int iyout = iyin;
+                while (iyout < -Nout/2) iyout+=Nout;
+                while (iyout >= Nout/2) iyout-=Nout;
+                groups[std::abs(iyout)].push_back(iyin);
+            }
+#pragma omp parallel for num_threads(nthreads) schedule(dynamic)
+            for (int p=0; p<=Nout/2; p++) {
+                const std::vector<int>& group = groups[p];
+                for (size_t k=0; k<group.size(); k++) {
+                    int iyin = group[k];
+                    int iyout = iyin;
+                    while (iyout < -Nout/2) iyout+=Nout;
+                    while (iyout >= Nout/2) iyout-=Nout;
+                    wrapRow(*out, iyin, iyout);
+                }
+            }
+            return out;
+        }
+#endif
         for (int iyin=-_N/2; iyin<_N/2; iyin++) {
             int iyout = iyin;
             while (iyout < -Nout/2) iyout+=Nout;
             while (iyout >= Nout/2) iyout-=Nout;
-            int ixin = 0;
-            while (ixin < _N/2) {
-                // number of points to accumulate without conjugation:
-                // Do points that do *not* need to be conjugated:
-                int nx = std::min(_N/2-ixin+1, Nout/2+1);
-                const std::complex<double>* inptr = _array.get() + index(ixin,iyin);
-                std::complex<double>* outptr = out->_array.get() + out->index(0,iyout);
-                for (int i=0; i<nx; i++) {
-                    *outptr += *inptr;
-                    inptr++;
-                    outptr++;
-                }
-                ixin += Nout/2;
-                if (ixin >= _N/2) break;
-                // Now do any points that *do* need conjugation
-                // such that output storage locations go backwards
-                inptr = _array.get() + index(ixin,iyin);
-                outptr = out->_array.get() + out->index(Nout/2, -iyout);
-                nx = std::min(_N/2-ixin+1, Nout/2+1);
-                for (int i=0; i<nx; i++) {
-                    *outptr += conj(*inptr);
-                    inptr++;
-                    outptr--;
-                }
-                ixin += Nout/2;
-            }
+            wrapRow(*out, iyin, iyout);
         }
         return out;
     }
@@ -256,7 +521,10 @@ namespace galsim {
 
         std::complex<double> sum = 0.;
         const InterpolantXY* ixy = dynamic_cast<const InterpolantXY*> (&interp);
-        if (ixy) {
+        // The cache below is shared by all threads using this table.  If another thread is 
+        // using it, don't wait for it to finish.  Just do this one without the cache.
+        MutexTryLock lock(_cache_mutex);
+        if (ixy && lock.locked()) {
             // Interpolant is seperable
             // We have the opportunity to speed up the calculation by
             // re-using the sums over rows.  So we will keep a 
@@ -411,7 +679,8 @@ namespace galsim {
                 dbg<<"After multiply by column xvalWrapped: sum = "<<sum<<std::endl;
             }
         } else {
-            // Interpolant is not seperable, calculate weight at each point
+            // Interpolant is not seperable (or the cache is in use), so calculate the weight
+            // at each point
             int ny = iyMax - iyMin;
             if (ny<=0) ny+=_N;
             int nx = ixMax - ixMin;
@@ -757,7 +1026,10 @@ namespace galsim {
 
         double sum = 0.;
         const InterpolantXY* ixy = dynamic_cast<const InterpolantXY*> (&interp);
-        if (ixy) {
+        // The cache below is shared by all threads using this table.  If another thread is 
+        // using it, don't wait for it to finish.  Just do this one without the cache.
+        MutexTryLock lock(_cache_mutex);
+        if (ixy && lock.locked()) {
             // Interpolant is seperable
             // We have the opportunity to speed up the calculation by
             // re-using the sums over rows.  So we will keep a 
@@ -821,7 +1093,8 @@ namespace galsim {
                 sum += sumy * ixy->xval1d(iy-y);
             }
         } else {
-            // Interpolant is not seperable, calculate weight at each point
+            // Interpolant is not seperable (or the cache is in use), so calculate the weight
+            // at each point
             for (int iy=iyMin; iy<=iyMax; iy++) {
                 const double* dptr = _array.get() + index(ixMin, iy);
                 for (int ix=ixMin; ix<=ixMax; ++ix, ++dptr)
@@ -913,6 +1186,22 @@ namespace galsim {
         return sum;
     }
 
+    // Set out = fac * in, with the sign flipped for every other element, so that x=0 is in the
+    // middle of the real-space table.  This is used on both sides of the FFT, converting
+    // between the precision of the table and the precision of the FFT.  in and out may be the
+    // same array.
+    template <typename T1, typename T2>
+    static void ScaleAndFlip(const std::complex<T1>* in, std::complex<T2>* out, int N, double fac)
+    {
+        for (int iy=0; iy<N; iy++) {
+            for (int ix=0; ix<=N/2; ix++) {
+                double f = (ix+iy)%2==0 ? fac : -fac;
+                *out++ = std::complex<T2>(f * in->real(), f * in->imag());
+                ++in;
+            }
+        }
+    }
+
     // Have FFTW develop "wisdom" on doing this kind of transform
     void KTable::fftwMeasure() const 
     {
@@ -922,16 +1211,20 @@ namespace galsim {
 
         XTable xt( _N, 2.*M_PI/(_N*_dk) );
 
-        // Note: The fftw_execute function is the only thread-safe FFTW routine.
-        // So if we decide to go with some kind of multi-threading (rather than multi-process
-        // parallelism) all of the plan creation and destruction calls in this file 
-        // will need to be placed in critical blocks or the equivalent (mutex locks, etc.).
-        fftw_plan plan = fftw_plan_dft_c2r_2d(
-            _N, _N, t_array.get_fftw(), xt._array.get_fftw(), FFTW_MEASURE);
+        fftw_plan plan;
+        {
+            MutexLock lock(fftw_plan_mutex);
+            SetPlanThreads(_N);
+            plan = fftw_plan_dft_c2r_2d(
+                _N, _N, t_array.get_fftw(), xt._array.get_fftw(), FFTW_MEASURE);
+        }
 #ifdef FFT_DEBUG
         if (plan==NULL) throw FFTInvalid();
 #endif
-        fftw_destroy_plan(plan);
+        {
+            MutexLock lock(fftw_plan_mutex);
+            fftw_destroy_plan(plan);
+        }
     }
 
     // Fourier transform from (complex) k to x:
@@ -946,34 +1239,33 @@ namespace galsim {
         // We'll need a new k array because FFTW kills the k array in this
         // operation.  Also, to put x=0 in center of array, we need to flop
         // every other sign of k array, and need to scale.
-        dbg<<"Before make t_array"<<std::endl;
-        FFTW_Array<std::complex<double> > t_array(_N);
-        dbg<<"After make t_array"<<std::endl;
         double fac = _dk * _dk / (4*M_PI*M_PI);
-        long int ind=0;
-        dbg<<"t_array.size = "<<t_array.size()<<std::endl;
-        for (int iy=0; iy<_N; iy++) {
-            dbg<<"ind = "<<ind<<std::endl;
-            for (int ix=0; ix<=_N/2; ix++) {
-                if ( (ix+iy)%2==0) t_array[ind]=fac * _array[ind];
-                else t_array[ind] = -fac* _array[ind];
-                ind++;
-            }
+#ifdef FFTW_FLOAT
+        if (use_float_fft) {
+            // Do the FFT in single precision, and convert the result back to double.
+            FFTW_Array<std::complex<float> > t_array(_N);
+            ScaleAndFlip(_array.get(), t_array.get(), _N, fac);
+            FFTW_Array<float> x_array(_N);
+            boost::shared_ptr<FFTWPlan> plan = GetPlan(_N,C2R_FLOAT);
+            fftwf_execute_dft_c2r(plan->getFloat(), t_array.get_fftw(), x_array.get_fftw());
+            double* xptr = xt._array.get();
+            const float* fptr = x_array.get();
+            for (int i=0; i<_N*_N; i++) xptr[i] = fptr[i];
+            xt._dx = 2.*M_PI/(_N*_dk);
+            return;
         }
+#endif
+        dbg<<"Before make t_array"<<std::endl;
+        FFTW_Array<std::complex<double> > t_array(_N);
+        ScaleAndFlip(_array.get(), t_array.get(), _N, fac);
         dbg<<"After fill t_array"<<std::endl;
 
-        fftw_plan plan = fftw_plan_dft_c2r_2d(
-            _N, _N, t_array.get_fftw(), xt._array.get_fftw(), FFTW_ESTIMATE);
-        dbg<<"After make plan"<<std::endl;
-#ifdef FFT_DEBUG
-        if (plan==NULL) throw FFTInvalid();
-#endif
+        boost::shared_ptr<FFTWPlan> plan = GetPlan(_N,C2R);
+        dbg<<"After get plan"<<std::endl;
 
         // Run the transform:
-        fftw_execute(plan);
+        fftw_execute_dft_c2r(plan->get(), t_array.get_fftw(), xt._array.get_fftw());
         dbg<<"After exec plan"<<std::endl;
-        fftw_destroy_plan(plan);
-        dbg<<"After destroy plan"<<std::endl;
 
         xt._dx = 2.*M_PI/(_N*_dk);
         dbg<<"Done transform"<<std::endl;
@@ -996,13 +1288,21 @@ namespace galsim {
 
         KTable kt( _N, 2.*M_PI/(_N*_dx) );
 
-        fftw_plan plan = fftw_plan_dft_r2c_2d(
-            _N,_N, t_array.get_fftw(), kt._array.get_fftw(), FFTW_MEASURE);
+        fftw_plan plan;
+        {
+            MutexLock lock(fftw_plan_mutex);
+            SetPlanThreads(_N);
+            plan = fftw_plan_dft_r2c_2d(
+                _N,_N, t_array.get_fftw(), kt._array.get_fftw(), FFTW_MEASURE);
+        }
 #ifdef FFT_DEBUG
         if (plan==NULL) throw FFTInvalid();
 #endif
 
-        fftw_destroy_plan(plan);
+        {
+            MutexLock lock(fftw_plan_mutex);
+            fftw_destroy_plan(plan);
+        }
     }
 
     // Fourier transform from x back to (complex) k:
@@ -1010,27 +1310,31 @@ namespace galsim {
     {
         check_array();
 
-        // Make a new copy of data array since measurement will overwrite:
-        FFTW_Array<double> t_array = _array;
-
-        fftw_plan plan = fftw_plan_dft_r2c_2d(
-            _N,_N, t_array.get_fftw(), kt._array.get_fftw(), FFTW_ESTIMATE);
-#ifdef FFT_DEBUG
-        if (plan==NULL) throw FFTInvalid();
+        double fac = _dx * _dx; 
+#ifdef FFTW_FLOAT
+        if (use_float_fft) {
+            // Do the FFT in single precision.  The scaling below converts the result to double.
+            FFTW_Array<float> t_array(_N);
+            const double* xptr = _array.get();
+            float* fptr = t_array.get();
+            for (int i=0; i<_N*_N; i++) fptr[i] = xptr[i];
+            FFTW_Array<std::complex<float> > k_array(_N);
+            boost::shared_ptr<FFTWPlan> plan = GetPlan(_N,R2C_FLOAT);
+            fftwf_execute_dft_r2c(plan->getFloat(), t_array.get_fftw(), k_array.get_fftw());
+            ScaleAndFlip(k_array.get(), kt._array.get(), _N, fac);
+            kt._dk = 2.*M_PI/(_N*_dx);
+            return;
+        }
 #endif
-        fftw_execute(plan);
-        fftw_destroy_plan(plan);
+
+        // Out-of-place r2c plans preserve their input (FFTW_PRESERVE_INPUT is the default for
+        // them), so there is no need to copy the data array first.
+        boost::shared_ptr<FFTWPlan> plan = GetPlan(_N,R2C);
+        fftw_execute_dft_r2c(plan->get(), const_cast<double*>(_array.get_fftw()),
+                             kt._array.get_fftw());
 
         // Now scale the k spectrum and flip signs for x=0 in middle.
-        double fac = _dx * _dx; 
-        size_t ind=0;
-        for (int iy=0; iy<_N; iy++) {
-            for (int ix=0; ix<=_N/2; ix++) {
-                if ( (ix+iy)%2==0) kt._array[ind] *= fac;
-                else kt._array[ind] *= -fac;
-                ind++;
-            }
-        }
+        ScaleAndFlip(kt._array.get(), kt._array.get(), _N, fac);
         kt._dk = 2.*M_PI/(_N*_dx);
     }
 
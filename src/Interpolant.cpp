@@ -33,6 +33,9 @@
 
 namespace galsim {
 
+    // Protects the static caches of Lanczos, Cubic and Quintic tables below.
+    static pthread_mutex_t interpolant_cache_mutex = PTHREAD_MUTEX_INITIALIZER;
+
     double InterpolantFunction::operator()(double x) const  { return _interp.xval(x); }
 
     double InterpolantXY::getPositiveFlux() const 
@@ -146,6 +149,9 @@ namespace galsim {
 
         _u1 = uCalc(1.);
 
+        // Other threads may be making interpolants at the same time.
+        MutexLock lock(interpolant_cache_mutex);
+
         // Strangely, not all compilers correctly setup an empty map when it is a 
         // static variable, so you can get seg faults using it.
         // Doing an explicit clear fixes the problem.
@@ -239,6 +245,9 @@ namespace galsim {
         // interpolations:
         _range = 2.-0.1*_tolerance;
 
+        // Other threads may be making interpolants at the same time.
+        MutexLock lock(interpolant_cache_mutex);
+
         // Strangely, not all compilers correctly setup an empty map when it is a 
         // static variable, so you can get seg faults using it.
         // Doing an explicit clear fixes the problem.
@@ -292,6 +301,9 @@ namespace galsim {
         // interpolations:
         _range = 3.-0.1*_tolerance;
 
+        // Other threads may be making interpolants at the same time.
+        MutexLock lock(interpolant_cache_mutex);
+
         // Strangely, not all compilers correctly setup an empty map when it is a 
         // static variable, so you can get seg faults using it.
         // Doing an explicit clear fixes the problem.
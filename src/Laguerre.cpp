@@ -27,9 +27,13 @@
 #include "BinomFact.h"
 #include "Laguerre.h"
 #include "Solve.h"
+#include "Mutex.h"
 
 namespace galsim {
 
+    // Protects the static caches in apertureFlux() and Generator() below.
+    static pthread_mutex_t laguerre_static_mutex = PTHREAD_MUTEX_INITIALIZER;
+
     void LVector::rotate(const Angle& theta) 
     {
         take_ownership();
@@ -477,6 +481,7 @@ namespace galsim {
         static double psize=-1;
 
         assert(R_>=0.);
+        MutexLock lock(laguerre_static_mutex);
 
         if (maxP<0) maxP= getOrder()/2;
         if (maxP > getOrder()/2) maxP=getOrder()/2;
@@ -570,8 +575,10 @@ namespace galsim {
             << "," << std::setw(2) << getQ() ;
     }
 
-    // Transformation generators - these return a view into static quantities:
-    const tmv::ConstMatrixView<double> LVector::Generator(
+    // Transformation generators - these return a copy of the relevant part of static quantities.
+    // (A view would not be safe, since another thread could replace the static matrix while
+    // the caller is still using it.)
+    tmv::Matrix<double> LVector::Generator(
         GType iparam, int orderOut, int orderIn)
     {
         static boost::shared_ptr<tmv::Matrix<double> > gmu;
@@ -581,6 +588,8 @@ namespace galsim {
         static boost::shared_ptr<tmv::Matrix<double> > ge2;
         static boost::shared_ptr<tmv::Matrix<double> > grot;
 
+        MutexLock lock(laguerre_static_mutex);
+
         const int sizeIn = PQIndex::size(orderIn);
         const int sizeOut = PQIndex::size(orderOut);
 
@@ -610,7 +619,7 @@ namespace galsim {
                 }
                 gmu.reset(new tmv::Matrix<double>(lt.rMatrix()));
             }
-            return gmu->subMatrix(0, sizeOut, 0, sizeIn);
+            return tmv::Matrix<double>(gmu->subMatrix(0, sizeOut, 0, sizeIn));
         }
         if (iparam==iX) {
             if (!gx.get() || gx->nrows()<PQIndex::size(order)) {
@@ -655,7 +664,7 @@ namespace galsim {
                 }
                 gx.reset(new tmv::Matrix<double>(lt.rMatrix()));
             }
-            return gx->subMatrix(0, sizeOut, 0, sizeIn);
+            return tmv::Matrix<double>(gx->subMatrix(0, sizeOut, 0, sizeIn));
         }
 
         if (iparam==iY) {
@@ -701,7 +710,7 @@ namespace galsim {
                 }
                 gy.reset(new tmv::Matrix<double>(lt.rMatrix()));
             }
-            return gy->subMatrix(0, sizeOut, 0, sizeIn);
+            return tmv::Matrix<double>(gy->subMatrix(0, sizeOut, 0, sizeIn));
         }
 
         if (iparam==iE1) {
@@ -749,7 +758,7 @@ namespace galsim {
                 }
                 ge1.reset(new tmv::Matrix<double>(lt.rMatrix()));
             }
-            return ge1->subMatrix(0, sizeOut, 0, sizeIn);
+            return tmv::Matrix<double>(ge1->subMatrix(0, sizeOut, 0, sizeIn));
         }
 
         if (iparam==iE2) {
@@ -797,7 +806,7 @@ namespace galsim {
                 }
                 ge2.reset(new tmv::Matrix<double>(lt.rMatrix()));
             }
-            return ge2->subMatrix(0, sizeOut, 0, sizeIn);
+            return tmv::Matrix<double>(ge2->subMatrix(0, sizeOut, 0, sizeIn));
         }
 
         if (iparam==iRot) {
@@ -810,7 +819,7 @@ namespace galsim {
                 }
                 grot.reset(new tmv::Matrix<double>(lt.rMatrix()));
             }
-            return grot->subMatrix(0, sizeOut, 0, sizeIn);
+            return tmv::Matrix<double>(grot->subMatrix(0, sizeOut, 0, sizeIn));
         } else {
             throw std::runtime_error("Unknown parameter for LVector::Generator()");
         }
@@ -157,33 +157,62 @@ namespace galsim {
     }
 
 
-    // Select a photon from within the interval.  unitRandom
-    // as an initial random value, more from ud if needed for rejections.
-    void Interval::drawWithin(double unitRandom, double& x, double& flux,
-                              UniformDeviate ud) const 
+    // Select a photon from within cell iCell of the interval, using unitRandom
+    // to choose the position within the cell.
+    void Interval::drawWithin(int iCell, double unitRandom, double& x, double& flux) const 
     {
         xdbg<<"drawWithin interval\n";
         xdbg<<"_flux = "<<_flux<<std::endl;
-        double fractionOfInterval = std::min(unitRandom, 1.);
+        const int ncell = _cellAbsFlux.size();
+        xdbg<<"cell "<<iCell<<" of "<<ncell<<std::endl;
+        double fractionOfCell = std::min(unitRandom, 1.);
+        fractionOfCell = std::max(0., fractionOfCell);
+        double fractionOfInterval = (iCell + fractionOfCell) / ncell;
         xdbg<<"fractionOfInterval = "<<fractionOfInterval<<std::endl;
-        fractionOfInterval = std::max(0., fractionOfInterval);
-        xdbg<<"fractionOfInterval => "<<fractionOfInterval<<std::endl;
         x = interpolateFlux(fractionOfInterval);
         xdbg<<"x = "<<x<<std::endl;
-        flux = 1.;
-        if (_useRejectionMethod) {
-            xdbg<<"use rejection\n";
-            while ( ud() > std::abs((*_fluxDensityPtr)(x)) * _invMaxAbsDensity) {
-                x = interpolateFlux(ud());
-            }
-            xdbg<<"x => "<<x<<std::endl;
-            if (_flux < 0) flux = -1.;
-        } else {
-            flux = (*_fluxDensityPtr)(x) * _invMeanAbsDensity;
-        }
+        flux = (*_fluxDensityPtr)(x) * _cellInvMeanAbsDensity[iCell];
         xdbg<<"flux = "<<flux<<std::endl;
     }
 
+    // Divide the interval into ncell cells that are equal in x (or in area for an annulus).
+    // If ncell > 1, the flux in each cell is estimated from the FluxDensity at the cell
+    // boundaries with the trapezoidal rule, and the estimates are normalized to the
+    // integrated flux.  They only need to be roughly right, since drawWithin gives each
+    // photon a flux relative to the mean density in its cell.
+    void Interval::makeCells(int ncell)
+    {
+        checkFlux();
+        double absFlux = std::abs(_flux);
+        double size = _isRadial ? 
+            M_PI*(_xUpper*_xUpper - _xLower*_xLower) :
+            _xUpper - _xLower;
+        _cellAbsFlux.resize(ncell);
+        _cellInvMeanAbsDensity.resize(ncell);
+        if (ncell == 1) {
+            _cellAbsFlux[0] = absFlux;
+            _cellInvMeanAbsDensity[0] = size / absFlux;
+            return;
+        }
+        std::vector<double> density(ncell+1);
+        for (int i=0; i<=ncell; ++i) 
+            density[i] = std::abs((*_fluxDensityPtr)(interpolateFlux(double(i)/ncell)));
+        double sum = 0.;
+        for (int i=0; i<ncell; ++i) {
+            _cellAbsFlux[i] = density[i] + density[i+1];
+            sum += _cellAbsFlux[i];
+        }
+        if (!(sum > 0.)) {
+            // The table missed all of the flux somehow.  Just use a single cell.
+            makeCells(1);
+            return;
+        }
+        for (int i=0; i<ncell; ++i) {
+            _cellAbsFlux[i] *= absFlux / sum;
+            _cellInvMeanAbsDensity[i] = size / ncell / _cellAbsFlux[i];
+        }
+    }
+
     void Interval::checkFlux() const 
     {
         if (_fluxIsReady) return;
@@ -214,14 +243,8 @@ namespace galsim {
     {
         // Get the flux in this interval 
         checkFlux();
-        if (_isRadial) {
-            _invMeanAbsDensity = std::abs( (M_PI*(_xUpper*_xUpper - _xLower*_xLower)) / _flux );
-        } else {
-            _invMeanAbsDensity = std::abs( (_xUpper - _xLower) / _flux );
-        }
         double densityLower = (*_fluxDensityPtr)(_xLower);
         double densityUpper = (*_fluxDensityPtr)(_xUpper);
-        _invMaxAbsDensity = 1. / std::max(std::abs(densityLower),std::abs(densityUpper));
 
         std::list<Interval> result;
         double densityVariation = 0.;
@@ -230,12 +253,13 @@ namespace galsim {
         if (densityVariation > 1.) densityVariation = 1. / densityVariation;
         if (densityVariation > odd::ALLOWED_FLUX_VARIATION) {
             // Don't split if flux range is small
-            _useRejectionMethod = false;
+            makeCells(1);
             result.push_back(*this);
         } else if (std::abs(_flux) < smallFlux) {
-            // Don't split further, as it will be rare to be in this interval
-            // and rejection is ok.
-            _useRejectionMethod = true;
+            // Don't split further, as it will be rare to be in this interval.
+            // Use a table of cells to sample it instead, which is much cheaper
+            // than integrating more intervals.
+            makeCells(odd::INTERVAL_TABLE_SIZE);
             result.push_back(*this);
         } else {
             // Split the interval.  Call (recursively) split() for left & right
@@ -299,14 +323,14 @@ namespace galsim {
                     std::list<Interval> leftList = splitit.split(
                         odd::SMALL_FRACTION_OF_FLUX * totalAbsoluteFlux);
                     xdbg<<"Add "<<leftList.size()<<" intervals on left of extremem\n";
-                    _pt.insert(_pt.end(), leftList.begin(), leftList.end());
+                    _intervals.insert(_intervals.end(), leftList.begin(), leftList.end());
                 }
                 {
                     Interval splitit(_fluxDensity, extremum, range[iRange+1], _isRadial);
                     std::list<Interval> rightList = splitit.split(
                         odd::SMALL_FRACTION_OF_FLUX * totalAbsoluteFlux);
                     xdbg<<"Add "<<rightList.size()<<" intervals on right of extremem\n";
-                    _pt.insert(_pt.end(), rightList.begin(), rightList.end());
+                    _intervals.insert(_intervals.end(), rightList.begin(), rightList.end());
                 }
             } else {
                 // Just single Interval in this range, no extremum:
@@ -314,12 +338,25 @@ namespace galsim {
                 std::list<Interval> leftList = splitit.split(
                     odd::SMALL_FRACTION_OF_FLUX * totalAbsoluteFlux);
                 xdbg<<"Add "<<leftList.size()<<" intervals\n";
-                _pt.insert(_pt.end(), leftList.begin(), leftList.end());
+                _intervals.insert(_intervals.end(), leftList.begin(), leftList.end());
+            }
+        }
+        dbg<<"Total of "<<_intervals.size()<<" intervals\n";
+
+        // Build the AliasTable of all the cells with non-zero flux.
+        std::vector<double> cellFlux;
+        for (Index i = 0; i < _intervals.size(); i++) {
+            for (int j = 0; j < _intervals[i].getNCells(); j++) {
+                double f = _intervals[i].getCellAbsFlux(j);
+                if (f > 0.) {
+                    cellFlux.push_back(f);
+                    _cellInterval.push_back(i);
+                    _cellIndex.push_back(j);
+                }
             }
         }
-        dbg<<"Total of "<<_pt.size()<<" intervals\n";
-        // Build the ProbabilityTree
-        _pt.buildTree();
+        dbg<<"Total of "<<cellFlux.size()<<" cells\n";
+        _aliasTable.build(cellFlux);
     }
 
     boost::shared_ptr<PhotonArray> OneDimensionalDeviate::shoot(int N, UniformDeviate ud) const 
@@ -336,15 +373,17 @@ namespace galsim {
         double fluxPerPhoton = totalAbsoluteFlux / N;
         dbg<<"fluxPerPhoton = "<<fluxPerPhoton<<std::endl;
 
-        // For each photon, first decide which Interval it's in, the drawWithin the interval.
+        // For each photon, first decide which cell of which Interval it's in, then drawWithin
+        // that cell.
         for (int i=0; i<N; i++) {
             if (_isRadial) {
 #ifdef USE_COS_SIN
                 double unitRandom = ud();
-                Interval* chosen = _pt.find(unitRandom);
-                // Now draw a radius from within selected interval
+                int iCell = _aliasTable.find(unitRandom);
+                // Now draw a radius from within selected cell
                 double radius, flux;
-                chosen->drawWithin(unitRandom, radius, flux, ud);
+                _intervals[_cellInterval[iCell]].drawWithin(
+                    _cellIndex[iCell], unitRandom, radius, flux);
                 // Draw second ud to get azimuth 
                 double theta = 2.*M_PI*ud();
                 result->setPhoton(i,
@@ -361,10 +400,11 @@ namespace galsim {
                 } while (rsq>=1. || rsq==0.);
                 // Now rsq is unit deviate from 0 to 1
                 double unitRandom = rsq;
-                const Interval* chosen = _pt.find(unitRandom);
-                // Now draw a radius from within selected interval
+                int iCell = _aliasTable.find(unitRandom);
+                // Now draw a radius from within selected cell
                 double radius, flux;
-                chosen->drawWithin(unitRandom, radius, flux, ud);
+                _intervals[_cellInterval[iCell]].drawWithin(
+                    _cellIndex[iCell], unitRandom, radius, flux);
                 // Rescale x & y:
                 double rScale = radius / std::sqrt(rsq);
                 result->setPhoton(i,xu*rScale, yu*rScale, flux*fluxPerPhoton);
@@ -372,10 +412,10 @@ namespace galsim {
             } else {
                 // Simple 1d interpolation
                 double unitRandom = ud();
-                const Interval* chosen = _pt.find(unitRandom);
-                // Now draw an x from within selected interval
+                int iCell = _aliasTable.find(unitRandom);
+                // Now draw an x from within selected cell
                 double x, flux;
-                chosen->drawWithin(unitRandom, x, flux, ud);
+                _intervals[_cellInterval[iCell]].drawWithin(_cellIndex[iCell], unitRandom, x, flux);
                 result->setPhoton(i, x, 0., flux*fluxPerPhoton);
             }
         }
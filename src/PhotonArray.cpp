@@ -163,6 +163,11 @@ namespace galsim {
         }
     }
 
+    // addTo buckets the photons by row when there are at least this many photons...
+    static const int min_bucket_photons = 100000;
+    // ...and the image is at least this many bytes, so it doesn't fit in cache.
+    static const size_t min_bucket_image_bytes = 1<<22;
+
     template <class T>
     double PhotonArray::addTo(ImageView<T>& target) const 
     {
@@ -180,52 +185,54 @@ namespace galsim {
         dbg<<"fluxScale = "<<fluxScale<<std::endl;
         dbg<<"bounds = "<<b<<std::endl;
 
+        const int xmin = b.getXMin();
+        const int ymin = b.getYMin();
+        const int nx = b.getXMax() - xmin + 1;
+        const int ny = b.getYMax() - ymin + 1;
+        const int stride = target.getStride();
+        T* data = target.getData();
+        const int N = size();
+
+        // Index of each photon's pixel relative to (xmin,ymin), or -1 if it is off the image.
+        // Casting to unsigned makes a negative index fail the < nx test too.
+        std::vector<int> ipix(N);
         double addedFlux = 0.;
-#ifdef DEBUGLOGGING
-        double totalFlux = 0.;
-        double lostFlux = 0.;
-        int nx = target.getXMax()-target.getXMin()+1;
-        int ny = target.getYMax()-target.getYMin()+1;
-        std::vector<std::vector<double> > posFlux(nx,std::vector<double>(ny,0.));
-        std::vector<std::vector<double> > negFlux(nx,std::vector<double>(ny,0.));
-#endif
-        for (int i=0; i<int(size()); i++) {
-            int ix = int(floor(_x[i]/dx + 0.5));
-            int iy = int(floor(_y[i]/dx + 0.5));
-#ifdef DEBUGLOGGING
-            totalFlux += _flux[i];
-            xdbg<<"  photon: ("<<_x[i]<<','<<_y[i]<<")  f = "<<_flux[i]<<std::endl;
-#endif
-            if (b.includes(ix,iy)) {
-#ifdef DEBUGLOGGING
-                if (_flux[i] > 0.) posFlux[ix-target.getXMin()][iy-target.getXMin()] += _flux[i];
-                else negFlux[ix-target.getXMin()][iy-target.getXMin()] -= _flux[i];
-#endif
-                target(ix,iy) += _flux[i]*fluxScale;
+        for (int i=0; i<N; i++) {
+            int ix = int(std::floor(_x[i]/dx + 0.5)) - xmin;
+            int iy = int(std::floor(_y[i]/dx + 0.5)) - ymin;
+            if (unsigned(ix) < unsigned(nx) && unsigned(iy) < unsigned(ny)) {
+                ipix[i] = iy*stride + ix;
                 addedFlux += _flux[i];
             } else {
-#ifdef DEBUGLOGGING
-                xdbg<<"lost flux at ix = "<<ix<<", iy = "<<iy<<" with flux = "<<_flux[i]<<std::endl;
-                lostFlux += _flux[i];
-#endif
+                ipix[i] = -1;
             }
         }
-#ifdef DEBUGLOGGING
-        dbg<<"totalFlux = "<<totalFlux<<std::endl;
-        dbg<<"addedlFlux = "<<addedFlux<<std::endl;
-        dbg<<"lostFlux = "<<lostFlux<<std::endl;
-        for(int ix=0;ix<nx;++ix) {
-            for(int iy=0;iy<ny;++iy) {
-                double pos = posFlux[ix][iy];
-                double neg = negFlux[ix][iy];
-                double tot = pos + neg;
-                if (tot > 0.) {
-                    xdbg<<"eta("<<ix+target.getXMin()<<','<<iy+target.getXMin()<<") = "<<
-                        neg<<" / "<<tot<<" = "<<neg/tot<<std::endl;
+        dbg<<"addedFlux = "<<addedFlux<<std::endl;
+
+        if (N < min_bucket_photons || size_t(ny)*stride*sizeof(T) < min_bucket_image_bytes) {
+            for (int i=0; i<N; i++) {
+                if (ipix[i] >= 0) data[ipix[i]] += _flux[i]*fluxScale;
+            }
+        } else {
+            // Counting sort of the photons by row, keeping only the pixel index and flux.
+            dbg<<"Bucket photons by row\n";
+            std::vector<int> start(ny+1,0);
+            for (int i=0; i<N; i++) {
+                if (ipix[i] >= 0) ++start[ipix[i]/stride + 1];
+            }
+            for (int iy=0; iy<ny; iy++) start[iy+1] += start[iy];
+            std::vector<int> bpix(start[ny]);
+            std::vector<double> bflux(start[ny]);
+            for (int i=0; i<N; i++) {
+                if (ipix[i] >= 0) {
+                    int k = start[ipix[i]/stride]++;
+                    bpix[k] = ipix[i];
+                    bflux[k] = _flux[i];
                 }
             }
+            const int nin = bpix.size();
+            for (int k=0; k<nin; k++) data[bpix[k]] += bflux[k]*fluxScale;
         }
-#endif
 
         return addedFlux;
     }
@@ -92,6 +92,23 @@ namespace galsim {
         return xv;
     } 
 
+    void SBAdd::SBAddImpl::getFootprint(
+        double& xmin, double& xmax, double& ymin, double& ymax) const
+    {
+        // The union of the footprints of the components.
+        ConstIter pptr = _plist.begin();
+        assert(pptr != _plist.end());
+        GetImpl(*pptr)->getFootprint(xmin,xmax,ymin,ymax);
+        for (++pptr; pptr != _plist.end(); ++pptr) {
+            double xmin_1, xmax_1, ymin_1, ymax_1;
+            GetImpl(*pptr)->getFootprint(xmin_1,xmax_1,ymin_1,ymax_1);
+            if (xmin_1 < xmin) xmin = xmin_1;
+            if (xmax_1 > xmax) xmax = xmax_1;
+            if (ymin_1 < ymin) ymin = ymin_1;
+            if (ymax_1 > ymax) ymax = ymax_1;
+        }
+    }
+
     std::complex<double> SBAdd::SBAddImpl::kValue(const Position<double>& k) const 
     {
         ConstIter pptr = _plist.begin();
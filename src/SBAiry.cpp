@@ -341,11 +341,18 @@ namespace galsim {
         return result;
     }
 
+    // The sampler is only built the first time it is needed, and the AiryInfo objects are
+    // shared by all SBAiry objects with the same obscuration, so lock while checking it.
+    static pthread_mutex_t airy_sampler_mutex = PTHREAD_MUTEX_INITIALIZER;
+
     boost::shared_ptr<PhotonArray> SBAiry::SBAiryImpl::AiryInfo::shoot(
         int N, UniformDeviate u) const
     {
         // Use the OneDimensionalDeviate to sample from scale-free distribution
-        checkSampler();
+        {
+            MutexLock lock(airy_sampler_mutex);
+            checkSampler();
+        }
         assert(_sampler.get());
         return _sampler->shoot(N, u);
     }
@@ -118,6 +118,23 @@ namespace galsim {
             throw SBError("Real-space integration of more than 2 profiles is not implemented.");
     }
 
+    void SBConvolve::SBConvolveImpl::getFootprint(
+        double& xmin, double& xmax, double& ymin, double& ymax) const
+    {
+        // The footprint of a convolution is contained in the sum of the footprints.
+        ConstIter pptr = _plist.begin();
+        assert(pptr != _plist.end());
+        GetImpl(*pptr)->getFootprint(xmin,xmax,ymin,ymax);
+        for (++pptr; pptr != _plist.end(); ++pptr) {
+            double xmin_1, xmax_1, ymin_1, ymax_1;
+            GetImpl(*pptr)->getFootprint(xmin_1,xmax_1,ymin_1,ymax_1);
+            xmin += xmin_1;
+            xmax += xmax_1;
+            ymin += ymin_1;
+            ymax += ymax_1;
+        }
+    }
+
     std::complex<double> SBConvolve::SBConvolveImpl::kValue(const Position<double>& k) const 
     {
         ConstIter pptr = _plist.begin();
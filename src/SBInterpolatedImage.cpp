@@ -235,6 +235,7 @@ namespace galsim {
 
     boost::shared_ptr<KTable> MultipleImageHelper::getKTable(int i) const 
     {
+        MutexLock lock(_pimpl->vk_mutex);
         if (!_pimpl->vk[i].get()) _pimpl->vk[i] = _pimpl->vx[i]->transform();
         return _pimpl->vk[i];
     }
@@ -341,17 +342,24 @@ namespace galsim {
     void SBInterpolatedImage::SBInterpolatedImageImpl::checkK() const 
     {
         // Conduct FFT
-        if (_ktab.get()) return;
+        if (_ktab_ready.isSet()) return;
+        // This is called from kValue, so other threads may be here too.  Make sure only one
+        // of them does the work, and only set _ktab_ready once it is finished.
+        MutexLock lock(_mutex);
+        if (_ktab_ready.isSet()) return;
+        boost::shared_ptr<KTable> ktab;
         if (_multi.size() == 1 && _wts[0] == 1.) {
-            _ktab = _multi.getKTable(0);
+            ktab = _multi.getKTable(0);
         } else {
-            _ktab.reset(new KTable(*_multi.getKTable(0)));
-            *_ktab *= _wts[0];
+            ktab.reset(new KTable(*_multi.getKTable(0)));
+            *ktab *= _wts[0];
             for (size_t i=1; i<_multi.size(); ++i)
-                _ktab->accumulate(*_multi.getKTable(i), _wts[i]);
+                ktab->accumulate(*_multi.getKTable(i), _wts[i]);
         }
+        _ktab = ktab;
         dbg<<"Built ktab\n";
         dbg<<"ktab size = "<<_ktab->getN()<<", scale = "<<_ktab->getDk()<<std::endl;
+        _ktab_ready.set();
     }
 
     double SBInterpolatedImage::SBInterpolatedImageImpl::xValue(const Position<double>& p) const 
@@ -717,29 +725,38 @@ namespace galsim {
 
     void SBInterpolatedImage::SBInterpolatedImageImpl::checkReadyToShoot() const 
     {
+        MutexLock lock(_mutex);
         if (_readyToShoot) return;
 
-        dbg<<"SBInterpolatedImage not ready to shoot.  Build _pt:\n";
+        dbg<<"SBInterpolatedImage not ready to shoot.  Build _shootTable:\n";
 
-        // Build the sets holding cumulative fluxes of all Pixels
+        // Record the index and flux of each pixel with non-zero flux, and build the alias
+        // table that picks among them in proportion to |flux|.
         _positiveFlux = 0.;
         _negativeFlux = 0.;
-        _pt.clear();
-        for (int iy=-_multi.getNin()/2; iy<_multi.getNin()/2; ++iy) {
-            double y = iy*_multi.getScale();
-            for (int ix=-_multi.getNin()/2; ix<_multi.getNin()/2; ++ix) {
-                double flux = _xtab->xval(ix,iy) * _multi.getScale()*_multi.getScale();
+        const int Nin = _multi.getNin();
+        const int Nino2 = Nin/2;
+        const double pixArea = _multi.getScale()*_multi.getScale();
+        std::vector<double> absFlux;
+        _shootPixels.clear();
+        for (int iy=-Nino2; iy<Nino2; ++iy) {
+            for (int ix=-Nino2; ix<Nino2; ++ix) {
+                double flux = _xtab->xval(ix,iy) * pixArea;
                 if (flux==0.) continue;
-                double x=ix*_multi.getScale();
+                int index = (ix+Nino2) + (iy+Nino2)*Nin;
                 if (flux > 0.) {
                     _positiveFlux += flux;
+                    _shootPixels.push_back(index);
+                    absFlux.push_back(flux);
                 } else {
                     _negativeFlux += -flux;
+                    _shootPixels.push_back(~index);
+                    absFlux.push_back(-flux);
                 }
-                _pt.push_back(Pixel(x,y,flux));
             }
         }
-        _pt.buildTree();
+        dbg<<"Found "<<_shootPixels.size()<<" pixels with non-zero flux\n";
+        if (!_shootPixels.empty()) _shootTable.build(absFlux);
 
         // The above just computes the positive and negative flux for the main image.
         // This is convolved by the interpolant, so we need to correct these values
@@ -765,26 +782,33 @@ namespace galsim {
         dbg<<"Target flux = "<<getFlux()<<std::endl;
         assert(N>=0);
         checkReadyToShoot();
-        /* The pixel coordinates are stored by cumulative absolute flux in 
-         * a C++ standard-libary set, so the inversion is done with a binary
-         * search tree.  There are no doubt speed gains available from sorting the 
-         * pixels by flux, and somehow weighting the tree search to the elements holding
-         * the most flux.  But I'm doing it the simplest way right now.
+        /* The pixels are chosen with an alias table built over their absolute fluxes,
+         * so each photon takes the same time to place regardless of the number of pixels
+         * or the distribution of flux among them.
          */
         assert(N>=0);
 
         boost::shared_ptr<PhotonArray> result(new PhotonArray(N));
-        if (N<=0 || _pt.empty()) return result;
+        if (N<=0 || _shootPixels.empty()) return result;
         double totalAbsFlux = _positiveFlux + _negativeFlux;
         double fluxPerPhoton = totalAbsFlux / N;
         dbg<<"posFlux = "<<_positiveFlux<<", negFlux = "<<_negativeFlux<<std::endl;
         dbg<<"totFlux = "<<_positiveFlux-_negativeFlux<<", totAbsFlux = "<<totalAbsFlux<<std::endl;
         dbg<<"fluxPerPhoton = "<<fluxPerPhoton<<std::endl;
+        const int Nin = _multi.getNin();
+        const int Nino2 = Nin/2;
+        const double dx = _multi.getScale();
         for (int i=0; i<N; ++i) {
             double unitRandom = ud();
-            const Pixel* p = _pt.find(unitRandom);
-            result->setPhoton(i, p->x, p->y, 
-                              p->isPositive ? fluxPerPhoton : -fluxPerPhoton);
+            int index = _shootPixels[_shootTable.find(unitRandom)];
+            double flux = fluxPerPhoton;
+            if (index < 0) {
+                index = ~index;
+                flux = -fluxPerPhoton;
+            }
+            int ix = index % Nin - Nino2;
+            int iy = index / Nin - Nino2;
+            result->setPhoton(i, ix*dx, iy*dx, flux);
         }
         dbg<<"result->getTotalFlux = "<<result->getTotalFlux()<<std::endl;
 
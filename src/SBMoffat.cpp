@@ -427,7 +427,10 @@ namespace galsim {
 
     void SBMoffat::SBMoffatImpl::setupFT() const
     {
-        if (_ft.size() > 0) return;
+        if (_ft_ready.isSet()) return;
+        // The same SBMoffat may be drawn by several threads at once.
+        MutexLock lock(_ft_mutex);
+        if (_ft_ready.isSet()) return;
 
         // Do a Hankel transform and store the results in a lookup table.
 
@@ -462,6 +465,7 @@ namespace galsim {
             if (n_below_thresh == 5) break;
         }
         dbg<<"maxK = "<<_maxK<<std::endl;
+        _ft_ready.set();
     }
 
     boost::shared_ptr<PhotonArray> SBMoffat::SBMoffatImpl::shoot(int N, UniformDeviate u) const
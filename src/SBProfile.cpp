@@ -21,6 +21,8 @@
 
 //#define DEBUGLOGGING
 
+#include <algorithm>
+
 #include "SBProfile.h"
 #include "SBTransform.h"
 #include "SBProfileImpl.h"
@@ -75,6 +77,70 @@ namespace galsim {
         return _pimpl->kValue(k); 
     }
 
+    // Return the index i in [0,n) for which x0 + i*dx = 0, or -1 if there isn't one.
+    static int FindZero(double x0, double dx, int n, double tol)
+    {
+        double i = std::floor(-x0/dx + 0.5);
+        if (i >= 0. && i < n && std::abs(x0 + i*dx) <= tol) return int(i);
+        else return -1;
+    }
+
+    // Check whether x[j*nx+i] = x[0] + i*dx and y[j*nx+i] = y[0] + j*dy for all i,j.
+    // If so, also find the indices of x=0 and y=0 to pass to fillXValue or fillKValue.
+    // If the grid doesn't include (0,0), these are both 0, which means there is no center
+    // of symmetry to use.  (Setting just one of them to 0 would mean that x=0 or y=0 is at
+    // index 0.)
+    static bool IsGrid(const double* x, const double* y, int nx, int ny,
+                       double& dx, int& ix_zero, double& dy, int& iy_zero)
+    {
+        if (nx < 2 || ny < 2) return false;
+        dx = x[1] - x[0];
+        dy = y[nx] - y[0];
+        if (dx == 0. || dy == 0.) return false;
+        const double xtol = 1.e-10 * (std::abs(x[0]) + std::abs(nx*dx));
+        const double ytol = 1.e-10 * (std::abs(y[0]) + std::abs(ny*dy));
+        for (int j=0, k=0; j<ny; ++j) {
+            const double yj = y[0] + j*dy;
+            for (int i=0; i<nx; ++i, ++k) {
+                if (std::abs(x[k] - (x[0] + i*dx)) > xtol) return false;
+                if (std::abs(y[k] - yj) > ytol) return false;
+            }
+        }
+        ix_zero = FindZero(x[0],dx,nx,xtol);
+        iy_zero = FindZero(y[0],dy,ny,ytol);
+        if (ix_zero < 0 || iy_zero < 0) ix_zero = iy_zero = 0;
+        return true;
+    }
+
+    void SBProfile::xValues(const double* x, const double* y, double* val, int nx, int ny) const
+    {
+        assert(_pimpl.get());
+        double dx, dy;
+        int ix_zero, iy_zero;
+        if (IsGrid(x,y,nx,ny,dx,ix_zero,dy,iy_zero)) {
+            tmv::MatrixView<double> mval(val,nx,ny,1,nx,tmv::NonConj);
+            _pimpl->fillXValue(mval,x[0],dx,ix_zero,y[0],dy,iy_zero);
+        } else {
+            const int n = nx*ny;
+            for (int k=0; k<n; ++k) val[k] = _pimpl->xValue(Position<double>(x[k],y[k]));
+        }
+    }
+
+    void SBProfile::kValues(const double* kx, const double* ky, std::complex<double>* val,
+                            int nx, int ny) const
+    {
+        assert(_pimpl.get());
+        double dkx, dky;
+        int ix_zero, iy_zero;
+        if (IsGrid(kx,ky,nx,ny,dkx,ix_zero,dky,iy_zero)) {
+            tmv::MatrixView<std::complex<double> > mval(val,nx,ny,1,nx,tmv::NonConj);
+            _pimpl->fillKValue(mval,kx[0],dkx,ix_zero,ky[0],dky,iy_zero);
+        } else {
+            const int n = nx*ny;
+            for (int k=0; k<n; ++k) val[k] = _pimpl->kValue(Position<double>(kx[k],ky[k]));
+        }
+    }
+
     void SBProfile::getXRange(double& xmin, double& xmax, std::vector<double>& splits) const 
     { 
         assert(_pimpl.get());
@@ -372,6 +438,45 @@ namespace galsim {
     void addMatrix(tmv::MatrixView<double> m1, const tmv::ConstMatrixView<double>& m2)
     { m1 += m2; }
 
+    void SBProfile::SBProfileImpl::getFootprint(
+        double& xmin, double& xmax, double& ymin, double& ymax) const
+    {
+        std::vector<double> splits;
+        getXRange(xmin,xmax,splits);
+        getYRange(ymin,ymax,splits);
+        if (xmin > -integ::MOCK_INF && xmax < integ::MOCK_INF &&
+            ymin > -integ::MOCK_INF && ymax < integ::MOCK_INF) return;
+
+        // Otherwise, start with a square of half-width pi/stepK around the centroid, and
+        // double it until the profile is below footprint_threshold times its peak all along
+        // the edges.  If it never gets there, leave the footprint infinite.
+        Position<double> cen = centroid();
+        double peak = std::abs(xValue(cen));
+        double R = M_PI / stepK();
+        const int nedge = 32;
+        const int maxiter = 20;
+        for (int iter=0; iter<maxiter; ++iter, R*=2.) {
+            double edge = 0.;
+            for (int i=0; i<=nedge; ++i) {
+                double t = R * (2.*i/nedge - 1.);
+                edge = std::max(edge, std::abs(xValue(cen + Position<double>(t,-R))));
+                edge = std::max(edge, std::abs(xValue(cen + Position<double>(t,R))));
+                edge = std::max(edge, std::abs(xValue(cen + Position<double>(-R,t))));
+                edge = std::max(edge, std::abs(xValue(cen + Position<double>(R,t))));
+            }
+            xdbg<<"footprint R = "<<R<<": edge = "<<edge<<", peak = "<<peak<<std::endl;
+            if (edge <= sbp::footprint_threshold * peak) {
+                if (xmin == -integ::MOCK_INF) xmin = cen.x - R;
+                if (xmax == integ::MOCK_INF) xmax = cen.x + R;
+                if (ymin == -integ::MOCK_INF) ymin = cen.y - R;
+                if (ymax == integ::MOCK_INF) ymax = cen.y + R;
+                return;
+            }
+            // The peak might not be at the centroid.
+            peak = std::max(peak, edge);
+        }
+    }
+
     template <typename T>
     double SBProfile::SBProfileImpl::fillXImage(ImageView<T>& I, double gain) const 
     {
@@ -379,33 +484,42 @@ namespace galsim {
         double dx = I.getScale();
         xdbg<<"dx = "<<dx<<", gain = "<<gain<<std::endl;
 
-        const int m = I.getXMax()-I.getXMin()+1;
-        const int n = I.getYMax()-I.getYMin()+1;
-        tmv::Vector<double> x(m);
-        const int xmin = I.getXMin();
-        for (int i=0;i<m;++i) x.ref(i) = (xmin+i)*dx;
-
-        tmv::Vector<double> y(n);
-        const int ymin = I.getYMin();
-        for (int i=0;i<n;++i) y.ref(i) = (ymin+i)*dx;
+        // Only evaluate the profile at the pixels within its footprint.  The rest of the image
+        // would just get (effectively) zero added to it.
+        double fxmin, fxmax, fymin, fymax;
+        getFootprint(fxmin,fxmax,fymin,fymax);
+        xdbg<<"footprint = "<<fxmin<<" .. "<<fxmax<<" , "<<fymin<<" .. "<<fymax<<std::endl;
+        const int xmin = std::max(I.getXMin(), int(std::max(std::floor(fxmin/dx), -1.e9)));
+        const int xmax = std::min(I.getXMax(), int(std::min(std::ceil(fxmax/dx), 1.e9)));
+        const int ymin = std::max(I.getYMin(), int(std::max(std::floor(fymin/dx), -1.e9)));
+        const int ymax = std::min(I.getYMax(), int(std::min(std::ceil(fymax/dx), 1.e9)));
+        if (xmin > xmax || ymin > ymax) return 0.;
+        const int m = xmax-xmin+1;
+        const int n = ymax-ymin+1;
+        xdbg<<"draw bounds = "<<xmin<<" .. "<<xmax<<" , "<<ymin<<" .. "<<ymax<<std::endl;
 
         tmv::Matrix<double> val(m,n);
 #ifdef DEBUGLOGGING
         val.setAllTo(999.);
 #endif
-        assert(xmin <= 0 && ymin <= 0 && -xmin < m && -ymin < n);
-        fillXValue(val.view(),xmin*dx,dx,-xmin,ymin*dx,dx,-ymin);
+        // The footprint might not include the origin, in which case there is no (0,0) pixel
+        // for fillXValue to use as the center of symmetry.  Then pass 0 for both indices,
+        // which means there isn't one.  (Passing just one of them as 0 would mean that
+        // x=0 or y=0 is at index 0.)
+        const bool has_origin = (xmin <= 0 && xmax >= 0 && ymin <= 0 && ymax >= 0);
+        fillXValue(val.view(),xmin*dx,dx,has_origin ? -xmin : 0,
+                   ymin*dx,dx,has_origin ? -ymin : 0);
 
         // Sometimes rounding errors cause the nominal (0,0) to be slightly off.
         // So redo (0,0) just to be sure.
         // TODO: This is really just to get the unit tests to pass.  It's usually the value
         // for Sersic that fails to match the central peak at 5 digits of accuracy.
         // Probaby, we should just update reference images and remove this line...
-        val(-xmin,-ymin) = xValue(Position<double>(0.,0.));
+        if (has_origin) val(-xmin,-ymin) = xValue(Position<double>(0.,0.));
 
         if (gain != 1.) val /= gain;
 
-        tmv::MatrixView<T> mI(I.getData(),m,n,1,I.getStride(),tmv::NonConj);
+        tmv::MatrixView<T> mI(&I(xmin,ymin),m,n,1,I.getStride(),tmv::NonConj);
         //mI += val;
         addMatrix(mI,val);
         double totalflux = val.sumElements();
@@ -625,14 +739,12 @@ namespace galsim {
         double dx = xt.getDx();
         xt.clearCache();
 
-        tmv::Matrix<double> val(N,N);
+        // The XTable uses the same layout as fillXValue, so fill it directly.
+        tmv::MatrixView<double> mxt(xt.getArray(),N,N,1,N,tmv::NonConj);
 #ifdef DEBUGLOGGING
-        val.setAllTo(999.);
+        mxt.setAllTo(999.);
 #endif
-        fillXValue(val.view(),-(N/2)*dx,dx,N/2,-(N/2)*dx,dx,N/2);
-
-        tmv::MatrixView<double> mxt(xt.getArray(),N,N,1,N,tmv::NonConj);
-        mxt = val;
+        fillXValue(mxt,-(N/2)*dx,dx,N/2,-(N/2)*dx,dx,N/2);
     }
 
     void SBProfile::SBProfileImpl::fillKGrid(KTable& kt) const 
@@ -641,23 +753,45 @@ namespace galsim {
         double dk = kt.getDk();
         kt.clearCache();
 
-        tmv::Vector<double> kx(N/2+1);
-        for (int i=0;i<=N/2;++i) kx.ref(i) = i*dk;
-
-        tmv::Vector<double> ky(N);
-        for (int i=0;i<=N/2;++i) ky.ref(i) = i*dk;
-        for (int i=-N/2+1;i<0;++i) ky.ref(i+N) = i*dk;
-
-        tmv::Matrix<std::complex<double> > val(N/2+1,N);
+        // Only the kx >= 0 half of the plane is stored, since the profiles are real in x space.
+        // We fill it directly in the KTable's memory with ky increasing from -N/2+1 to N/2,
+        // so the profile can use the quadrant symmetry if it has it.  Then rotate the columns
+        // in place to the order the KTable wants, with the ky >= 0 columns first.
+        const int nkx = N/2+1;
+        tmv::MatrixView<std::complex<double> > val(kt.getArray(),nkx,N,1,nkx,tmv::NonConj);
 #ifdef DEBUGLOGGING
         val.setAllTo(999.);
 #endif
-        fillKValue(val.view(),0.,dk,0,(-N/2+1)*dk,dk,N/2-1);
+#ifdef _OPENMP
+        const int nthreads = std::min(GetNumThreads(), N);
+        if (nthreads > 1) {
+            // Split the columns (i.e. the ky values) into one chunk per thread.
+            // Only the chunk that includes ky = 0 can use the quadrant symmetry.
+            // Exceptions can't leave the parallel region, so save the message and rethrow.
+            std::string err;
+#pragma omp parallel for num_threads(nthreads) schedule(static,1)
+            for (int k=0; k<nthreads; ++k) {
+                const int j1 = k*N/nthreads;
+                const int j2 = (k+1)*N/nthreads;
+                const int jzero = (N/2-1 >= j1 && N/2-1 < j2) ? N/2-1-j1 : 0;
+                try {
+                    fillKValue(val.colRange(j1,j2),0.,dk,0,(-N/2+1+j1)*dk,dk,jzero);
+                } catch (std::exception& e) {
+#pragma omp critical (fillKGrid)
+                    {
+                        err = e.what();
+                    }
+                }
+            }
+            if (err != "") throw std::runtime_error(err);
+        } else 
+#endif
+        {
+            fillKValue(val,0.,dk,0,(-N/2+1)*dk,dk,N/2-1);
+        }
 
-        tmv::MatrixView<std::complex<double> > mkt(kt.getArray(),N/2+1,N,1,N/2+1,tmv::NonConj);
-        // The KTable wants the locations of the + and - ky values swapped.
-        mkt.colRange(0,N/2+1) = val.colRange(N/2-1,N);
-        mkt.colRange(N/2+1,N) = val.colRange(0,N/2-1);
+        std::complex<double>* k0 = kt.getArray();
+        std::rotate(k0, k0 + (N/2-1)*nkx, k0 + N*nkx);
     }
 
     // The type of T (real or complex) determines whether the call-back is to 
@@ -765,9 +899,137 @@ namespace galsim {
         FillQuadrant(*this,val,x0,dx,nx1,y0,dy,ny1);
     }
 
+    // The maximum number of photons that drawShoot shoots and adds to the image at a time.
+    static int shoot_chunk_size = 100000;
+
+    void SetShootChunkSize(int chunk_size)
+    {
+        if (chunk_size <= 0)
+            throw SBError("SetShootChunkSize requires a positive chunk_size");
+        shoot_chunk_size = chunk_size;
+    }
+
+    int GetShootChunkSize()
+    { return shoot_chunk_size; }
+
+    // The bounds of the pixels of b that the photons in pa land on, for pixel scale dx.
+    static Bounds<int> PhotonBounds(const PhotonArray& pa, double dx, const Bounds<int>& b)
+    {
+        const int N = pa.size();
+        if (N == 0) return Bounds<int>();
+        double xmin = pa.getX(0);
+        double xmax = xmin;
+        double ymin = pa.getY(0);
+        double ymax = ymin;
+        for (int i=1; i<N; ++i) {
+            const double x = pa.getX(i);
+            const double y = pa.getY(i);
+            if (x < xmin) xmin = x;
+            else if (x > xmax) xmax = x;
+            if (y < ymin) ymin = y;
+            else if (y > ymax) ymax = y;
+        }
+        // Stay in doubles until the bounds are clipped to b, since a photon far from the
+        // image could overflow an int.
+        xmin = std::floor(xmin/dx + 0.5);
+        xmax = std::floor(xmax/dx + 0.5);
+        ymin = std::floor(ymin/dx + 0.5);
+        ymax = std::floor(ymax/dx + 0.5);
+        if (xmax < b.getXMin() || xmin > b.getXMax() || ymax < b.getYMin() || ymin > b.getYMax())
+            return Bounds<int>();
+        return Bounds<int>(xmin < b.getXMin() ? b.getXMin() : int(xmin),
+                           xmax > b.getXMax() ? b.getXMax() : int(xmax),
+                           ymin < b.getYMin() ? b.getYMin() : int(ymin),
+                           ymax > b.getYMax() ? b.getYMax() : int(ymax));
+    }
+
+    template <class T>
+    double SBProfile::shootThreaded(
+        const std::vector<int>& chunks, ImageView<T> img, UniformDeviate u, int nthreads,
+        double flux_scaling, double origN, double flux_factor) const
+    {
+        // Each thread gets its own UniformDeviate, seeded from the caller's, and its own image
+        // to add its photons to.  The chunks are dealt out to the threads in turn, so which
+        // photons each thread shoots doesn't depend on how the threads are scheduled.
+        // Then the images are added to img in order, so the result only depends on the
+        // initial state of u and nthreads.  (And it is the same whether or not OpenMP is
+        // available.)
+        // Each thread's image only covers the part of img that its photons land on, and is
+        // grown if a later chunk lands outside of it.  So a small object on a large image
+        // doesn't need nthreads image-sized buffers, or a sum over all of img for each one.
+        std::vector<UniformDeviate> uds;
+        for (int k=0; k<nthreads; ++k) {
+            // seed(0) would seed from the time of day, so make sure the seeds are > 0.
+            long seed = long(u() * 2147483646.) + 1;
+            xdbg<<"seed for thread "<<k<<" = "<<seed<<std::endl;
+            uds.push_back(UniformDeviate(seed));
+        }
+        const double dx = img.getScale();
+        std::vector<boost::shared_ptr<Image<double> > > images(nthreads);
+        std::vector<double> added_flux(nthreads, 0.);
+        const int nchunks = chunks.size();
+
+        // Exceptions can't leave the parallel region, so save the message and rethrow.
+        std::string err;
+#ifdef _OPENMP
+#pragma omp parallel for num_threads(nthreads) schedule(static,1)
+#endif
+        for (int k=0; k<nthreads; ++k) {
+            try {
+                for (int i=k; i<nchunks; i+=nthreads) {
+                    boost::shared_ptr<PhotonArray> pa = _pimpl->shoot(chunks[i], uds[k]);
+                    // Use the same two steps to scale the flux as the serial version.
+                    pa->scaleFlux(flux_scaling * chunks[i] / origN);
+                    if (flux_factor != 1.) pa->scaleFlux(flux_factor);
+
+                    // Photons that miss img don't add any flux, so if they all do, we're done.
+                    Bounds<int> b = PhotonBounds(*pa, dx, img.getBounds());
+                    if (!b.isDefined()) continue;
+                    if (!images[k] || !images[k]->getBounds().includes(b)) {
+                        // Grow this thread's image, and copy over what is already there.
+                        if (images[k]) b += images[k]->getBounds();
+                        boost::shared_ptr<Image<double> > im(new Image<double>(b, 0.));
+                        im->setScale(dx);
+                        if (images[k]) {
+                            const Image<double>& old = *images[k];
+                            const Bounds<int> ob = old.getBounds();
+                            for (int y=ob.getYMin(); y<=ob.getYMax(); ++y) {
+                                for (int x=ob.getXMin(); x<=ob.getXMax(); ++x)
+                                    (*im)(x,y) = old(x,y);
+                            }
+                        }
+                        images[k] = im;
+                    }
+                    ImageView<double> view = images[k]->view();
+                    added_flux[k] += pa->addTo(view);
+                }
+            } catch (std::exception& e) {
+#ifdef _OPENMP
+#pragma omp critical (shootThreaded)
+#endif
+                {
+                    err = e.what();
+                }
+            }
+        }
+        if (err != "") throw std::runtime_error(err);
+
+        double total_added_flux = 0.;
+        for (int k=0; k<nthreads; ++k) {
+            if (!images[k]) continue;
+            const Bounds<int> b = images[k]->getBounds();
+            for (int y=b.getYMin(); y<=b.getYMax(); ++y) {
+                for (int x=b.getXMin(); x<=b.getXMax(); ++x) img(x,y) += (*images[k])(x,y);
+            }
+            total_added_flux += added_flux[k];
+        }
+        return total_added_flux;
+    }
+
     template <class T>
     double SBProfile::drawShoot(ImageView<T> img, double N, UniformDeviate u,
-                                double gain, double max_extra_noise, bool poisson_flux) const 
+                                double gain, double max_extra_noise, bool poisson_flux,
+                                int nthreads) const 
     {
         // If N = 0, this routine will try to end up with an image with the number of real 
         // photons = flux that has the corresponding Poisson noise. For profiles that are 
@@ -833,9 +1095,7 @@ namespace galsim {
         dbg<<"gain = "<<gain<<std::endl;
         dbg<<"max_extra_noise = "<<max_extra_noise<<std::endl;
         dbg<<"poisson = "<<poisson_flux<<std::endl;
-
-        // Don't do more than this at a time to keep the  memory usage reasonable.
-        const int maxN = 100000; 
+        dbg<<"nthreads = "<<nthreads<<std::endl;
 
         double flux = getFlux();
         dbg<<"flux = "<<flux<<std::endl;
@@ -886,13 +1146,57 @@ namespace galsim {
         img.setCenter(0,0);
         dbg<<"On input, image has central value = "<<img(0,0)<<std::endl;
 
-        // Store the PhotonArrays to be added here rather than add them as we go,
-        // since we might need to rescale them all before adding.
+        // Work out how many photons will be shot in each chunk.  If max_extra_noise = 0,
+        // this is known ahead of time, so we know the final flux scaling as well, and each
+        // chunk can be added to the image as soon as it is shot.  Otherwise, the total number
+        // of photons depends on the noise estimate, so the final flux scaling is only known
+        // at the end.  Then the photon arrays are kept until the end, unless they would take
+        // more memory than a temporary image.  In that case, they are added to a temporary
+        // image instead, which is rescaled and added to img at the end.  Either way, the
+        // memory used is at most about one chunk of photons or one image.  And we only loop
+        // over all the pixels of img when there are at least a third as many photons, so
+        // drawing a faint object onto a large image still takes time proportional to the
+        // number of photons.
+        const int maxN = shoot_chunk_size;
+        double rescale = 1.;
         std::vector<boost::shared_ptr<PhotonArray> > arrays;
+        double nstored = 0.;
+        const double npix = double(img.getXMax()-img.getXMin()+1) *
+            double(img.getYMax()-img.getYMin()+1);
+        boost::shared_ptr<Image<double> > tmp;
+        if (max_extra_noise <= 0.) {
+            // Follow the same steps as the loop below.
+            std::vector<int> chunks;
+            double finalN = N;
+            do {
+                int n = maxN;
+                if (n > finalN) n = int(finalN+0.5);
+                chunks.push_back(n);
+                finalN -= n;
+            } while (finalN >= 1.);
+            // If we won't shoot all the original number of photons, then our flux isn't right.
+            // Need to rescale the arrays by factor of origN / (origN-finalN)
+            if (finalN > 0.1) rescale = origN / (origN-finalN);
+            dbg<<"Will shoot "<<origN-finalN<<" photons, rescale = "<<rescale<<std::endl;
+
+            if (nthreads > 1) {
+                double added_flux = shootThreaded(chunks, img, u, nthreads,
+                                                  flux_scaling, origN, rescale / gain);
+                dbg<<"Added flux (falling within image bounds) = "<<added_flux*gain<<std::endl;
+                return added_flux * gain;
+            }
+        }
+
+        double added_flux = 0.; // total flux falling inside image bounds, returned
+#ifdef DEBUGLOGGING
+        double realized_flux = 0.;
+        double positive_flux = 0.;
+        double negative_flux = 0.;
+#endif
 
         // If we're automatically figuring out N based on max_extra_noise, start with 100 photons
         // Otherwise we'll do a maximum of maxN at a time until we go through all N.
-        int thisN = max_extra_noise > 0. ? 100 : maxN;
+        int thisN = max_extra_noise > 0. ? std::min(100,maxN) : maxN;
         Position<double> cen = centroid();
         Bounds<double> b(cen);
         b.addBorder(0.5);
@@ -914,18 +1218,12 @@ namespace galsim {
             xdbg<<"scale flux by "<<(flux_scaling*thisN/origN)<<std::endl;
             pa->scaleFlux(flux_scaling * thisN / origN);
             xdbg<<"pa.flux => "<<pa->getTotalFlux()<<std::endl;
-            arrays.push_back(pa);
             N -= thisN;
             xdbg<<"N -> "<<N<<std::endl;
 
-            // This is always a reason to break out.
-            if (N < 1.) break;
-
             if (max_extra_noise > 0.) {
-                xdbg<<"Check the noise level\n";
                 // First need to find what the current fmax is.
                 // (Only need to update based on the latest pa.)
-
                 for(int i=0; i<pa->size(); ++i) {
                     if (b.includes(pa->getX(i),pa->getY(i))) {
                         ++fmax_count;
@@ -934,7 +1232,42 @@ namespace galsim {
                 }
                 xdbg<<"fmax_count = "<<fmax_count<<std::endl;
                 xdbg<<"raw_fmax = "<<raw_fmax<<std::endl;
+                if (!tmp && 3.*(nstored + pa->size()) > npix) {
+                    // Switch to a temporary image, and add the stored photons to it.
+                    dbg<<"Switch to a temporary image after "<<nstored<<" photons\n";
+                    tmp.reset(new Image<double>(img.getBounds(), 0.));
+                    tmp->setScale(img.getScale());
+                    ImageView<double> tmp_view = tmp->view();
+                    for (size_t k=0; k<arrays.size(); ++k)
+                        added_flux += arrays[k]->addTo(tmp_view);
+                    arrays.clear();
+                }
+                if (tmp) {
+                    ImageView<double> tmp_view = tmp->view();
+                    added_flux += pa->addTo(tmp_view);
+                } else {
+                    arrays.push_back(pa);
+                    nstored += pa->size();
+                }
+            } else {
+                if (rescale != 1.) pa->scaleFlux(rescale / gain);
+                else if (gain != 1.) pa->scaleFlux(1./gain);
+                added_flux += pa->addTo(img);
+            }
+#ifdef DEBUGLOGGING
+            realized_flux += pa->getTotalFlux();
+            for(int i=0; i<pa->size(); ++i) {
+                double f = pa->getFlux(i);
+                if (f >= 0.) positive_flux += f;
+                else negative_flux += -f;
+            }
+#endif
+
+            // This is always a reason to break out.
+            if (N < 1.) break;
 
+            if (max_extra_noise > 0.) {
+                xdbg<<"Check the noise level\n";
                 // Make sure we've got at least 25 photons for our fmax estimate and that
                 // the fmax value is positive.
                 // Otherwise keep the same initial value of thisN = 100 and try again.
@@ -957,37 +1290,51 @@ namespace galsim {
             }
         }
 
-        if (N > 0.1) {
-            // If we didn't shoot all the original number of photons, then our flux isn't right.
-            // Need to rescale the arrays by factor of origN / (origN-N)
-            dbg<<"Flux scalings were set according to origN = "<<origN<<std::endl;
-            dbg<<"But only shot N = "<<origN-N<<std::endl;
-            double factor = origN / (origN-N) / gain;
-            dbg<<"Rescale arrays by factor = "<<factor<<std::endl;
-            for (size_t k=0; k<arrays.size(); ++k) arrays[k]->scaleFlux(factor);
-        } else if (gain != 1.0) {
-            // Also need to rescale if the gain != 1
-            dbg<<"Rescale arrays by 1./gain = "<<1./gain<<std::endl;
-            for (size_t k=0; k<arrays.size(); ++k) arrays[k]->scaleFlux(1./gain);
-        }
-
-        // Now we can go ahead and add all the arrays to the image:
-        double added_flux = 0.; // total flux falling inside image bounds, returned
+        if (tmp) {
+            // Now we know how many photons were shot, so we can add the temporary image
+            // with the right scaling.
+            double factor = 1./gain;
+            if (N > 0.1) {
+                dbg<<"Flux scalings were set according to origN = "<<origN<<std::endl;
+                dbg<<"But only shot N = "<<origN-N<<std::endl;
+                factor *= origN / (origN-N);
+            }
+            dbg<<"Rescale photons by factor = "<<factor<<std::endl;
+            const int xmin = img.getXMin();
+            const int xmax = img.getXMax();
+            const int ymin = img.getYMin();
+            const int ymax = img.getYMax();
+            for (int y=ymin; y<=ymax; ++y) {
+                for (int x=xmin; x<=xmax; ++x) img(x,y) += factor * (*tmp)(x,y);
+            }
+            added_flux *= factor;
 #ifdef DEBUGLOGGING
-        double realized_flux = 0.;
-        double positive_flux = 0.;
-        double negative_flux = 0.;
+            realized_flux *= factor;
+            positive_flux *= factor;
+            negative_flux *= factor;
 #endif
-        for (size_t k=0; k<arrays.size(); ++k) {
-            PhotonArray* pa = arrays[k].get();
-            added_flux += pa->addTo(img);
-#ifdef DEBUGLOGGING
-            realized_flux += pa->getTotalFlux();
-            for(int i=0; i<pa->size(); ++i) {
-                double f = pa->getFlux(i);
-                if (f >= 0.) positive_flux += f;
-                else negative_flux += -f;
+        } else if (!arrays.empty()) {
+            // Rescale the stored arrays and add them to the image.
+            double factor = 1.;
+            if (N > 0.1) {
+                // If we didn't shoot all the original number of photons, then our flux isn't
+                // right.  Need to rescale the arrays by factor of origN / (origN-N)
+                dbg<<"Flux scalings were set according to origN = "<<origN<<std::endl;
+                dbg<<"But only shot N = "<<origN-N<<std::endl;
+                factor = origN / (origN-N) / gain;
+            } else if (gain != 1.0) {
+                // Also need to rescale if the gain != 1
+                factor = 1./gain;
             }
+            dbg<<"Rescale arrays by factor = "<<factor<<std::endl;
+            for (size_t k=0; k<arrays.size(); ++k) {
+                if (factor != 1.) arrays[k]->scaleFlux(factor);
+                added_flux += arrays[k]->addTo(img);
+            }
+#ifdef DEBUGLOGGING
+            realized_flux *= factor;
+            positive_flux *= factor;
+            negative_flux *= factor;
 #endif
         }
 
@@ -1015,10 +1362,10 @@ namespace galsim {
 
     template double SBProfile::drawShoot(
         ImageView<float> image, double N, UniformDeviate ud, double gain,
-        double max_extra_noise, bool poisson_flux) const;
+        double max_extra_noise, bool poisson_flux, int nthreads) const;
     template double SBProfile::drawShoot(
         ImageView<double> image, double N, UniformDeviate ud, double gain,
-        double max_extra_noise, bool poisson_flux) const;
+        double max_extra_noise, bool poisson_flux, int nthreads) const;
 
     template double SBProfile::draw(ImageView<float> img, double gain, double wmult) const;
     template double SBProfile::draw(ImageView<double> img, double gain, double wmult) const;
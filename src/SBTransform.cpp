@@ -330,6 +330,25 @@ namespace galsim {
         }
     }
 
+    void SBTransform::SBTransformImpl::getFootprint(
+        double& xmin, double& xmax, double& ymin, double& ymax) const
+    {
+        // Transform the corners of the adaptee's footprint and take their bounding box.
+        double x1, x2, y1, y2;
+        GetImpl(_adaptee)->getFootprint(x1,x2,y1,y2);
+        Position<double> p[4] = {
+            _cen + fwd(Position<double>(x1,y1)), _cen + fwd(Position<double>(x2,y1)),
+            _cen + fwd(Position<double>(x1,y2)), _cen + fwd(Position<double>(x2,y2)) };
+        xmin = xmax = p[0].x;
+        ymin = ymax = p[0].y;
+        for (int i=1; i<4; ++i) {
+            xmin = std::min(xmin,p[i].x);
+            xmax = std::max(xmax,p[i].x);
+            ymin = std::min(ymin,p[i].y);
+            ymax = std::max(ymax,p[i].y);
+        }
+    }
+
     void SBTransform::SBTransformImpl::getXRange(
         double& xmin, double& xmax, std::vector<double>& splits) const
     {
@@ -480,6 +499,14 @@ namespace galsim {
         const Position<double>& k, const Position<double>& cen)
     { return adaptee.kValue(fwdTk) * std::polar(absdet , -k.x*cen.x-k.y*cen.y); }
 
+    // Return the index i in [0,n) for which x0 + i*dx = 0, or -1 if there isn't one.
+    static int ZeroIndex(double x0, double dx, int n)
+    {
+        double i = std::floor(-x0/dx + 0.5);
+        if (i >= 0. && i < n && std::abs(x0 + i*dx) < 1.e-10) return int(i);
+        else return -1;
+    }
+
     void SBTransform::SBTransformImpl::fillXValue(tmv::MatrixView<double> val,
                                                   double x0, double dx, int ix_zero,
                                                   double y0, double dy, int iy_zero) const
@@ -496,12 +523,15 @@ namespace galsim {
         if (!_zeroCen) {
             x0 -= _cen.x;
             y0 -= _cen.y;
-            int dix = int(_cen.x/dx);
-            int diy = int(_cen.y/dy);
-            if (std::abs(_cen.x - dix*dx) < 1.e-10) ix_zero += dix;
-            else ix_zero = 0;
-            if (std::abs(_cen.y - diy*dy) < 1.e-10) iy_zero += diy;
-            else iy_zero = 0;
+            // The shift moves the point that the adaptee sees as (0,0), so find its indices
+            // again from the shifted x0,y0.  The caller's ix_zero,iy_zero can't just be shifted,
+            // since 0 might mean there was no zero index, and the shifted ones might not be
+            // in the matrix.  If either is missing, pass 0 for both, which means there is no
+            // center of symmetry to use.
+            int ix = ZeroIndex(x0,dx,val.colsize());
+            int iy = ZeroIndex(y0,dy,val.rowsize());
+            if (ix >= 0 && iy >= 0) { ix_zero = ix; iy_zero = iy; }
+            else { ix_zero = 0; iy_zero = 0; }
         }
 
         // Apply inv to x,y
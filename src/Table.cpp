@@ -37,6 +37,7 @@
 #include "TMV.h"
 #include "TMV_SymBand.h"
 #include "Table.h"
+#include "Mutex.h"
 #include <cmath>
 #include <vector>
 
@@ -59,39 +60,41 @@ namespace galsim {
             while (a < v[index-1].arg) --index;
             return index;
         } else {
-            xassert(lastIndex >= 1);
-            xassert(lastIndex < int(v.size()));
+            // Work with a local copy of lastIndex, since other threads may be using this
+            // Table at the same time.  Any value they store is a valid index, so the worst
+            // that can happen is a less useful starting guess.
+            int i = lastIndex.load();
+            xassert(i >= 1);
+            xassert(i < int(v.size()));
 
-            if ( a < v[lastIndex-1].arg ) {
-                xassert(lastIndex-2 >= 0);
+            if ( a < v[i-1].arg ) {
+                xassert(i-2 >= 0);
                 // Check to see if the previous one is it.
-                if (a >= v[lastIndex-2].arg) return --lastIndex; 
+                if (a >= v[i-2].arg) --i;
                 else {
-                    // Look for the entry from 0..lastIndex-1:
+                    // Look for the entry from 0..i-1:
                     Entry e(a,0); 
-                    iter p = std::upper_bound(v.begin(), v.begin()+lastIndex-1, e);
+                    iter p = std::upper_bound(v.begin(), v.begin()+i-1, e);
                     xassert(p != v.begin());
-                    xassert(p != v.begin()+lastIndex-1);
-                    lastIndex = p-v.begin();
-                    return lastIndex;
+                    xassert(p != v.begin()+i-1);
+                    i = p-v.begin();
                 }
-            } else if (a > v[lastIndex].arg) {
-                xassert(lastIndex+1 < int(v.size()));
+            } else if (a > v[i].arg) {
+                xassert(i+1 < int(v.size()));
                 // Check to see if the next one is it.
-                if (a <= v[lastIndex+1].arg) return ++lastIndex;
+                if (a <= v[i+1].arg) ++i;
                 else {
-                    // Look for the entry from lastIndex..end
+                    // Look for the entry from i..end
                     Entry e(a,0); 
-                    iter p = std::lower_bound(v.begin()+lastIndex+1, v.end(), e);
-                    xassert(p != v.begin()+lastIndex+1);
+                    iter p = std::lower_bound(v.begin()+i+1, v.end(), e);
+                    xassert(p != v.begin()+i+1);
                     xassert(p != v.end());
-                    lastIndex = p-v.begin();
-                    return lastIndex;
+                    i = p-v.begin();
                 }
-            } else {
-                // Then lastIndex is correct.
-                return lastIndex;
             }
+            // Else i is already correct.
+            lastIndex.store(i);
+            return i;
         }
     }
 
@@ -101,12 +104,12 @@ namespace galsim {
     {
         Entry e(_arg,_val);
         v.push_back(e);
-        isReady = false; //re-sort array next time used
+        isReady.clear(); //re-sort array next time used
     }
 
     template<class V, class A>
     Table<V,A>::Table(const A* argvec, const V* valvec, int N, interpolant in) :
-        iType(in), isReady(false)
+        iType(in)
     {
         v.reserve(N);
         const A* aptr;
@@ -120,7 +123,7 @@ namespace galsim {
 
     template<class V, class A>
     Table<V,A>::Table(const std::vector<A>& aa, const std::vector<V>& vv, interpolant in) : 
-        iType(in), isReady(false)
+        iType(in)
     {
         v.reserve(aa.size());
         if (vv.size() != aa.size()) 
@@ -236,16 +239,23 @@ namespace galsim {
     }
 
     // Do any necessary setup of the table before using
+    // Tables are often shared between threads (e.g. the static ones used by SBSersic,
+    // SBKolmogorov, etc.), so make sure only one thread does the setup.  This only happens
+    // once per Table, so a single lock for all of them is fine.
+    static pthread_mutex_t table_setup_mutex = PTHREAD_MUTEX_INITIALIZER;
+
     template<class V, class A>
     void Table<V,A>::setup() const 
     {
-        if (isReady) return;
+        if (isReady.isSet()) return;
+        MutexLock lock(table_setup_mutex);
+        if (isReady.isSet()) return;
 
         if (v.size() <= 1) 
             throw TableError("Trying to use a null Table (need at least 2 entries)");
 
         sortIt();
-        lastIndex = 1; // Start back at the beginning for the next search.
+        lastIndex.store(1); // Start back at the beginning for the next search.
 
         // See if arguments are equally spaced
         // ...within this fractional error:
@@ -277,7 +287,7 @@ namespace galsim {
           default:
                throw TableError("interpolation method not yet implemented");
         }
-        isReady = true;
+        isReady.set();
     }
 
     template <class V, class A>
@@ -1311,6 +1311,41 @@ def test_ConstImageView_array_constness():
     print 'time for %s = %.2f'%(funcname(),t2-t1)
             
 
+def test_Image_asImageView():
+    """Test that asImageView only copies the array when it has to.
+    """
+    import time
+    t1 = time.time()
+    for i in xrange(ntypes):
+        # An array with the right type and layout is used directly.
+        array = ref_array.astype(types[i])
+        image = galsim.image.asImageView(array, types[i])
+        assert isinstance(image, galsim.ImageView[types[i]])
+        np.testing.assert_array_equal(image.array, ref_array.astype(types[i]))
+        array[2,3] = 99
+        np.testing.assert_equal(image(4,3), 99,
+                err_msg="asImageView copied a compatible array for dtype = "+str(types[i]))
+
+        # So is a subarray with a larger row stride.
+        big = np.zeros((nrow+2, ncol+3), dtype=types[i])
+        image = galsim.image.asImageView(big[1:nrow+1, 2:ncol+2], types[i], xmin=3, ymin=2)
+        assert image.bounds == galsim.BoundsI(3,ncol+2,2,nrow+1)
+        image.array[:,:] = ref_array
+        np.testing.assert_array_equal(big[1:nrow+1, 2:ncol+2], ref_array.astype(types[i]),
+                err_msg="asImageView copied a subarray for dtype = "+str(types[i]))
+
+        # Other types, transposes and non-native byte order need a copy.
+        for array in [ ref_array.astype(types[(i+1)%ntypes]),
+                       np.ascontiguousarray(ref_array.T.astype(types[i])).T,
+                       ref_array.astype(np.dtype(types[i]).newbyteorder()) ]:
+            image = galsim.image.asImageView(array, types[i])
+            assert isinstance(image, galsim.ImageView[types[i]])
+            np.testing.assert_array_equal(image.array, array.astype(types[i]),
+                    err_msg="asImageView gave the wrong values for dtype = "+str(types[i]))
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+
 if __name__ == "__main__":
     test_Image_basic()
     test_Image_FITS_IO()
@@ -1335,3 +1370,4 @@ if __name__ == "__main__":
     test_Image_inplace_scalar_divide()
     test_Image_subImage()
     test_ConstImageView_array_constness()
+    test_Image_asImageView()
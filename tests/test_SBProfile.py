@@ -2246,6 +2246,545 @@ def test_draw():
     t2 = time.time()
     print 'time for %s = %.2f'%(funcname(),t2-t1)
 
+def test_draw_batch():
+    """Test that drawBatch produces the same images as drawing each object in turn.
+    """
+    import time
+    t1 = time.time()
+
+    pix = galsim.Pixel(xw=0.2)
+    objs = [ galsim.Gaussian(flux=test_flux, sigma=1.3),
+             galsim.Convolve([galsim.Exponential(flux=test_flux, scale_radius=0.7), pix]),
+             galsim.Convolve([galsim.Moffat(beta=3, flux=2.*test_flux, half_light_radius=1.1),
+                              pix]) ]
+
+    # Mix of float and double images, one with undefined bounds and one None.
+    images = [ galsim.ImageF(32,32), galsim.ImageD(24,24), galsim.ImageF() ]
+    images2 = [ galsim.ImageF(32,32), galsim.ImageD(24,24), galsim.ImageF() ]
+    images = galsim.drawBatch(objs, images, dx=0.2)
+    for obj, im, im2 in zip(objs, images, images2):
+        im2 = obj.draw(im2, dx=0.2)
+        np.testing.assert_array_almost_equal(
+            im.array, im2.array, 9, "drawBatch produced a different image than draw")
+        np.testing.assert_almost_equal(
+            im.added_flux, im2.added_flux, 9, "drawBatch produced a different added_flux")
+
+    # Test surface brightness normalization and add_to_image
+    images = galsim.drawBatch(objs, images, normalization="sb", add_to_image=True)
+    for obj, im, im2 in zip(objs, images, images2):
+        obj.draw(im2, normalization="sb", add_to_image=True)
+        np.testing.assert_array_almost_equal(
+            im.array, im2.array, 9, "drawBatch(add_to_image=True) differs from draw")
+
+    # Test automatically made images
+    images = galsim.drawBatch(objs)
+    for obj, im in zip(objs, images):
+        im2 = obj.draw()
+        np.testing.assert_array_almost_equal(
+            im.array, im2.array, 9, "drawBatch(image=None) differs from draw")
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+def test_draw_threads():
+    """Test that drawing from several python threads at once matches drawing serially.
+    """
+    import time
+    t1 = time.time()
+    import threading
+
+    pix = galsim.Pixel(xw=0.2)
+    # Use some profiles with lazily built or shared tables to exercise the locking.
+    def make_objs():
+        return [ galsim.Convolve([galsim.Moffat(beta=2.7, flux=test_flux, 
+                                                half_light_radius=0.9), pix]),
+                 galsim.Convolve([galsim.Sersic(n=2.3, flux=test_flux, 
+                                                half_light_radius=1.1), pix]),
+                 galsim.Convolve([galsim.Kolmogorov(lam_over_r0=1.3, flux=test_flux), pix]),
+                 galsim.Convolve([galsim.Airy(lam_over_diam=0.5, obscuration=0.3,
+                                              flux=test_flux), pix]) ]
+    nthreads = 4
+
+    objs = make_objs()
+    images = [ [ galsim.ImageD(40,40) for obj in objs ] for k in range(nthreads) ]
+    def draw_all(ims):
+        for obj, im in zip(objs, ims):
+            obj.draw(im, dx=0.2)
+    threads = [ threading.Thread(target=draw_all, args=(images[k],)) for k in range(nthreads) ]
+    for t in threads: t.start()
+    for t in threads: t.join()
+
+    for k, obj in enumerate(make_objs()):
+        im = obj.draw(galsim.ImageD(40,40), dx=0.2)
+        for ims in images:
+            np.testing.assert_array_almost_equal(
+                ims[k].array, im.array, 9, "Drawing in threads gave a different image")
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+def test_fft_threads():
+    """Test that setting the number of threads for FFT draws doesn't change the result.
+    """
+    import time
+    t1 = time.time()
+
+    # Use a convolution that needs an FFT, and a small dx so that the k-space grid is wrapped.
+    obj = galsim.Convolve([galsim.Sersic(n=1.5, half_light_radius=1.2, flux=test_flux),
+                           galsim.Moffat(beta=3.5, fwhm=0.9), galsim.Pixel(xw=0.1)])
+    nthreads = galsim.getNumThreads()
+    galsim.setNumThreads(1)
+    im1 = obj.draw(dx=0.1, wmult=2)
+    galsim.setNumThreads(4)
+    im4 = obj.draw(dx=0.1, wmult=2)
+    galsim.setNumThreads(nthreads)
+    np.testing.assert_array_almost_equal(
+        im4.array, im1.array, 10, "Drawing with 4 threads gave a different image")
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+def test_fft_plans():
+    """Test that the FFTW plan rigor and wisdom files don't change the result.
+    """
+    import time
+    import tempfile
+    t1 = time.time()
+
+    obj = galsim.Convolve([galsim.Sersic(n=1.5, half_light_radius=1.2, flux=test_flux),
+                           galsim.Moffat(beta=3.5, fwhm=0.9), galsim.Pixel(xw=0.2)])
+    im1 = obj.draw(dx=0.2)
+
+    rigor = galsim.getFFTPlanRigor()
+    np.testing.assert_raises(RuntimeError, galsim.setFFTPlanRigor, 'invalid')
+    galsim.setFFTPlanRigor('measure')
+    np.testing.assert_equal(galsim.getFFTPlanRigor(), 'measure')
+    galsim.prepareFFTPlans(128, 256)
+    wisdom_file = tempfile.mktemp()
+    galsim.saveFFTWisdom(wisdom_file)
+    galsim.clearFFTPlans()
+    galsim.loadFFTWisdom(wisdom_file)
+    im2 = obj.draw(dx=0.2)
+    galsim.setFFTPlanRigor(rigor)
+    os.remove(wisdom_file)
+    np.testing.assert_array_almost_equal(
+        im2.array, im1.array, 10, "Drawing with measured FFTW plans gave a different image")
+    np.testing.assert_raises(RuntimeError, galsim.loadFFTWisdom, wisdom_file)
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+def test_draw_auto():
+    """Test the cost model used by draw(method='auto').
+    """
+    import time
+    t1 = time.time()
+
+    dx = 0.2
+    psf = galsim.Moffat(beta=3.5, fwhm=0.9)
+    pix = galsim.Pixel(xw=dx)
+
+    # A very bright star should be drawn with an FFT, not by shooting 10^8 photons.
+    star = galsim.Convolve([psf * 1.e8, pix])
+    costs = star.estimateDrawCosts(dx=dx, max_extra_noise=1.)
+    np.testing.assert_equal(sorted(costs.keys()), ['fft', 'phot'])
+    assert costs['fft'] < costs['phot']
+    im1 = star.draw(dx=dx)
+    im2 = star.draw(dx=dx, method='auto', max_extra_noise=1.)
+    np.testing.assert_array_almost_equal(
+        im2.array/1.e8, im1.array/1.e8, 10, "draw(method='auto') gave a different image than fft")
+
+    # Without an allowed noise level, photon shooting is not considered.
+    costs = star.estimateDrawCosts(dx=dx)
+    np.testing.assert_equal(costs.keys(), ['fft'])
+
+    # A faint galaxy is faster to shoot with few photons than to draw by FFT.
+    gal = galsim.Convolve([galsim.Sersic(n=1.5, half_light_radius=1.2, flux=100), psf, pix])
+    costs = gal.estimateDrawCosts(dx=dx, max_extra_noise=1.)
+    assert costs['phot'] < costs['fft']
+    rng = galsim.UniformDeviate(1234)
+    im3 = gal.draw(dx=dx, method='auto', rng=rng, max_extra_noise=1.)
+    # The flux has Poisson noise of 10%, so this is a 5 sigma test.
+    assert abs(im3.added_flux/100. - 1.) < 0.5
+
+    # Two components with hard edges can be drawn by real-space convolution.
+    trunc = galsim.Moffat(beta=3.5, fwhm=0.9, trunc=2.)
+    conv = galsim.Convolve([trunc, pix], real_space=False)
+    costs = conv.estimateDrawCosts(dx=dx)
+    assert 'real_space' in costs
+    im4 = conv.draw(dx=dx, method='real_space')
+    im5 = galsim.Convolve([trunc, pix], real_space=True).draw(dx=dx)
+    np.testing.assert_array_almost_equal(
+        im4.array, im5.array, 10, "draw(method='real_space') gave a different image")
+
+    # Changing a component after making the Convolve shouldn't change how the Convolve is drawn.
+    trunc2 = trunc.copy()
+    conv2 = galsim.Convolve([trunc2, pix], real_space=False)
+    trunc2.applyShear(g1=0.3, g2=0.1)
+    im6 = conv2.draw(dx=dx, method='real_space')
+    np.testing.assert_array_almost_equal(
+        im6.array, im5.array, 10, "Changing a component changed the drawn Convolve")
+
+    # Objects that are analytic in real space can also be drawn with an FFT.
+    gauss = galsim.Gaussian(sigma=1., flux=test_flux)
+    costs = gauss.estimateDrawCosts(dx=dx)
+    np.testing.assert_equal(sorted(costs.keys()), ['fft', 'real_space'])
+    im7 = gauss.draw(dx=dx, method='fft')
+    im8 = gauss.draw(dx=dx)
+    np.testing.assert_array_almost_equal(
+        im7.array, im8.array, 5, "draw(method='fft') of a Gaussian gave a different image")
+
+    np.testing.assert_raises(ValueError, psf.draw, dx=dx, method='invalid')
+    np.testing.assert_raises(ValueError, psf.draw, dx=dx, method='phot')
+
+    # If the FFT would be too large and there is no other way to draw it, we get a ValueError.
+    huge = galsim.Convolve([galsim.Sersic(n=4, half_light_radius=10.), psf,
+                            galsim.Exponential(half_light_radius=5.)])
+    np.testing.assert_raises(ValueError, huge.draw, galsim.ImageF(32,32), dx=1.e-3,
+                             method='auto')
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+def test_draw_footprint():
+    """Test that drawing a compact profile onto a large image only fills in its footprint.
+    """
+    import time
+    t1 = time.time()
+
+    dx = 0.2
+    gal = galsim.Gaussian(sigma=1., flux=test_flux)
+    gal.applyShear(g1=0.3, g2=-0.2)
+    gal.applyShift(30., -40.)
+    assert gal.isAnalyticX()
+
+    # A large image where most of the pixels are far from the profile.
+    big = galsim.ImageD(1001,1001)
+    gal.draw(big, dx=dx)
+    np.testing.assert_almost_equal(
+        big.added_flux/test_flux, 1., 5, "Drawing onto a large image lost flux")
+
+    # Check the pixel values against xValue near the profile and far away from it.
+    # The image is centered at 0, so pixel (i,j) is at ((i-501)*dx, (j-501)*dx).
+    for x, y in [ (30., -40.), (31., -39.4), (28.2, -41.), (0., 0.), (-50., 60.) ]:
+        i = int(round(x/dx)) + 501
+        j = int(round(y/dx)) + 501
+        np.testing.assert_almost_equal(
+            big(i,j), gal.xValue(galsim.PositionD((i-501)*dx, (j-501)*dx)) * dx**2, 10,
+            "Drawing onto a large image gave the wrong value at (%f,%f)"%(x,y))
+
+    # Nothing should be drawn when the footprint misses the image entirely.
+    small = galsim.ImageD(11,11)
+    gal.draw(small, dx=dx)
+    np.testing.assert_equal(small.added_flux, 0.)
+    np.testing.assert_equal(small.array.sum(), 0.)
+
+    # An integer-pixel shift without a shear keeps the profile's center of symmetry on a pixel,
+    # even though the footprint doesn't include the origin.  Check that the shifted profile
+    # matches the unshifted one drawn centered on the image, offset by (150,-200) pixels.
+    gal = galsim.Gaussian(sigma=1., flux=test_flux)
+    shifted = gal.createShifted(30., -40.)
+    im1 = galsim.ImageD(1001,1001)
+    shifted.draw(im1, dx=dx)
+    im2 = galsim.ImageD(1001,1001)
+    gal.draw(im2, dx=dx)
+    np.testing.assert_almost_equal(
+        im1.added_flux, im2.added_flux, 10, "Drawing an integer-shifted profile lost flux")
+    np.testing.assert_array_almost_equal(
+        im1.array[:801,150:], im2.array[200:,:851], 12,
+        "Drawing an integer-shifted profile gave the wrong image")
+    np.testing.assert_equal(im1.array[801:,:].sum(), 0.)
+    np.testing.assert_equal(im1.array[:,:150].sum(), 0.)
+
+    # A long-tailed profile should be drawn all the way to the edges of a large image, the same
+    # as if every pixel were evaluated.
+    moffat = galsim.Moffat(beta=2, scale_radius=0.5, flux=test_flux)
+    assert moffat.isAnalyticX()
+    dx = 0.5
+    big = galsim.ImageD(201,201)
+    moffat.draw(big, dx=dx)
+    for k in range(1,202,10):
+        for i, j in [ (k,1), (k,201), (1,k), (201,k), (k,k) ]:
+            expected = moffat.xValue(galsim.PositionD((i-101)*dx, (j-101)*dx)) * dx**2
+            np.testing.assert_almost_equal(
+                big(i,j)/expected, 1., 10,
+                "Drawing a long-tailed profile gave the wrong value at pixel (%d,%d)"%(i,j))
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+
+def test_value_arrays():
+    """Test xValue and kValue with arrays of positions.
+    """
+    import time
+    t1 = time.time()
+
+    gal1 = galsim.Gaussian(sigma=1.7, flux=test_flux)
+    gal2 = galsim.Exponential(half_light_radius=1.2, flux=test_flux)
+    gal2.applyShear(g1=0.2, g2=-0.1)
+    gal2.applyShift(0.3, -0.5)
+
+    # Scattered positions don't form a grid, so these use the per-point calculation.
+    ud = galsim.UniformDeviate(1234)
+    x = np.array([ 6.*ud()-3. for i in range(30) ])
+    y = np.array([ 6.*ud()-3. for i in range(30) ])
+    # A meshgrid is evaluated with fillXValue and fillKValue.
+    xx, yy = np.meshgrid(np.linspace(-3.,3.,13), np.linspace(-2.,4.,9))
+
+    for gal in [gal1, gal2]:
+        for px, py in [ (x, y), (xx, yy), (xx.T, yy.T), (list(x), list(y)) ]:
+            px = np.asarray(px)
+            py = np.asarray(py)
+            xval = gal.xValue(px, py)
+            np.testing.assert_equal(xval.shape, px.shape)
+            xval_check = np.array([ gal.xValue(galsim.PositionD(px.flat[i], py.flat[i]))
+                                    for i in range(px.size) ]).reshape(px.shape)
+            np.testing.assert_array_almost_equal(
+                xval, xval_check, 10, "xValue with arrays disagrees with single xValue calls")
+
+            kval = gal.kValue(px, py)
+            np.testing.assert_equal(kval.shape, px.shape)
+            kval_check = np.array([ gal.kValue(galsim.PositionD(px.flat[i], py.flat[i]))
+                                    for i in range(px.size) ]).reshape(px.shape)
+            np.testing.assert_array_almost_equal(
+                kval, kval_check, 10, "kValue with arrays disagrees with single kValue calls")
+
+        # Scalars still give scalars.
+        np.testing.assert_almost_equal(
+            gal.xValue(0.7, -0.2), gal.xValue(galsim.PositionD(0.7, -0.2)), 12)
+
+    # Integer shifts keep the profile's center of symmetry on the grid points, if the grid
+    # includes it.  Check grids that don't include 0, where it is only sometimes on the grid.
+    xx, yy = np.meshgrid(np.arange(0.5,4.75,0.5), np.arange(0.5,4.75,0.5))
+    for shift in [ (1.,0.), (1.,2.), (3.,-1.), (6.,1.), (0.,0.) ]:
+        gal = galsim.Gaussian(sigma=1., flux=test_flux).createShifted(*shift)
+        xval = gal.xValue(xx, yy)
+        xval_check = np.array([ gal.xValue(galsim.PositionD(xx.flat[i], yy.flat[i]))
+                                for i in range(xx.size) ]).reshape(xx.shape)
+        np.testing.assert_array_almost_equal(
+            xval, xval_check, 10,
+            "xValue with arrays disagrees with single xValue calls for shift %s"%str(shift))
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+
+def test_fft_precision():
+    """Test that single-precision FFTs are accurate to the documented level.
+    """
+    import time
+    t1 = time.time()
+
+    obj = galsim.Convolve([galsim.Sersic(n=1.5, half_light_radius=1.2, flux=test_flux),
+                           galsim.Moffat(beta=3.5, fwhm=0.9), galsim.Pixel(xw=0.2)])
+    im1 = obj.draw(dx=0.2)
+    interp = galsim.InterpolatedImage(im1, dx=0.2)
+    re1, im1k = interp.drawK(dk=0.5)
+
+    np.testing.assert_equal(galsim.getFFTPrecision(), 'double')
+    np.testing.assert_raises(RuntimeError, galsim.setFFTPrecision, 'invalid')
+    galsim.setFFTPrecision('float')
+    try:
+        # If GalSim was compiled without libfftw3f, this stays at double.
+        assert galsim.getFFTPrecision() in ['float', 'double']
+        im2 = obj.draw(dx=0.2)
+        interp = galsim.InterpolatedImage(im1, dx=0.2)
+        re2, im2k = interp.drawK(dk=0.5)
+    finally:
+        galsim.setFFTPrecision('double')
+    np.testing.assert_equal(galsim.getFFTPrecision(), 'double')
+
+    peak = im1.array.max()
+    np.testing.assert_array_almost_equal(
+        im2.array/peak, im1.array/peak, 5, "Drawing with float FFTs is not accurate enough")
+    np.testing.assert_almost_equal(
+        im2.array.sum()/test_flux, im1.array.sum()/test_flux, 5,
+        "Drawing with float FFTs gave the wrong flux")
+    kpeak = re1.array.max()
+    np.testing.assert_array_almost_equal(
+        re2.array/kpeak, re1.array/kpeak, 5, "InterpolatedImage with float FFTs is not accurate")
+    np.testing.assert_array_almost_equal(
+        im2k.array/kpeak, im1k.array/kpeak, 5, "InterpolatedImage with float FFTs is not accurate")
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+
+def test_photon_array():
+    """Test the NumPy access to PhotonArray and adding photons to an image.
+    """
+    import time
+    t1 = time.time()
+
+    gal = galsim.Gaussian(sigma=1.3, flux=test_flux)
+    ud = galsim.UniformDeviate(1234)
+    pa = gal.SBProfile.shoot(1000, ud)
+    np.testing.assert_equal(len(pa), 1000)
+    x = pa.x
+    y = pa.y
+    flux = pa.flux
+    np.testing.assert_array_equal(x, [ pa.getX(i) for i in range(len(pa)) ])
+    np.testing.assert_array_equal(y, [ pa.getY(i) for i in range(len(pa)) ])
+    np.testing.assert_array_equal(flux, [ pa.getFlux(i) for i in range(len(pa)) ])
+    np.testing.assert_almost_equal(flux.sum(), pa.getTotalFlux(), 10)
+
+    # The arrays share memory with the PhotonArray, so they can be modified in place.
+    x += 0.7
+    np.testing.assert_equal(pa.getX(17), x[17])
+    pa.scaleFlux(2.)
+    np.testing.assert_equal(flux[17], pa.getFlux(17))
+
+    # Check addTo against a direct binning of the photons with NumPy.
+    dx = 0.5
+    im = galsim.ImageD(9,11)
+    im.setScale(dx)
+    im.setCenter(0,0)
+    added_flux = pa.addTo(im.view())
+    ix = np.floor(x/dx + 0.5).astype(int)
+    iy = np.floor(y/dx + 0.5).astype(int)
+    inside = (ix >= -4) & (ix <= 4) & (iy >= -5) & (iy <= 5)
+    np.testing.assert_almost_equal(added_flux, flux[inside].sum(), 10)
+    expected = np.zeros((11,9))
+    for i in np.where(inside)[0]:
+        expected[iy[i]+5, ix[i]+4] += flux[i] / dx**2
+    np.testing.assert_array_almost_equal(im.array, expected, 10)
+
+    # A PhotonArray can be made from NumPy arrays, and resized.
+    pa2 = galsim.PhotonArray(x, y, flux)
+    np.testing.assert_array_equal(pa2.x, x)
+    np.testing.assert_array_equal(pa2.flux, flux)
+    pa2.resize(10)
+    np.testing.assert_equal(len(pa2), 10)
+    np.testing.assert_array_equal(pa2.y, y[:10])
+
+    # But not while there is a view of its memory, since that could reallocate the memory.
+    y2 = pa2.y
+    np.testing.assert_raises(RuntimeError, pa2.resize, 20)
+    np.testing.assert_raises(RuntimeError, pa2.reserve, 20)
+    np.testing.assert_raises(RuntimeError, pa2.append, pa)
+    del y2
+    pa2.resize(20)
+    np.testing.assert_equal(len(pa2), 20)
+
+    # A large image with many photons takes the row-bucketed path, which gives the same result.
+    pa = gal.SBProfile.shoot(200000, ud)
+    pa.scaleXY(300.)
+    big = galsim.ImageD(1200,1200)
+    big.setScale(1.)
+    big.setCenter(0,0)
+    added_flux = pa.addTo(big.view())
+    ix = np.floor(pa.x + 0.5).astype(int)
+    iy = np.floor(pa.y + 0.5).astype(int)
+    inside = (ix >= -600) & (ix <= 599) & (iy >= -600) & (iy <= 599)
+    np.testing.assert_almost_equal(added_flux/test_flux, pa.flux[inside].sum()/test_flux, 10)
+    index = (iy[inside]+600) * 1200 + ix[inside]+600
+    expected = np.bincount(index, weights=pa.flux[inside], minlength=1200*1200)
+    np.testing.assert_array_almost_equal(big.array.flatten(), expected, 10)
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+
+def test_shoot_chunks():
+    """Test that drawShoot gives the right flux for any chunk size.
+    """
+    import time
+    t1 = time.time()
+
+    chunk_size = galsim.getShootChunkSize()
+    np.testing.assert_raises(RuntimeError, galsim.setShootChunkSize, 0)
+    np.testing.assert_equal(galsim.getShootChunkSize(), chunk_size)
+
+    conv = galsim.Convolve([galsim.Gaussian(sigma=1.3), galsim.Exponential(scale_radius=0.7)])
+    conv.setFlux(test_flux)
+    try:
+        galsim.setShootChunkSize(1000)
+        np.testing.assert_equal(galsim.getShootChunkSize(), 1000)
+        # The same seed gives the same image.
+        im1 = conv.drawShoot(galsim.ImageD(200,200), dx=0.5, n_photons=20000,
+                             poisson_flux=False, rng=galsim.UniformDeviate(1234))
+        im2 = conv.drawShoot(galsim.ImageD(200,200), dx=0.5, n_photons=20000,
+                             poisson_flux=False, rng=galsim.UniformDeviate(1234))
+        np.testing.assert_array_equal(im1.array, im2.array)
+        np.testing.assert_almost_equal(im1.array.sum()*0.25/test_flux, 1., 8)
+
+        # A non-integer number of photons, or gain != 1, rescales the photons as they are added.
+        im3 = conv.drawShoot(galsim.ImageD(200,200), dx=0.5, n_photons=20000.4, gain=2.,
+                             poisson_flux=False, rng=galsim.UniformDeviate(1234))
+        np.testing.assert_almost_equal(im3.array.sum()*0.25*2./test_flux, 1., 8)
+
+        # With max_extra_noise, the number of photons is only known at the end.
+        gal = galsim.Gaussian(sigma=1.3, flux=1.e5)
+        im4 = gal.drawShoot(galsim.ImageD(200,200), dx=0.5, max_extra_noise=10.,
+                            poisson_flux=False, rng=galsim.UniformDeviate(1234))
+        np.testing.assert_almost_equal(im4.array.sum()*0.25/1.e5, 1., 8)
+    finally:
+        galsim.setShootChunkSize(chunk_size)
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+
+def test_shoot_threads():
+    """Test that drawShoot with several threads is reproducible and gives the right flux.
+    """
+    import time
+    t1 = time.time()
+
+    conv = galsim.Convolve([galsim.Gaussian(sigma=1.3), galsim.Exponential(scale_radius=0.7)])
+    conv.setFlux(test_flux)
+    chunk_size = galsim.getShootChunkSize()
+    try:
+        # Use small chunks so each thread gets several of them.
+        galsim.setShootChunkSize(1000)
+        im1 = conv.drawShoot(galsim.ImageD(200,200), dx=0.5, n_photons=20000.4,
+                             rng=galsim.UniformDeviate(1234), n_threads=4)
+        im2 = conv.drawShoot(galsim.ImageD(200,200), dx=0.5, n_photons=20000.4,
+                             rng=galsim.UniformDeviate(1234), n_threads=4)
+        np.testing.assert_array_equal(im1.array, im2.array)
+        np.testing.assert_almost_equal(im1.array.sum()*0.25/test_flux, 1., 8)
+        np.testing.assert_almost_equal(im1.added_flux/test_flux, 1., 8)
+
+        # A different number of threads gives a different realization with the same flux.
+        im3 = conv.drawShoot(galsim.ImageF(200,200), dx=0.5, n_photons=20000, gain=2.,
+                             rng=galsim.UniformDeviate(1234), n_threads=3)
+        assert np.any(im3.array != im1.array)
+        np.testing.assert_almost_equal(im3.array.sum()*0.25*2./test_flux, 1., 5)
+
+        # More threads than chunks is fine too.
+        im4 = conv.drawShoot(galsim.ImageD(200,200), dx=0.5, n_photons=2500,
+                             rng=galsim.UniformDeviate(1234), n_threads=8)
+        np.testing.assert_almost_equal(im4.array.sum()*0.25/test_flux, 1., 8)
+    finally:
+        galsim.setShootChunkSize(chunk_size)
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+
+def test_sersic_shoot():
+    """Test the photons shot from an n=4 Sersic profile.
+    """
+    import time
+    t1 = time.time()
+
+    hlr = 1.7
+    sersic = galsim.Sersic(n=4, half_light_radius=hlr, flux=test_flux)
+    ud = galsim.UniformDeviate(1234)
+    nphot = 200000
+    pa = sersic.SBProfile.shoot(nphot, ud)
+    np.testing.assert_almost_equal(pa.getTotalFlux()/test_flux, 1., 2)
+    # The photons are not rejected, so their fluxes vary a bit, but not by much.
+    flux = pa.flux * nphot / test_flux
+    assert np.all(flux > 0.5) and np.all(flux < 1.5)
+    # Half of the flux should be within the half-light radius.
+    r = np.sqrt(pa.x**2 + pa.y**2)
+    np.testing.assert_almost_equal(pa.flux[r < hlr].sum()/test_flux, 0.5, 2)
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
 
 if __name__ == "__main__":
     test_gaussian()
@@ -2279,3 +2818,15 @@ if __name__ == "__main__":
     test_rescale()
     test_sbinterpolatedimage()
     test_draw()
+    test_draw_batch()
+    test_draw_threads()
+    test_fft_threads()
+    test_fft_plans()
+    test_draw_auto()
+    test_draw_footprint()
+    test_value_arrays()
+    test_fft_precision()
+    test_photon_array()
+    test_shoot_chunks()
+    test_shoot_threads()
+    test_sersic_shoot()
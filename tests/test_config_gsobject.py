@@ -947,6 +947,68 @@ def test_ring():
     t2 = time.time()
     print 'time for %s = %.2f'%(funcname(),t2-t1)
 
+def test_cost_estimate():
+    """Test the cost estimates used to divide up the work among multiple processes
+    """
+    import time
+    t1 = time.time()
+
+    config = {
+        'gal1' : { 'type' : 'Gaussian', 'sigma' : 2 },
+        'gal2' : { 'type' : 'Convolve',
+                   'items' : [ { 'type' : 'Gaussian', 'sigma' : 2 },
+                               { 'type' : 'Sersic', 'n' : 4, 'half_light_radius' : 1 } ] },
+        'gal3' : { 'type' : 'List',
+                   'items' : [ { 'type' : 'Gaussian', 'sigma' : 2 },
+                               { 'type' : 'RealGalaxy', 'index' : 3 } ] },
+        'seq_index' : 0
+    }
+
+    cost1 = galsim.config.EstimateGSObjectCost(config, 'gal1', config)
+    cost2 = galsim.config.EstimateGSObjectCost(config, 'gal2', config)
+    np.testing.assert_equal(cost1, galsim.config.gsobject_costs['Gaussian'])
+    np.testing.assert_equal(cost2, cost1 + galsim.config.gsobject_costs['DeVaucouleurs'])
+    np.testing.assert_equal(galsim.config.EstimateGSObjectCost(config, 'gal4', config), 0.)
+
+    # Compound objects should cost more than their simplest component.
+    config['gal5'] = { 'type' : 'Convolve',
+                       'items' : [ { 'type' : 'Sersic', 'n' : 2, 'half_light_radius' : 1 },
+                                   { 'type' : 'Sersic', 'n' : 3, 'half_light_radius' : 2 } ] }
+    cost5 = galsim.config.EstimateGSObjectCost(config, 'gal5', config)
+    assert cost5 > cost1
+    np.testing.assert_equal(cost5, 25.)
+
+    # EstimateStampCost shouldn't change seq_index in the config.
+    stamp_config = { 'gal' : config['gal5'], 'psf' : config['gal1'], 'seq_index' : 7 }
+    np.testing.assert_equal(galsim.config.EstimateStampCost(stamp_config, 3), 26.)
+    np.testing.assert_equal(stamp_config['seq_index'], 7)
+
+    # The default index for a List cycles through the items.
+    costs = []
+    for k in range(4):
+        config['seq_index'] = k
+        costs.append(galsim.config.EstimateGSObjectCost(config, 'gal3', config))
+    np.testing.assert_equal(costs, [1., 100., 1., 100.])
+
+    # The chunks should cover all the items in order, getting smaller towards the end.
+    costs = [ 1. ] * 1000
+    chunks = galsim.config.MakeTaskChunks(costs, 4)
+    np.testing.assert_equal(chunks[0], (0, 125))
+    np.testing.assert_equal(chunks[-1][1], 1)
+    np.testing.assert_equal(sum([ n for (k,n) in chunks ]), 1000)
+    for i in range(1,len(chunks)):
+        np.testing.assert_equal(chunks[i][0], chunks[i-1][0] + chunks[i-1][1])
+        assert chunks[i][1] <= chunks[i-1][1]
+
+    # With min_size, all the chunks should be a multiple of it.
+    chunks = galsim.config.MakeTaskChunks(costs, 4, min_size=20)
+    for (k,n) in chunks:
+        np.testing.assert_equal(k % 20, 0)
+        np.testing.assert_equal(n % 20, 0)
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
 
 if __name__ == "__main__":
     test_gaussian()
@@ -964,5 +1026,4 @@ if __name__ == "__main__":
     test_convolve()
     test_list()
     test_ring()
-
-
+    test_cost_estimate()
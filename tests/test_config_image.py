@@ -0,0 +1,169 @@
+# Copyright 2012, 2013 The GalSim developers:
+# https://github.com/GalSim-developers
+#
+# This file is part of GalSim: The modular galaxy image simulation toolkit.
+#
+# GalSim is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GalSim is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GalSim.  If not, see <http://www.gnu.org/licenses/>
+#
+
+import numpy as np
+import os
+import sys
+
+try:
+    import galsim
+except ImportError:
+    path, filename = os.path.split(__file__)
+    sys.path.append(os.path.abspath(os.path.join(path, "..")))
+    import galsim
+
+def funcname():
+    import inspect
+    return inspect.stack()[1][3]
+
+
+def test_canvas():
+    """Test that the stream, shared_canvas and canvas_dir options make the same images as the
+    usual way of building Tiled and Scattered images.
+    """
+    import copy
+    import shutil
+    import tempfile
+    import time
+    t1 = time.time()
+
+    base_config = {
+        'psf' : { 'type' : 'Moffat', 'beta' : 3, 'fwhm' : 0.9 },
+        'gal' : { 'type' : 'Exponential', 'flux' : 100,
+                  'half_light_radius' : { 'type' : 'Random', 'min' : 0.5, 'max' : 1.5 } }
+    }
+    image_configs = [
+        { 'type' : 'Tiled', 'nx_tiles' : 4, 'ny_tiles' : 3, 'stamp_size' : 24, 'border' : 2 },
+        # Here the stamps overlap, and some of them fall off the edges of the image.
+        { 'type' : 'Scattered', 'nobjects' : 12, 'xsize' : 80, 'ysize' : 60, 'stamp_size' : 24 }
+    ]
+    canvas_dir = tempfile.mkdtemp()
+    try:
+        for image_config in image_configs:
+            images = []
+            for options in [ {}, { 'stream' : True }, { 'shared_canvas' : True },
+                             { 'canvas_dir' : canvas_dir } ]:
+                config = copy.deepcopy(base_config)
+                config['image'] = copy.deepcopy(image_config)
+                config['image'].update(options)
+                config['image']['pixel_scale'] = 0.3
+                config['image']['nproc'] = 2
+                config['image']['random_seed'] = 1234
+                config['image']['noise'] = { 'type' : 'Gaussian', 'sigma' : 0.5 }
+                images.append(galsim.config.BuildImage(config, make_psf_image=True))
+
+                # The file for the canvas should have been removed.
+                np.testing.assert_equal(os.listdir(canvas_dir), [])
+
+            for im, option in zip(images[1:], ['stream', 'shared_canvas', 'canvas_dir']):
+                if image_config['type'] == 'Tiled':
+                    # The tiles don't overlap, so the images should be identical.
+                    np.testing.assert_array_equal(
+                        im[0].array, images[0][0].array,
+                        "Tiled image with %s differs from the default"%option)
+                    np.testing.assert_array_equal(
+                        im[1].array, images[0][1].array,
+                        "Tiled psf image with %s differs from the default"%option)
+                else:
+                    # Where three or more stamps overlap, the order of the sums can differ, so
+                    # only check to float precision.
+                    scale = images[0][0].array.max()
+                    np.testing.assert_array_almost_equal(
+                        im[0].array / scale, images[0][0].array / scale, 6,
+                        "Scattered image with %s differs from the default"%option)
+                    scale = images[0][1].array.max()
+                    np.testing.assert_array_almost_equal(
+                        im[1].array / scale, images[0][1].array / scale, 6,
+                        "Scattered psf image with %s differs from the default"%option)
+    finally:
+        shutil.rmtree(canvas_dir)
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+
+def test_psf_pix():
+    """Test that the convolution of the psf and pix is reused for each object while they stay
+    the same, and rebuilt when either of them changes.
+    """
+    import copy
+    import time
+    t1 = time.time()
+
+    base_config = {
+        'psf' : { 'type' : 'Moffat', 'beta' : 3, 'fwhm' : 0.9 },
+        'gal' : { 'type' : 'Exponential', 'flux' : 100,
+                  'half_light_radius' : { 'type' : 'Random', 'min' : 0.5, 'max' : 1.5 } },
+        'image' : { 'size' : 32, 'pixel_scale' : 0.3, 'random_seed' : 1234 }
+    }
+    config = copy.deepcopy(base_config)
+
+    def build(obj_num):
+        # Check the images against ones built from scratch, without the cached psf_pix.
+        ref_config = copy.deepcopy(base_config)
+        im, psf_im = galsim.config.BuildImage(config, obj_num=obj_num, make_psf_image=True)[:2]
+        ref_im, ref_psf_im = galsim.config.BuildImage(ref_config, obj_num=obj_num,
+                                                       make_psf_image=True)[:2]
+        np.testing.assert_array_equal(im.array, ref_im.array,
+                                      "Image %d differs with the cached psf_pix"%obj_num)
+        np.testing.assert_array_equal(psf_im.array, ref_psf_im.array,
+                                      "PSF image %d differs with the cached psf_pix"%obj_num)
+        # The stamp uses real_space=False, and the psf image uses real_space=None.
+        return config['psf_pix'][False][2], config['psf_pix'][None][2]
+
+    # The psf and pix are the same for every object, so psf_pix should be reused.
+    psf_pix = build(0)
+    for obj_num in range(1,4):
+        psf_pix1 = build(obj_num)
+        assert psf_pix1[0] is psf_pix[0]
+        assert psf_pix1[1] is psf_pix[1]
+
+    # Change the psf.  Then it should be rebuilt once and reused after that.
+    base_config['psf']['fwhm'] = 1.2
+    config['psf'] = copy.deepcopy(base_config['psf'])
+    psf_pix2 = build(4)
+    assert psf_pix2[0] is not psf_pix[0]
+    assert psf_pix2[1] is not psf_pix[1]
+    assert build(5)[0] is psf_pix2[0]
+
+    # Likewise for the pix.
+    base_config['pix'] = { 'type' : 'Pixel', 'xw' : 0.3, 'yw' : 0.4 }
+    config['pix'] = copy.deepcopy(base_config['pix'])
+    psf_pix3 = build(6)
+    assert psf_pix3[0] is not psf_pix2[0]
+    assert psf_pix3[1] is not psf_pix2[1]
+    assert build(7)[0] is psf_pix3[0]
+
+    # A psf that is different for each object needs a new psf_pix each time.
+    base_config['psf']['fwhm'] = { 'type' : 'Random', 'min' : 0.8, 'max' : 1.2 }
+    config['psf'] = copy.deepcopy(base_config['psf'])
+    last = build(8)
+    for obj_num in range(9,12):
+        psf_pix = build(obj_num)
+        assert psf_pix[0] is not last[0]
+        assert psf_pix[1] is not last[1]
+        last = psf_pix
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+
+if __name__ == "__main__":
+    test_canvas()
+    test_psf_pix()
@@ -0,0 +1,305 @@
+# Copyright 2012, 2013 The GalSim developers:
+# https://github.com/GalSim-developers
+#
+# This file is part of GalSim: The modular galaxy image simulation toolkit.
+#
+# GalSim is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# GalSim is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GalSim.  If not, see <http://www.gnu.org/licenses/>
+#
+
+import numpy as np
+import os
+import sys
+
+try:
+    import galsim
+except ImportError:
+    path, filename = os.path.split(__file__)
+    sys.path.append(os.path.abspath(os.path.join(path, "..")))
+    import galsim
+
+def funcname():
+    import inspect
+    return inspect.stack()[1][3]
+
+def make_config(dir, root, nfiles):
+    """Make a config dict for a small run of nfiles files in dir, named root_0.fits, etc.
+    """
+    return {
+        'root' : os.path.join(dir, root),
+        'psf' : { 'type' : 'Moffat', 'beta' : 3, 'fwhm' : 0.9 },
+        'gal' : { 'type' : 'Exponential', 'flux' : 100,
+                  'half_light_radius' : { 'type' : 'Random', 'min' : 0.5, 'max' : 1.5 } },
+        'image' : { 'size' : 32, 'pixel_scale' : 0.3, 'random_seed' : 1234,
+                    'noise' : { 'type' : 'Gaussian', 'sigma' : 0.5 } },
+        'output' : { 'type' : 'Fits', 'nfiles' : nfiles, 'dir' : dir,
+                     'file_name' : { 'type' : 'NumberedFile', 'root' : root + '_',
+                                     'ext' : '.fits' } }
+    }
+
+def read_bytes(file_name):
+    fin = open(file_name, 'rb')
+    try:
+        return fin.read()
+    finally:
+        fin.close()
+
+
+def test_resume():
+    """Test that output.resume skips the files that were completed by a previous run, and
+    rebuilds any that are missing or have changed.
+    """
+    import copy
+    import shutil
+    import tempfile
+    import time
+    t1 = time.time()
+
+    dir = tempfile.mkdtemp()
+    try:
+        config = make_config(dir, 'resume', 3)
+        config['output']['resume'] = True
+        file_names = [ os.path.join(dir, 'resume_%d.fits'%k) for k in range(3) ]
+        manifest_file = os.path.join(dir, 'resume.manifest')
+
+        galsim.config.Process(copy.deepcopy(config))
+        checksums = galsim.config.process._ReadManifest(manifest_file)
+        np.testing.assert_equal(sorted(checksums.keys()), file_names)
+        orig_bytes = [ read_bytes(file_name) for file_name in file_names ]
+
+        # Mark the first file with an old modification time, so we can tell that it wasn't
+        # written again.  Change the second file, and remove the third.
+        os.utime(file_names[0], (0,0))
+        fout = open(file_names[1], 'ab')
+        fout.write('junk')
+        fout.close()
+        os.remove(file_names[2])
+
+        galsim.config.Process(copy.deepcopy(config))
+        np.testing.assert_equal(os.path.getmtime(file_names[0]), 0,
+                                "Resumed run rebuilt a file that was already done")
+        for k in range(3):
+            np.testing.assert_equal(read_bytes(file_names[k]), orig_bytes[k],
+                                    "Resumed run didn't rebuild %s correctly"%file_names[k])
+        checksums = galsim.config.process._ReadManifest(manifest_file)
+        for file_name in file_names:
+            np.testing.assert_equal(checksums[file_name],
+                                    galsim.config.process._FileChecksum(file_name))
+    finally:
+        shutil.rmtree(dir)
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+
+def test_shards():
+    """Test that the shards of a run build disjoint sets of files, which together are the same
+    as the files from a single run.
+    """
+    import copy
+    import shutil
+    import tempfile
+    import time
+    t1 = time.time()
+
+    nfiles = 7
+    nshards = 3
+    dir = tempfile.mkdtemp()
+    try:
+        config = make_config(dir, 'all', nfiles)
+        galsim.config.Process(copy.deepcopy(config))
+
+        shard_files = []
+        for shard in range(nshards):
+            before = set(os.listdir(dir))
+            config = make_config(dir, 'shard', nfiles)
+            config['output']['nshards'] = nshards
+            config['output']['shard'] = shard
+            galsim.config.Process(copy.deepcopy(config))
+            new_files = set(os.listdir(dir)) - before
+            assert len(new_files) > 0, "Shard %d didn't build any files"%shard
+            for files in shard_files:
+                assert not (files & new_files), "Shard %d overlaps an earlier shard"%shard
+            shard_files.append(new_files)
+
+        all_shard_files = set.union(*shard_files)
+        np.testing.assert_equal(sorted(all_shard_files),
+                                sorted([ 'shard_%d.fits'%k for k in range(nfiles) ]))
+        for k in range(nfiles):
+            np.testing.assert_equal(
+                read_bytes(os.path.join(dir, 'shard_%d.fits'%k)),
+                read_bytes(os.path.join(dir, 'all_%d.fits'%k)),
+                "File %d from the shards differs from the unsharded run"%k)
+    finally:
+        shutil.rmtree(dir)
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+
+def test_pool_reuse():
+    """Test that a WorkerPool is reused by successive calls to Process, and that the worker
+    processes don't reuse the input objects from an earlier call.
+    """
+    import shutil
+    import tempfile
+    import time
+    t1 = time.time()
+
+    dir = tempfile.mkdtemp()
+    pool = galsim.config.AcquireWorkerPool(2)
+    try:
+        pids = [ p.pid for p in pool.p_list ]
+        cat_file = os.path.join(dir, 'reuse_cat.txt')
+        for flux in [ 100., 300. ]:
+            # The catalog file has the same name each time, but different fluxes.
+            fout = open(cat_file, 'w')
+            fout.write('%f 1\n%f 2\n'%(flux,flux))
+            fout.close()
+
+            config = make_config(dir, 'reuse', 2)
+            del config['image']['noise']
+            config['input'] = { 'catalog' : { 'file_name' : cat_file } }
+            config['gal']['flux'] = { 'type' : 'InputCatalog', 'col' : 0 }
+            config['output']['nproc'] = 2
+            galsim.config.Process(config)
+
+            assert galsim.config.process._worker_pool is pool
+            np.testing.assert_equal([ p.pid for p in pool.p_list ], pids,
+                                    "Process didn't reuse the worker processes")
+            for k in range(2):
+                im = galsim.fits.read(os.path.join(dir, 'reuse_%d.fits'%k))
+                np.testing.assert_almost_equal(
+                    im.array.sum() / flux, 1., 1,
+                    "File %d was built with the input catalog from an earlier run"%k)
+    finally:
+        galsim.config.ReleaseWorkerPool()
+        shutil.rmtree(dir)
+    np.testing.assert_equal(pool.p_list, [])
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+
+def _make_array(n):
+    """A task for test_pool_error.  The results are large, so they fill up the done queue.
+    """
+    if n == 2:
+        raise ValueError("Task %d failed"%n)
+    return np.zeros(1000000) + n
+
+def test_pool_error():
+    """Test that a WorkerPool can still be used, and closed, after a task raises an exception.
+    """
+    import time
+    t1 = time.time()
+
+    pool = galsim.config.AcquireWorkerPool(2)
+    try:
+        tasks = [ (_make_array, { 'n' : n }, n) for n in range(8) ]
+        try:
+            for result, info, proc in pool.run(tasks):
+                pass
+        except RuntimeError:
+            pass
+        else:
+            assert False, "The exception in task 2 wasn't raised"
+
+        # None of the results from the failed run should turn up here.
+        tasks = [ (_make_array, { 'n' : n }, n) for n in range(3,6) ]
+        results = sorted([ (info, result[0]) for result, info, proc in pool.run(tasks) ])
+        np.testing.assert_equal(results, [ (3,3.), (4,4.), (5,5.) ])
+
+        # Stop reading the results part way through a run.  The next run shouldn't get the
+        # rest of them, and close() should still finish.
+        for result, info, proc in pool.run(tasks):
+            break
+        tasks = [ (_make_array, { 'n' : n }, n) for n in range(6,8) ]
+        results = sorted([ (info, result[0]) for result, info, proc in pool.run(tasks) ])
+        np.testing.assert_equal(results, [ (6,6.), (7,7.) ])
+        for result, info, proc in pool.run(tasks):
+            break
+    finally:
+        galsim.config.ReleaseWorkerPool()
+    np.testing.assert_equal(pool.p_list, [])
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+
+def test_shared_inputs():
+    """Test that the input types that are marked as shared are rebuilt in the worker processes,
+    and the ones that aren't (including ones whose valid_input_types entry doesn't have the
+    shared flag) are sent along with the tasks, and that both give the right images.
+    """
+    import copy
+    import shutil
+    import tempfile
+    import time
+    t1 = time.time()
+
+    dir = tempfile.mkdtemp()
+    # An old style entry, without the shared flag.
+    galsim.config.process.valid_input_types['old_catalog'] = ('InputCatalog', [], True)
+    try:
+        cat_file = os.path.join(dir, 'shared_cat.txt')
+        fluxes = [ 10. * (k+1) for k in range(12) ]
+        fout = open(cat_file, 'w')
+        for flux in fluxes:
+            fout.write('%f %f\n'%(flux, 0.5 + flux/200.))
+        fout.close()
+
+        base_config = {
+            'input' : { 'catalog' : { 'file_name' : cat_file },
+                        'old_catalog' : { 'file_name' : cat_file } },
+            'psf' : { 'type' : 'Moffat', 'beta' : 3, 'fwhm' : 0.9 },
+            'gal' : { 'type' : 'Exponential',
+                      'flux' : { 'type' : 'InputCatalog', 'col' : 0 },
+                      'half_light_radius' : { 'type' : 'InputCatalog', 'col' : 1 } },
+            'image' : { 'type' : 'Tiled', 'nx_tiles' : 4, 'ny_tiles' : 3, 'stamp_size' : 32,
+                        'pixel_scale' : 0.3 }
+        }
+
+        config = copy.deepcopy(base_config)
+        galsim.config.ProcessInput(config)
+        assert galsim.config.process._IsSharedInput('catalog')
+        assert not galsim.config.process._IsSharedInput('old_catalog')
+        shared_config = galsim.config.RemoveSharedInputs(config)
+        assert 'catalog' not in shared_config
+        assert shared_config['old_catalog'] is config['old_catalog']
+
+        images = []
+        for nproc in [ 1, 2 ]:
+            config = copy.deepcopy(base_config)
+            config['image']['nproc'] = nproc
+            galsim.config.ProcessInput(config)
+            images.append(galsim.config.BuildImage(config)[0])
+        np.testing.assert_array_equal(images[1].array, images[0].array,
+                                      "Image built with nproc=2 differs from nproc=1")
+        # Most of the flux of each galaxy is in its tile.
+        np.testing.assert_almost_equal(images[1].array.sum() / sum(fluxes), 1., 1,
+                                       "Image wasn't built with the catalog fluxes")
+    finally:
+        del galsim.config.process.valid_input_types['old_catalog']
+        shutil.rmtree(dir)
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
+
+if __name__ == "__main__":
+    test_resume()
+    test_shards()
+    test_pool_reuse()
+    test_pool_error()
+    test_shared_inputs()
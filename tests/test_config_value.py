@@ -760,6 +760,56 @@ def test_pos_value():
     t2 = time.time()
     print 'time for %s = %.2f'%(funcname(),t2-t1)
 
+def test_eval_value():
+    """Test various ways to generate a value with an Eval string
+    """
+    import time
+    t1 = time.time()
+
+    config = {
+        'eval1' : { 'type' : 'Eval', 'str' : '800 * 1.e-9 / 4 * 206265' },
+        'eval2' : { 'type' : 'Eval', 'str' : 'math.sqrt(x**2 + 1)', 'fx' : 3 },
+        'eval3' : { 'type' : 'Eval', 'str' : 'pixel_scale * 0.5' },
+        'eval4' : { 'type' : 'Eval', 'str' : '(pos.x**2 + pos.y**2)**0.5' },
+        'eval5' : { 'type' : 'Eval', 'str' : 'r * 2',
+                    'fr' : { 'type' : 'Eval', 'str' : 'pos.x' } },
+        'eval6' : { 'type' : 'Eval', 'str' : 'pos.y', 'ppos' : galsim.PositionD(7,9) },
+        'eval_variables' : { 'fpixel_scale' : 0.44 }
+    }
+
+    # Constant values are safe, and are only evaluated once.
+    for k in range(2):
+        eval1, safe1 = galsim.config.ParseValue(config,'eval1',config, float)
+        np.testing.assert_almost_equal(eval1, 800 * 1.e-9 / 4 * 206265)
+        assert safe1
+        eval2, safe2 = galsim.config.ParseValue(config,'eval2',config, float)
+        np.testing.assert_almost_equal(eval2, math.sqrt(10))
+        assert safe2
+        eval3, safe3 = galsim.config.ParseValue(config,'eval3',config, float)
+        np.testing.assert_almost_equal(eval3, 0.22)
+        assert safe3
+    # After the first time, the dicts are replaced by the values.
+    np.testing.assert_almost_equal(config['eval1'], 800 * 1.e-9 / 4 * 206265)
+    np.testing.assert_almost_equal(config['eval3'], 0.22)
+
+    # Values that use pos change for each object.
+    for k in range(3):
+        config['pos'] = galsim.PositionD(k, 2*k)
+        eval4, safe4 = galsim.config.ParseValue(config,'eval4',config, float)
+        np.testing.assert_almost_equal(eval4, math.sqrt(5) * k)
+        assert not safe4
+        eval5, safe5 = galsim.config.ParseValue(config,'eval5',config, float)
+        np.testing.assert_almost_equal(eval5, 2*k)
+        assert not safe5
+
+    # A user-defined variable takes precedence over the one from the base config.
+    eval6, safe6 = galsim.config.ParseValue(config,'eval6',config, float)
+    np.testing.assert_almost_equal(eval6, 9)
+    assert safe6
+
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
 
 if __name__ == "__main__":
     test_float_value()
@@ -769,5 +819,4 @@ if __name__ == "__main__":
     test_angle_value()
     test_shear_value()
     test_pos_value()
-
-
+    test_eval_value()
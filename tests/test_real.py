@@ -194,6 +194,61 @@ def test_real_galaxy_saved():
     t2 = time.time()
     print 'time for %s = %.2f'%(funcname(),t2-t1)
 
+def test_real_galaxy_cache():
+    """Test that RealGalaxy objects made from cached interpolated images match uncached ones"""
+    import time
+    t1 = time.time()
+    rgc = galsim.RealGalaxyCatalog(catalog_file, image_dir)
+    rg1 = galsim.RealGalaxy(rgc, index = ind_real, flux = fake_gal_flux)
+    assert len(rgc._interpolated_cache) == 1
+    # The second one should use the cached images, and setting a different flux on it should not
+    # change the cached ones.
+    rg2 = galsim.RealGalaxy(rgc, index = ind_real, flux = 2.*fake_gal_flux)
+    rg3 = galsim.RealGalaxy(rgc, index = ind_real, flux = fake_gal_flux)
+    assert len(rgc._interpolated_cache) == 1
+    rg4 = galsim.RealGalaxy(rgc, index = ind_real, flux = fake_gal_flux, use_cache = False)
+
+    for rg in [rg1, rg3]:
+        np.testing.assert_equal(
+            rg.original_image.getFlux(), rg4.original_image.getFlux(),
+            err_msg = "Cached RealGalaxy has the wrong flux")
+    np.testing.assert_almost_equal(
+        rg2.original_image.getFlux(), 2.*fake_gal_flux, 6,
+        err_msg = "Flux of RealGalaxy made from the cache was not set correctly")
+
+    # Photon shooting the cached image repeatedly should give the same result as the uncached one.
+    gal4 = galsim.GSObject(rg4.original_image)
+    im4 = gal4.drawShoot(dx = shera_target_pixel_scale, n_photons = 10000,
+                         rng = galsim.UniformDeviate(1234))
+    for rg in [rg1, rg3, rg1]:
+        gal = galsim.GSObject(rg.original_image)
+        im = galsim.ImageD(im4.bounds)
+        gal.drawShoot(im, dx = shera_target_pixel_scale, n_photons = 10000,
+                      rng = galsim.UniformDeviate(1234))
+        np.testing.assert_array_almost_equal(
+            im.array, im4.array, 10,
+            err_msg = "Photon shooting RealGalaxy made from the cache gives different result")
+
+    # Interpolants given by name share an entry regardless of case.  Ones given as objects can't
+    # be compared, so they aren't cached.
+    rg5 = galsim.RealGalaxy(rgc, index = ind_real, k_interpolant = 'quintic')
+    rg6 = galsim.RealGalaxy(rgc, index = ind_real, k_interpolant = 'Quintic')
+    assert len(rgc._interpolated_cache) == 2
+    rg7 = galsim.RealGalaxy(rgc, index = ind_real, k_interpolant = galsim.Quintic())
+    assert len(rgc._interpolated_cache) == 2
+
+    # Only the most recently used entries are kept.
+    rgc._max_interpolated_cache = 2
+    rg1 = galsim.RealGalaxy(rgc, index = ind_real)
+    rg8 = galsim.RealGalaxy(rgc, index = ind_real, k_interpolant = 'cubic')
+    assert len(rgc._interpolated_cache) == 2
+    assert len(rgc._interpolated_keys) == 2
+    assert rgc._getInterpolated(rgc._interpolated_keys[0]) is not None
+    assert rgc._getInterpolated((ind_real, None, 'quintic', 0.)) is None
+    t2 = time.time()
+    print 'time for %s = %.2f'%(funcname(),t2-t1)
+
 if __name__ == "__main__":
     test_real_galaxy_ideal()
     test_real_galaxy_saved()
+    test_real_galaxy_cache()